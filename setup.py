@@ -13,7 +13,12 @@ setup(
         "python-dotenv==1.0.1",
         "sqlalchemy==2.0.27",
         "pydantic==2.6.1",
+        "aiohttp>=3.9.1",
         "pytest==8.0.0",
     ],
+    extras_require={
+        "fast": ["lxml>=4.9", "brotli>=1.0"],
+        "covers": ["Pillow>=10.0"],
+    },
     python_requires=">=3.8",
 ) 
\ No newline at end of file
@@ -1,20 +1,67 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 import os
-from api.models import SearchRequest, SearchResponse, BookMetadata
-from scrapers.example_library_scraper import ExampleLibraryScraper
-from scrapers.noworzyn_scraper import NoworzynScraper
-from scrapers.onleihe_koeln_scraper import OnleiheKoelnScraper
+from api.models import (
+    AvailabilityRequest, AvailabilityResponse, AvailabilityResult, BookMetadata, DetailsRequest, DetailsResponse,
+    SearchRequest, SearchResponse, Work,
+)
 import asyncio
-from typing import Dict, Type
-from scrapers.base_scraper import BaseScraper
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from scrapers.base_scraper import LibraryTimeout, SearchCancelled
+from scrapers.registry import scraper_registry
+from utils.driver_pool import driver_pool
+from utils.executor import scraper_executor
+from utils.http_cache import http_cache
+from utils.http_client import http_client
+from utils import config
+from utils.availability import AvailabilityChecker
+from utils.circuit_breaker import circuit_breakers
+from utils.covers import COVER_SIZES, ORIGINAL, cover_proxy
+from utils.enrichment import Enricher, detail_url
+from utils.export import FORMATS as EXPORT_FORMATS, export_batches
+from utils.cache import CACHE_HIT, CACHE_MISS, CACHE_STALE, make_cache_key, search_cache
+from utils.merge import merge_results
+from utils.search_index import INDEX_HIT, search_index
+from utils.harvester import HARVEST_HIT, Harvester
+from utils.metrics import REGISTRY, counter, gauge, histogram
+from utils.rate_limiter import PRIORITY_BACKGROUND, new_flow, request_priority
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Wärmt beim Start den WebDriver-Pool vor, öffnet den HTTP-Verbindungspool, startet ggf. den Harvester und
+    schließt beim Beenden alle Browser, HTTP-Verbindungen, den Suchindex, HTTP- und Cover-Cache und Worker-Threads.
+    """
+    # Browser nur vorwärmen, wenn eine der Bibliotheken einen benötigen kann
+    if scraper_registry.needs_browser():
+        await scraper_executor.run_blocking(driver_pool.start)
+    http_client.start()
+    if config.HARVEST_ENABLED and config.HARVEST_IN_PROCESS:
+        harvester.start()
+    yield
+    await harvester.stop()
+    await enricher.stop()
+    await scraper_executor.run_blocking(driver_pool.close)
+    await http_client.close()
+    await scraper_executor.run_blocking(search_index.close)
+    await scraper_executor.run_blocking(http_cache.close)
+    await scraper_executor.run_blocking(cover_proxy.close)
+    scraper_executor.shutdown()
 
 app = FastAPI(
     title="Bibliotheksübergreifendes Suchsystem",
     description="API für die parallele Suche in mehreren Bibliothekskatalogen",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Mount the frontend directory for static file serving
@@ -30,12 +77,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Registry für verfügbare Bibliotheks-Scraper
-LIBRARY_SCRAPERS: Dict[str, Type[BaseScraper]] = {
-    "example_library": ExampleLibraryScraper,
-    "noworzyn": NoworzynScraper,
-    "onleihe_koeln": OnleiheKoelnScraper,
-}
+# Registry für verfügbare Bibliotheks-Scraper; die Module werden erst bei der ersten Suche importiert
+LIBRARY_SCRAPERS = scraper_registry
 
 @app.get("/")
 async def root():
@@ -45,51 +88,610 @@ async def root():
     frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "index.html")
     return FileResponse(frontend_path)
 
+class LibraryResult:
+    """
+    Ergebnis der Suche in einer einzelnen Bibliothek.
+    """
+
+    def __init__(
+        self,
+        library: str,
+        items: Optional[List[Dict[str, Any]]] = None,
+        cache: Optional[str] = None,
+        truncated: bool = False,
+        timed_out: bool = False,
+        error: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ):
+        self.library = library
+        self.items = items or []
+        self.cache = cache
+        self.truncated = truncated
+        self.timed_out = timed_out
+        self.error = error
+        self.fetched_at = fetched_at  # Unix-Zeit, zu der gespeicherte Treffer abgerufen wurden
+
+    def metadata(self) -> List[BookMetadata]:
+        # Treffer aus dem Index können noch ein eigenes `library` enthalten; es gilt die Bibliothek des Ergebnisses
+        return [BookMetadata(**{**item, "library": self.library}) for item in self.items]
+
+# Laufende Hintergrund-Aktualisierungen veralteter Cache-Einträge
+_refresh_tasks: Dict[str, asyncio.Task] = {}
+
+# Gleichzeitige identische Live-Suchen (Bibliothek, Anfrage, Filter) teilen sich einen Scraper
+_search_flights = SingleFlight()
+
+SEARCHES_COALESCED = counter(
+    "search_coalesced_total", "Live-Suchen, die sich einer laufenden identischen Suche angeschlossen haben", ["library"]
+)
+
+# endpoint: search, stream, export
+SEARCH_SECONDS = histogram("search_request_seconds", "Dauer einer Suchanfrage über alle Bibliotheken", ["endpoint"])
+# stage: fan_out (Suchen anstoßen), gather (auf alle Bibliotheken warten), response_build (Antwort zusammenstellen)
+SEARCH_STAGE_SECONDS = histogram("search_stage_seconds", "Dauer der Abschnitte von POST /search", ["stage"])
+# source: live, Cache-Status (hit, stale, harvest, index) oder error
+LIBRARY_SEARCH_SECONDS = histogram(
+    "library_search_seconds", "Dauer der Suche in einer Bibliothek", ["library", "source"]
+)
+LIBRARY_SEARCH_ERRORS = counter("library_search_errors_total", "Fehlgeschlagene Suchen pro Bibliothek", ["library"])
+LIBRARY_SEARCH_TIMEOUTS = counter(
+    "library_search_timeouts_total", "Suchen, die das Zeitbudget der Bibliothek überschritten haben", ["library"]
+)
+LIBRARY_RESULT_COUNT = gauge("library_result_count", "Trefferzahl der letzten Suche pro Bibliothek", ["library"])
+
+async def _new_scraper(library: str):
+    """
+    Neue Scraper-Instanz für `library`. Mit gesetztem `library` gelten für ihre
+    Abrufe Circuit-Breaker und Rate-Limit der Bibliothek.
+    """
+    spec = LIBRARY_SCRAPERS.spec(library)
+    if not spec.loaded:
+        # Erster Import des Scraper-Moduls (z.B. mit Selenium) nicht im Event-Loop
+        await scraper_executor.run_blocking(spec.load)
+    scraper = spec.load()()
+    scraper.library = library
+    return scraper
+
+def _request_deadline(request: SearchRequest) -> float:
+    """
+    Gesamtfrist der Anfrage als `time.monotonic()`-Zeitpunkt.
+    """
+    return time.monotonic() + (request.timeout or config.SEARCH_TIMEOUT)
+
+async def _scrape(library: str, request: SearchRequest, deadline: float, background: bool = False) -> LibraryResult:
+    """
+    Durchsucht eine Bibliothek live unter Beachtung ihres Parallelitätslimits und
+    Zeitbudgets. Bei Ablauf des Budgets wird die Suche abgebrochen und die bis
+    dahin gesammelten Treffer werden zurückgegeben. Hintergrundsuchen (Harvester)
+    zählen nicht als interaktive Last.
+    """
+    # Gesperrte Bibliotheken sofort ablehnen, statt ihr Zeitbudget abzuwarten
+    breaker = circuit_breakers.get(library)
+    if breaker is not None:
+        breaker.check()
+
+    # Ab hier ist ggf. die Probesuche des Breakers vergeben: jeder Ausgang,
+    # auch ein Fehler beim Laden des Scrapers, muss sie werten oder freigeben
+    scraper = None
+    budget = 0.0
+    try:
+        scraper = await _new_scraper(library)
+        budget = max(0.0, min(config.LIBRARY_TIMEOUTS.get(library, config.SEARCH_TIMEOUT), deadline - time.monotonic()))
+        scraper.deadline = time.monotonic() + budget
+
+        async def run():
+            async with scraper_executor.limit(library, background=background):
+                try:
+                    return await scraper.search(request.query, **(request.filters or {}))
+                except asyncio.TimeoutError as e:
+                    # Auch aiohttp-Lesetimeouts sind asyncio.TimeoutError; sie sind ein Fehler der
+                    # Bibliothek und dürfen nicht wie das abgelaufene Zeitbudget (von wait_for) aussehen
+                    raise LibraryTimeout(f"Zeitüberschreitung: {str(e) or type(e).__name__}") from e
+
+        items = await asyncio.wait_for(run(), timeout=budget)
+        if breaker is not None:
+            breaker.record_success()
+        return LibraryResult(library, items, truncated=scraper.truncated)
+    except (asyncio.TimeoutError, SearchCancelled):
+        scraper.cancel()
+        logger.warning(f"Zeitbudget von {budget:.1f}s für '{library}' überschritten")
+        # Eine Zeitüberschreitung ohne jeden Treffer zählt als Ausfall
+        if breaker is not None:
+            breaker.record_success() if scraper.partial_results else breaker.record_failure()
+        return LibraryResult(library, list(scraper.partial_results), truncated=True, timed_out=True)
+    except asyncio.CancelledError:
+        if scraper is not None:
+            scraper.cancel()
+        if breaker is not None:
+            breaker.release_probe()
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.record_failure()
+        raise
+    finally:
+        # Geliehenen WebDriver an den Pool zurückgeben
+        if scraper is not None:
+            await scraper_executor.run_blocking(scraper.cleanup)
+
+async def _index_results(result: LibraryResult):
+    """
+    Übernimmt live gefundene Treffer inkrementell in den lokalen Volltextindex.
+    """
+    if not config.SEARCH_INDEX_ENABLED or not result.items:
+        return
+    try:
+        await scraper_executor.run_blocking(search_index.add, result.library, result.items)
+    except Exception as e:
+        logger.warning(f"Indexierung der Treffer von '{result.library}' fehlgeschlagen: {str(e)}")
+
+async def _harvest(library: str, query: str) -> LibraryResult:
+    """
+    Live-Suche für den Harvester; die Treffer fließen auch in den lokalen Index.
+    """
+    request = SearchRequest(query=query, libraries=[library])
+    # Zugriffe des Harvesters stehen im Rate-Limiter hinter interaktiven Suchen
+    request_priority.set(PRIORITY_BACKGROUND)
+    new_flow()
+    result = await _scrape(library, request, time.monotonic() + config.SEARCH_TIMEOUT, background=True)
+    await _index_results(result)
+    return result
+
+harvester = Harvester.from_config(_harvest, list(LIBRARY_SCRAPERS))
+
+async def _index_enriched(library: str, items: List[Dict[str, Any]]):
+    await _index_results(LibraryResult(library, items))
+
+enricher = Enricher.from_config(_new_scraper, on_enriched=_index_enriched)
+availability_checker = AvailabilityChecker.from_config(_new_scraper)
+
+def _schedule_refresh(library: str, key: str, request: SearchRequest):
+    if key not in _refresh_tasks:
+        _refresh_tasks[key] = asyncio.create_task(_refresh_cache(library, key, request))
+
+async def _refresh_cache(library: str, key: str, request: SearchRequest):
+    """
+    Aktualisiert einen veralteten Cache-Eintrag bzw. lokal beantwortete Treffer im Hintergrund.
+    """
+    try:
+        await _search_flights.do(key, lambda: _live_search(library, key, request, time.monotonic() + config.SEARCH_TIMEOUT))
+    except Exception as e:
+        logger.warning(f"Aktualisierung des Caches für '{library}' fehlgeschlagen: {str(e)}")
+    finally:
+        _refresh_tasks.pop(key, None)
+
+async def _live_search(library: str, key: str, request: SearchRequest, deadline: float) -> LibraryResult:
+    """
+    Live-Suche mit anschließender Übernahme in Index und Cache.
+    """
+    result = await _scrape(library, request, deadline)
+    await _index_results(result)
+    if not config.CACHE_ENABLED:
+        return result
+    result.cache = CACHE_MISS
+    # Leere oder unvollständige Ergebnisse nicht cachen, da die Scraper Fehler als leere Liste melden
+    if result.items and not result.truncated:
+        await search_cache.set(library, key, result.items)
+    return result
+
+async def _log_query(library: str, query: str):
+    try:
+        await scraper_executor.run_blocking(harvester.store.log_query, library, query)
+    except Exception as e:
+        logger.warning(f"Anfrage konnte nicht protokolliert werden: {str(e)}")
+
+async def _search_library(library: str, request: SearchRequest, deadline: float) -> LibraryResult:
+    """
+    Liefert die Treffer einer Bibliothek aus dem Cache oder per Live-Suche.
+    Fehler werden im Ergebnis vermerkt statt geworfen.
+    """
+    started = time.perf_counter()
+    result = await _lookup_library(library, request, deadline)
+    source = "error" if result.error else result.cache if result.cache and result.cache != CACHE_MISS else "live"
+    LIBRARY_SEARCH_SECONDS.observe(time.perf_counter() - started, library=library, source=source)
+    if result.error:
+        LIBRARY_SEARCH_ERRORS.inc(library=library)
+    else:
+        LIBRARY_RESULT_COUNT.set(len(result.items), library=library)
+    if result.timed_out:
+        LIBRARY_SEARCH_TIMEOUTS.inc(library=library)
+    if config.ENRICH_ENABLED and result.items:
+        try:
+            # Bereits bekannte Angaben von Detailseiten übernehmen, fehlende ggf. im Hintergrund laden
+            await enricher.apply(library, result.items)
+            if config.ENRICH_IN_BACKGROUND:
+                enricher.schedule(library, result.items)
+        except Exception as e:
+            logger.warning(f"Treffer von '{library}' konnten nicht angereichert werden: {str(e)}")
+    if config.COVERS_ENABLED and result.items:
+        try:
+            # Coverbilder über den eigenen Proxy ausliefern
+            await cover_proxy.register(library, result.items)
+        except Exception as e:
+            logger.warning(f"Cover von '{library}' konnten nicht registriert werden: {str(e)}")
+    return result
+
+async def _lookup_library(library: str, request: SearchRequest, deadline: float) -> LibraryResult:
+    try:
+        key = make_cache_key(library, request.query, request.filters)
+        if config.HARVEST_ENABLED:
+            await _log_query(library, request.query)
+
+        if config.CACHE_ENABLED:
+            cached, status = await search_cache.get(library, key)
+            if status == CACHE_HIT:
+                return LibraryResult(library, cached, cache=status)
+            if status == CACHE_STALE:
+                # Veraltete Treffer sofort ausliefern und im Hintergrund neu laden
+                _schedule_refresh(library, key, request)
+                return LibraryResult(library, cached, cache=status)
+
+        if config.HARVEST_ENABLED:
+            # Vom Harvester vorab geladene Treffer mit ihrem Abrufzeitpunkt ausliefern
+            harvested = await scraper_executor.run_blocking(harvester.store.get, key)
+            if harvested is not None and time.time() - harvested[1] <= config.HARVEST_MAX_AGE:
+                return LibraryResult(library, harvested[0], cache=HARVEST_HIT, fetched_at=harvested[1])
+
+        if request.local_first and config.SEARCH_INDEX_ENABLED:
+            # Lokale Treffer sofort ausliefern, die Live-Suche aktualisiert Index und Cache
+            indexed = await scraper_executor.run_blocking(search_index.search, library, request.query)
+            if indexed:
+                _schedule_refresh(library, key, request)
+                return LibraryResult(library, indexed, cache=INDEX_HIT)
+
+        # Läuft dieselbe Suche bereits, auf deren Ergebnis warten; die gemeinsame
+        # Suche endet erst, wenn alle Wartenden abgebrochen haben (Zeitbudget der ersten Anfrage)
+        if _search_flights.in_flight(key):
+            SEARCHES_COALESCED.inc(library=library)
+        return await _search_flights.do(
+            key, lambda: _live_search(library, key, request, deadline), cancel_orphans=True
+        )
+    except Exception as e:
+        return LibraryResult(library, error=f"Fehler bei '{library}': {str(e)}")
+
 @app.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest):
     """
     Führt eine parallele Suche in den ausgewählten Bibliotheken durch.
     """
+    with SEARCH_SECONDS.time(endpoint="search"):
+        return await _search(request)
+
+async def _search(request: SearchRequest) -> SearchResponse:
+    started = time.perf_counter()
     results = []
     errors = []
     tasks = []
+    cache_status = {}
+    fetched_at = {}
+    truncated = []
+    timed_out = []
+    deadline = _request_deadline(request)
+    # Eigener Flow für faire Verteilung im Rate-Limiter; gilt auch für die Tasks von gather
+    new_flow()
 
-    # Erstelle Scraper-Instanzen für ausgewählte Bibliotheken
+    # Erstelle Suchen für ausgewählte Bibliotheken
     for library in request.libraries:
         if library not in LIBRARY_SCRAPERS:
             errors.append(f"Bibliothek '{library}' nicht unterstützt")
             continue
         
-        scraper = LIBRARY_SCRAPERS[library]()
-        tasks.append(scraper.search(request.query, **(request.filters or {})))
+        tasks.append(asyncio.ensure_future(_search_library(library, request, deadline)))
+    stages = {"fan_out": time.perf_counter() - started}
 
     # Führe Suchen parallel aus
     if tasks:
-        search_results = await asyncio.gather(*tasks, return_exceptions=True)
+        gather_started = time.perf_counter()
+        library_results = await asyncio.gather(*tasks)
+        stages["gather"] = time.perf_counter() - gather_started
         
         # Verarbeite Ergebnisse und Fehler
-        for library, result in zip(request.libraries, search_results):
-            if isinstance(result, Exception):
-                errors.append(f"Fehler bei '{library}': {str(result)}")
-            else:
-                for item in result:
-                    results.append(BookMetadata(
-                        **item,
-                        library=library
-                    ))
-
-    return SearchResponse(
+        build_started = time.perf_counter()
+        for result in library_results:
+            if result.error:
+                errors.append(result.error)
+                continue
+            results.extend(result.metadata())
+            if result.cache:
+                cache_status[result.library] = result.cache
+            if result.fetched_at:
+                fetched_at[result.library] = result.fetched_at
+            if result.timed_out:
+                timed_out.append(result.library)
+            elif result.truncated:
+                truncated.append(result.library)
+
+    else:
+        build_started = time.perf_counter()
+
+    works = None
+    if request.merge:
+        works = [Work(**work) for work in merge_results([book.model_dump() for book in results])]
+
+    response = SearchResponse(
         results=results,
         total_count=len(results),
-        errors=errors if errors else None
+        errors=errors if errors else None,
+        cache=cache_status if cache_status else None,
+        truncated=truncated if truncated else None,
+        timed_out=timed_out if timed_out else None,
+        works=works,
+        fetched_at=fetched_at if fetched_at else None
     )
+    stages["response_build"] = time.perf_counter() - build_started
+    for stage, seconds in stages.items():
+        SEARCH_STAGE_SECONDS.observe(seconds, stage=stage)
+    logger.debug("Suche '%s': %s", request.query, ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in stages.items()))
+    return response
+
+async def _stream_search(request: SearchRequest) -> AsyncIterator[str]:
+    """
+    Erzeugt NDJSON-Ereignisse: ein "results"- bzw. "error"-Ereignis pro Bibliothek,
+    sobald diese fertig ist, und abschließend ein "summary"-Ereignis (bei
+    merge=True mit den zusammengeführten Werken).
+    """
+    errors = []
+    cache_status = {}
+    truncated = []
+    timed_out = []
+    total_count = 0
+    merged = []
+    tasks = []
+    started = time.perf_counter()
+    deadline = _request_deadline(request)
+    new_flow()
+
+    for library in request.libraries:
+        if library not in LIBRARY_SCRAPERS:
+            error = f"Bibliothek '{library}' nicht unterstützt"
+            errors.append(error)
+            yield json.dumps({"type": "error", "library": library, "error": error}) + "\n"
+            continue
+        tasks.append(asyncio.create_task(_search_library(library, request, deadline)))
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result.error:
+                errors.append(result.error)
+                yield json.dumps({"type": "error", "library": result.library, "error": result.error}) + "\n"
+                continue
+
+            if result.cache:
+                cache_status[result.library] = result.cache
+            if result.timed_out:
+                timed_out.append(result.library)
+            elif result.truncated:
+                truncated.append(result.library)
+            batch = [book.model_dump() for book in result.metadata()]
+            total_count += len(batch)
+            if request.merge:
+                merged.extend(batch)
+            yield json.dumps({
+                "type": "results",
+                "library": result.library,
+                "results": batch,
+                "cache": result.cache,
+                "fetched_at": result.fetched_at,
+                "truncated": result.truncated,
+                "timed_out": result.timed_out,
+            }, default=str) + "\n"
+    finally:
+        # Bei Verbindungsabbruch laufende Suchen beenden
+        for task in tasks:
+            task.cancel()
+        SEARCH_SECONDS.observe(time.perf_counter() - started, endpoint="stream")
+
+    yield json.dumps({
+        "type": "summary",
+        "total_count": total_count,
+        "errors": errors if errors else None,
+        "cache": cache_status if cache_status else None,
+        "truncated": truncated if truncated else None,
+        "timed_out": timed_out if timed_out else None,
+        "works": merge_results(merged) if request.merge else None,
+    }, default=str) + "\n"
+
+@app.post("/search/stream")
+async def search_stream(request: SearchRequest):
+    """
+    Streamt die Treffer jeder Bibliothek als NDJSON, sobald sie vorliegen.
+    """
+    return StreamingResponse(_stream_search(request), media_type="application/x-ndjson")
+
+@app.post("/details", response_model=DetailsResponse)
+async def get_details(request: DetailsRequest):
+    """
+    Ergänzt fehlende Felder (ISBN, Jahr, Verlag) der übergebenen Treffer über
+    ihre Detailseiten; die Seiten aller Bibliotheken werden gleichzeitig geladen.
+    """
+    if not config.ENRICH_ENABLED:
+        raise HTTPException(status_code=404, detail="Anreicherung deaktiviert")
+    if len(request.items) > config.ENRICH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Höchstens {config.ENRICH_MAX_ITEMS} Treffer pro Anfrage")
+    # Treffer ohne `library`, wie sie die Scraper liefern
+    entries = [(book.library, book.model_dump(exclude_none=True, exclude={"library"})) for book in request.items]
+    errors = []
+    scrapers: Dict[str, Any] = {}
+    by_library: Dict[str, List[Dict[str, Any]]] = {}
+    for library, item in entries:
+        if library not in LIBRARY_SCRAPERS:
+            errors.append(f"Bibliothek '{library}' nicht unterstützt")
+            continue
+        if library not in scrapers:
+            scrapers[library] = await _new_scraper(library)
+        # Nur Detailseiten der Bibliothek selbst laden, keine beliebigen vom Client genannten URLs
+        url = detail_url(item)
+        if url is not None and not scrapers[library].owns_url(url):
+            errors.append(f"Detailseite {url} gehört nicht zu '{library}'")
+            continue
+        by_library.setdefault(library, []).append(item)
+    errors = list(dict.fromkeys(errors))
+
+    timeout = request.timeout or config.ENRICH_TIMEOUT
+    new_flow()
+    # Die Treffer stammen vom Client: ergänzen und Angaben speichern, aber nicht indexieren
+    counts = await asyncio.gather(
+        *(
+            enricher.enrich(library, batch, timeout=timeout, scraper=scrapers[library], notify=False)
+            for library, batch in by_library.items()
+        ),
+        return_exceptions=True,
+    )
+    for library, count in zip(by_library, counts):
+        if isinstance(count, Exception):
+            errors.append(f"Fehler bei '{library}': {str(count)}")
+
+    return DetailsResponse(
+        results=[BookMetadata(**item, library=library) for library, item in entries],
+        enriched=sum(count for count in counts if isinstance(count, int)),
+        errors=errors if errors else None,
+    )
+
+@app.post("/availability", response_model=AvailabilityResponse)
+async def get_availability(request: AvailabilityRequest):
+    """
+    Fragt nur die aktuelle Verfügbarkeit einzelner Treffer ab, ohne die Suche
+    zu wiederholen. Antworten jünger als AVAILABILITY_TTL kommen aus dem Cache.
+    """
+    if len(request.items) > config.AVAILABILITY_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Höchstens {config.AVAILABILITY_MAX_ITEMS} Treffer pro Anfrage")
+    entries = [(item.library, item.url) for item in request.items if item.library in LIBRARY_SCRAPERS]
+    new_flow()
+    statuses = {
+        (status.library, status.url): status
+        for status in await availability_checker.check(entries, timeout=request.timeout or config.AVAILABILITY_TIMEOUT)
+    }
+
+    results = []
+    for item in request.items:
+        status = statuses.get((item.library, item.url))
+        if status is None:
+            results.append(AvailabilityResult(library=item.library, url=item.url, error="Bibliothek nicht unterstützt"))
+            continue
+        results.append(AvailabilityResult(
+            library=status.library,
+            url=status.url,
+            availability=status.availability,
+            checked_at=status.checked_at,
+            cached=status.cached,
+            error=status.error,
+        ))
+    return AvailabilityResponse(results=results)
+
+def _check_export_format(format: str):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400, detail=f"Unbekanntes Format '{format}' (möglich: {', '.join(EXPORT_FORMATS)})"
+        )
+
+def _export_response(records, format: str, filename: str) -> StreamingResponse:
+    """
+    `records`: Treffer (Iterable) oder asynchron eintreffende Blöcke von Treffern.
+    """
+    export, media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export_batches(export, records) if hasattr(records, "__aiter__") else export(records),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
+
+async def _export_search(request: SearchRequest) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Sucht wie `/search/stream` in allen Bibliotheken gleichzeitig und liefert
+    die Treffer jeder Bibliothek, sobald sie fertig ist. Fehler und nicht
+    unterstützte Bibliotheken werden nur protokolliert.
+    """
+    started = time.perf_counter()
+    deadline = _request_deadline(request)
+    new_flow()
+    tasks = [
+        asyncio.create_task(_search_library(library, request, deadline))
+        for library in request.libraries if library in LIBRARY_SCRAPERS
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result.error:
+                logger.warning(f"Export: {result.error}")
+                continue
+            yield [book.model_dump(exclude_none=True) for book in result.metadata()]
+    finally:
+        # Bei Verbindungsabbruch laufende Suchen beenden
+        for task in tasks:
+            task.cancel()
+        SEARCH_SECONDS.observe(time.perf_counter() - started, endpoint="export")
+
+@app.post("/export")
+async def export_search(request: SearchRequest, format: str = "csv"):
+    """
+    Führt die Suche aus (inkl. Cache) und streamt die Treffer als csv, bibtex,
+    ris oder jsonl: die Treffer jeder Bibliothek werden Zeile für Zeile
+    ausgegeben, sobald deren Suche fertig ist, in der Reihenfolge der
+    Fertigstellung.
+    """
+    _check_export_format(format)
+    return _export_response(_export_search(request), format, "suche")
+
+@app.get("/export/index/{library}")
+async def export_index(library: str, format: str = "csv", query: Optional[str] = None):
+    """
+    Streamt alle (bzw. die zu `query` passenden) Treffer einer Bibliothek aus
+    dem lokalen Index, blockweise gelesen und unabhängig von der Trefferzahl
+    mit konstantem Speicherbedarf.
+    """
+    if library not in LIBRARY_SCRAPERS:
+        raise HTTPException(status_code=404, detail=f"Bibliothek '{library}' nicht unterstützt")
+    _check_export_format(format)
+    records = (dict(record, library=library) for record in search_index.iter_records(library, query))
+    return _export_response(records, format, library)
 
 @app.get("/libraries")
 async def get_available_libraries():
     """
-    Gibt eine Liste der verfügbaren Bibliotheken zurück.
+    Gibt eine Liste der verfügbaren Bibliotheken und ihre Fähigkeiten zurück
+    (Anzeigename, benötigt Browser, Blättern, unterstützte Filter).
+    """
+    return {"libraries": list(LIBRARY_SCRAPERS.keys()), "capabilities": LIBRARY_SCRAPERS.capabilities()}
+
+@app.get("/covers/{cover_id}")
+async def get_cover(cover_id: str, request: Request, size: str = "medium"):
+    """
+    Liefert ein Coverbild aus dem eigenen Cache, bei Bedarf verkleinert
+    (size: small, medium, large oder original; WebP, falls der Browser es akzeptiert).
+    """
+    if not config.COVERS_ENABLED:
+        raise HTTPException(status_code=404, detail="Cover-Proxy deaktiviert")
+    if size != ORIGINAL and size not in COVER_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Größe '{size}'")
+    webp = "image/webp" in request.headers.get("accept", "")
+    try:
+        cover = await cover_proxy.get(cover_id, size, webp)
+    except Exception as e:
+        logger.warning(f"Cover {cover_id} konnte nicht geladen werden: {str(e)}")
+        raise HTTPException(status_code=502, detail="Cover konnte nicht geladen werden")
+    if cover is None:
+        raise HTTPException(status_code=404, detail="Unbekanntes Cover")
+
+    path, media_type, etag = cover
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={config.COVER_MAX_AGE}", "Vary": "Accept"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+@app.get("/index/stats")
+async def get_index_stats():
+    """
+    Größe des lokalen Volltextindex sowie Anzahl und Alter der Treffer pro Bibliothek.
+    """
+    return await scraper_executor.run_blocking(search_index.stats)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prozess-Metriken im Prometheus-Textformat (u.a. Warteschlangen des Rate-Limiters).
     """
-    return {"libraries": list(LIBRARY_SCRAPERS.keys())}
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
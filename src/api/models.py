@@ -1,10 +1,13 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class SearchRequest(BaseModel):
     query: str
     libraries: List[str]
     filters: Optional[dict] = None
+    timeout: Optional[float] = None  # Gesamtfrist in Sekunden, Standard: SEARCH_TIMEOUT
+    merge: bool = False  # Treffer bibliotheksübergreifend zu Werken zusammenführen
+    local_first: bool = False  # Zuerst aus dem lokalen Index antworten, dann live aktualisieren
 
 class BookMetadata(BaseModel):
     title: Optional[str] = None
@@ -13,9 +16,67 @@ class BookMetadata(BaseModel):
     isbn: Optional[str] = None
     availability: Optional[str] = None
     location: Optional[str] = None
+    format: Optional[str] = None
+    price: Optional[str] = None
+    publisher: Optional[str] = None
+    url: Optional[str] = None
+    details_url: Optional[str] = None
+    cover: Optional[str] = None  # Pfad zum Cover-Proxy (/covers/{id})
     library: str
 
+class Holding(BaseModel):
+    library: str
+    availability: Optional[str] = None
+    location: Optional[str] = None
+    price: Optional[str] = None
+    format: Optional[str] = None
+    url: Optional[str] = None
+    isbn: Optional[str] = None  # ISBN-13 dieser Ausgabe
+
+class Work(BaseModel):
+    key: str  # "isbn:<ISBN-13>" oder "work:<titel|autor>"
+    title: Optional[str] = None
+    author: Optional[str] = None
+    year: Optional[str] = None
+    publisher: Optional[str] = None
+    isbn: Optional[str] = None
+    isbns: List[str] = []
+    holdings: List[Holding]
+
+class DetailsRequest(BaseModel):
+    items: List[BookMetadata]  # Treffer aus einer Suche, mit `library` und `details_url` bzw. `url`
+    timeout: Optional[float] = None  # Frist in Sekunden, Standard: ENRICH_TIMEOUT
+
+class DetailsResponse(BaseModel):
+    results: List[BookMetadata]  # Dieselben Treffer in derselben Reihenfolge, fehlende Felder ergänzt
+    enriched: int
+    errors: Optional[List[str]] = None
+
+class AvailabilityItem(BaseModel):
+    library: str
+    url: str  # `details_url` bzw. `url` des Treffers
+
+class AvailabilityRequest(BaseModel):
+    items: List[AvailabilityItem]
+    timeout: Optional[float] = None  # Frist in Sekunden, Standard: AVAILABILITY_TIMEOUT
+
+class AvailabilityResult(BaseModel):
+    library: str
+    url: str
+    availability: Optional[str] = None
+    checked_at: Optional[float] = None  # Unix-Zeit der Abfrage bei der Bibliothek
+    cached: bool = False  # Aus dem Kurzzeit-Cache (jünger als AVAILABILITY_TTL)
+    error: Optional[str] = None
+
+class AvailabilityResponse(BaseModel):
+    results: List[AvailabilityResult]
+
 class SearchResponse(BaseModel):
     results: List[BookMetadata]
     total_count: int
-    errors: Optional[List[str]] = None 
\ No newline at end of file
+    errors: Optional[List[str]] = None
+    cache: Optional[Dict[str, str]] = None  # Bibliothek -> "hit" / "stale" / "miss" / "index" / "harvested"
+    truncated: Optional[List[str]] = None  # Bibliotheken mit gekürzter Trefferliste
+    timed_out: Optional[List[str]] = None  # Bibliotheken, deren Zeitbudget abgelaufen ist
+    works: Optional[List[Work]] = None  # Nur bei merge=True
+    fetched_at: Optional[Dict[str, float]] = None  # Bibliothek -> Abrufzeitpunkt (Unix-Zeit) vorab geladener Treffer 
\ No newline at end of file
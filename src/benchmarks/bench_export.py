@@ -0,0 +1,89 @@
+"""
+Benchmark: Export synthetischer Treffer in alle Exportformate.
+
+Die Treffer werden als Generator erzeugt und direkt exportiert, wie beim
+Streaming-Export aus dem lokalen Index. Gemessen werden Laufzeit, Ausgabegröße
+und Spitzen-Speicher (tracemalloc) pro Format; der Speicher soll unabhängig
+von der Trefferzahl bleiben (BibTeX merkt sich nur die vergebenen Schlüssel):
+
+    cd src
+    python -m benchmarks.bench_export --records 100000
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List
+
+from api.models import BookMetadata
+from utils.export import FORMATS
+
+_AUTHORS = ["Krechel, Ursula", "Müller, Herta", "Süskind, Patrick", "Grass, Günter", "Zeh, Juli", "Kehlmann, Daniel"]
+_WORDS = ["Landgericht", "Atemschaukel", "Das Parfum", "Blechtrommel", "Über Menschen", "Tyll", "Straße", "Märchen"]
+_FORMATS = ["Buch", "eBook", "Hörbuch", "Taschenbuch"]
+
+
+def synthetic_records(count: int, seed: int = 1) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for i in range(count):
+        yield BookMetadata(
+            library=rng.choice(["noworzyn", "onleihe_koeln"]),
+            title=f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} & {{Band {i % 7}}}",
+            author=rng.choice(_AUTHORS),
+            year=str(rng.randint(1950, 2024)),
+            isbn=f"978-3-{rng.randint(10, 99)}-{rng.randint(100000, 999999)}-{rng.randint(0, 9)}",
+            publisher=rng.choice(["Hanser", "Rowohlt", "Suhrkamp", "Diogenes"]),
+            format=rng.choice(_FORMATS),
+            availability=rng.choice(["verfügbar", "ausgeliehen"]),
+            url=f"https://example.org/titel/{i}?q=a_b%20c",
+        ).model_dump(exclude_none=True)
+
+
+def _measure(name: str, count: int, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    export = FORMATS[name][0]
+    # Laufzeit über vorab erzeugte Treffer, damit nur der Export zählt
+    started = time.perf_counter()
+    size = 0
+    for chunk in export(records):
+        size += len(chunk.encode("utf-8"))
+    elapsed = time.perf_counter() - started
+
+    # Speicher über die generierten Treffer, wie beim Streaming aus dem Index
+    tracemalloc.start()
+    for _ in export(synthetic_records(count)):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(elapsed, 2),
+        "records_per_s": round(count / elapsed),
+        "output_mib": round(size / 1024 / 1024, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(count: int) -> Dict[str, Dict[str, Any]]:
+    records = list(synthetic_records(count))
+    return {name: _measure(name, count, records) for name in FORMATS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000, help="Anzahl synthetischer Treffer")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    report = run(args.records)
+
+    print(f"{'Format':<10}{'Dauer':>10}{'Treffer/s':>12}{'Ausgabe':>12}{'Speicher':>14}")
+    for name, stats in report.items():
+        print(f"{name:<10}{stats['seconds']:>9.2f}s{stats['records_per_s']:>12}{stats['output_mib']:>9.1f}MiB{stats['peak_kib']:>11.1f}KiB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: Extraktion der Treffer je Regelsatz (`EXTRACTOR` der Scraper).
+
+Die Ergebnisseiten werden einmal geparst; gemessen wird nur das Anwenden der
+Extraktionsregeln auf die Trefferbehälter, ohne Browser und ohne
+Netzwerkzugriff:
+
+    cd src
+    python -m benchmarks.bench_extract --runs 200
+"""
+import argparse
+import json
+import logging
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fixture_server import read_fixture
+from scrapers.noworzyn_scraper import NoworzynScraper
+from scrapers.onleihe_koeln_scraper import OnleiheKoelnScraper
+
+
+def _noworzyn_items(scraper, html):
+    return scraper._find_product_containers(html)
+
+
+def _onleihe_items(scraper, html):
+    return scraper.SELECTORS['result'].select(scraper._parse_html(html, scraper.RESULTS_SCOPE))
+
+
+CASES = [
+    ("noworzyn", NoworzynScraper, _noworzyn_items, ["noworzyn/quickSearch"]),
+    ("onleihe_koeln", OnleiheKoelnScraper, _onleihe_items, [
+        "onleihe/frontend/searchResult,0-0-0-100-0-0-0-0-0-0-0.html",
+        "onleihe/frontend/searchResult,0-0-0-100-0-0-0-0-0-2-0.html",
+        "onleihe/frontend/searchResult,0-0-0-100-0-0-0-0-0-3-0.html",
+    ]),
+]
+
+
+def _measure(scraper, items: List[Any], runs: int) -> Dict[str, Any]:
+    timings = []
+    results = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        results = sum(1 for item in items if scraper.extract_metadata(item))
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {
+        "median_ms": round(median * 1000, 3),
+        "items_per_s": round(len(items) / median),
+        "fields": len(scraper.EXTRACTOR.fields),
+        "results": results,
+    }
+
+
+def run(runs: int) -> Dict[str, Dict[str, Any]]:
+    # Die Scraper protokollieren Fundstellen auf DEBUG-Ebene
+    logging.disable(logging.INFO)
+    report = {}
+    for library, scraper_class, find_items, paths in CASES:
+        scraper = scraper_class()
+        items = [item for path in paths for item in find_items(scraper, read_fixture(path))]
+        report[library] = _measure(scraper, items, runs)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200, help="Durchläufe über alle Treffer")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    report = run(args.runs)
+
+    print(f"{'Bibliothek':<16}{'Felder':>8}{'Median':>12}{'Treffer/s':>12}{'Treffer':>10}")
+    for library, stats in report.items():
+        print(f"{library:<16}{stats['fields']:>8}{stats['median_ms']:>10.3f}ms{stats['items_per_s']:>12}{stats['results']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: Parsen und Extrahieren gespeicherter Ergebnisseiten je
+Parser-Backend (html.parser, lxml falls installiert), jeweils über das ganze
+Dokument und auf die Ergebniscontainer beschränkt (SoupStrainer).
+
+Misst Median-Laufzeit und Spitzen-Speicher (tracemalloc) pro Seite, ohne
+Browser und ohne Netzwerkzugriff:
+
+    cd src
+    python -m benchmarks.bench_parse --runs 50
+
+Die Fixture-Seiten enthalten kaum mehr als die Trefferliste. Echte Shopseiten
+bringen zusätzlich Navigation, Footer und Teaser mit; `--boilerplate N`
+ergänzt deshalb einen Navigationsblock mit N Einträgen vor den Treffern
+(0 = Fixture unverändert).
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.fixture_server import read_fixture
+from scrapers.noworzyn_scraper import NoworzynScraper
+from scrapers.onleihe_koeln_scraper import OnleiheKoelnScraper
+
+
+def _available_parsers():
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+    return parsers
+
+
+def _parse_noworzyn(scraper, html):
+    return scraper._extract_results(scraper._find_product_containers(html))
+
+
+def _parse_onleihe(scraper, html):
+    return scraper._parse_results(html) or []
+
+
+CASES = [
+    ("noworzyn", NoworzynScraper, _parse_noworzyn, ["noworzyn/quickSearch"]),
+    ("onleihe_koeln", OnleiheKoelnScraper, _parse_onleihe, [
+        "onleihe/frontend/searchResult,0-0-0-100-0-0-0-0-0-0-0.html",
+        "onleihe/frontend/searchResult,0-0-0-100-0-0-0-0-0-2-0.html",
+        "onleihe/frontend/searchResult,0-0-0-100-0-0-0-0-0-3-0.html",
+    ]),
+]
+
+
+def with_boilerplate(html, entries):
+    """Stellt den Treffern einen Navigationsblock mit `entries` Einträgen voran."""
+    if not entries:
+        return html
+    nav = '<nav class="main-menu">' + ''.join(
+        f'<ul class="menu"><li class="menu-item"><a href="/kategorie/{i}"><span>Kategorie {i}</span></a></li></ul>'
+        for i in range(entries)
+    ) + '</nav>'
+    return html.replace('<body>', '<body>' + nav, 1)
+
+
+def measure(scraper, parse, pages, runs):
+    """Median pro Seite, Spitzen-Speicher und Trefferzahl für eine Parse-Funktion."""
+    timings = []
+    results = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        results = sum(len(parse(scraper, html)) for html in pages)
+        timings.append((time.perf_counter() - started) / len(pages))
+
+    tracemalloc.start()
+    for html in pages:
+        parse(scraper, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "peak_kib": round(peak / 1024, 1),
+        "results": results,
+    }
+
+
+def run(runs: int, boilerplate: int = 0):
+    report = {}
+    for library, scraper_class, parse, paths in CASES:
+        pages = [with_boilerplate(read_fixture(path), boilerplate) for path in paths]
+        scraper = scraper_class()
+        report[library] = {}
+        for parser in _available_parsers():
+            for scoped in (False, True):
+                scraper.PARSER = parser
+                scraper.RESULTS_SCOPE = scraper_class.RESULTS_SCOPE if scoped else None
+                variant = f"{parser}{'+scope' if scoped else ''}"
+                report[library][variant] = measure(scraper, parse, pages, runs)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="Durchläufe pro Seite und Variante")
+    parser.add_argument("--boilerplate", type=int, default=1000, help="Navigationseinträge, die jeder Seite vorangestellt werden")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    report = run(args.runs, args.boilerplate)
+
+    print(f"{'Bibliothek':<16}{'Variante':<20}{'Median/Seite':>14}{'Speicher':>12}{'Treffer':>10}")
+    for library, variants in report.items():
+        for variant, stats in variants.items():
+            print(f"{library:<16}{variant:<20}{stats['median_ms']:>12.2f}ms{stats['peak_kib']:>9.1f}KiB{stats['results']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
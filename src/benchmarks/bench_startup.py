@@ -0,0 +1,83 @@
+"""
+Benchmark: Kaltstart der API.
+
+Importiert `api.main` wiederholt in frischen Python-Prozessen und misst
+Importdauer, Speicher (max RSS) und ob schwere Abhängigkeiten wie Selenium
+bereits beim Start geladen werden; die Scraper-Module sollen erst bei der
+ersten Suche importiert werden (`scrapers.registry`):
+
+    cd src
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict
+
+# Läuft im Kindprozess; gibt die Messwerte als JSON aus
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import api.main
+elapsed = time.perf_counter() - started
+try:
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+except ImportError:
+    max_rss = None
+print(json.dumps({
+    "import_s": elapsed,
+    "max_rss_mib": max_rss,
+    "modules": len(sys.modules),
+    "selenium": "selenium" in sys.modules,
+    "scrapers_loaded": api.main.scraper_registry.loaded(),
+}))
+"""
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _probe() -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=SRC_DIR, check=True, capture_output=True, text=True,
+        # Kein Vorwärmen des Browsers, keine .env-abhängigen Nebenwirkungen beim Import
+        env={**os.environ, "DRIVER_POOL_MIN_SIZE": "0", "PYTHONDONTWRITEBYTECODE": "1"},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int) -> Dict[str, Any]:
+    # Erster Lauf füllt den Bytecode-Cache des Dateisystems und zählt nicht
+    _probe()
+    probes = [_probe() for _ in range(runs)]
+    max_rss = [probe["max_rss_mib"] for probe in probes if probe["max_rss_mib"] is not None]
+    return {
+        "import_median_ms": round(statistics.median(probe["import_s"] for probe in probes) * 1000, 1),
+        "import_min_ms": round(min(probe["import_s"] for probe in probes) * 1000, 1),
+        "max_rss_mib": round(statistics.median(max_rss), 1) if max_rss else None,
+        "modules": probes[-1]["modules"],
+        "selenium_imported": probes[-1]["selenium"],
+        "scrapers_loaded": probes[-1]["scrapers_loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Anzahl frischer Prozesse")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    report = run(args.runs)
+    for name, value in report.items():
+        print(f"{name:<20}{value}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: Latenz einer Selenium-Suche mit dem früheren Warteverhalten (feste
+Pausen, Neuladen der Seite, Warten auf jeden Modal-Selektor) gegenüber den
+deklarierten Wartebedingungen aus BaseScraper._wait_for_step.
+
+Läuft gegen die lokalen Fixture-Seiten und benötigt Chrome/Chromedriver,
+aber keinen Netzwerkzugriff:
+
+    cd src
+    python -m benchmarks.bench_waits --runs 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from benchmarks.fixture_server import FixtureServer
+from scrapers.noworzyn_scraper import NoworzynScraper
+from scrapers.onleihe_koeln_scraper import OnleiheKoelnScraper
+from utils.driver_pool import driver_pool
+
+
+class LegacyWaits:
+    """
+    Bildet das Warteverhalten vor der Umstellung nach: 1-2s Pause, Warten auf
+    document.readyState und weitere 1s Pause pro Seitenwechsel.
+    """
+
+    LEGACY_SLEEP_BEFORE = 2
+    LEGACY_SLEEP_AFTER = 1
+
+    async def _wait_for_step(self, step, timeout=20):
+        await asyncio.sleep(self.LEGACY_SLEEP_BEFORE)
+        await self._run_blocking(
+            WebDriverWait(self.driver, timeout).until,
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        await asyncio.sleep(self.LEGACY_SLEEP_AFTER)
+        return True
+
+
+class LegacyNoworzynScraper(LegacyWaits, NoworzynScraper):
+    async def _handle_modals(self):
+        # Früher: Seite neu laden und auf jeden der acht Selektoren bis zu 5s warten
+        for attempt in range(3):
+            await asyncio.sleep(1)
+            await self._run_blocking(self.driver.refresh)
+            await self._wait_for_step("home")
+            for selector in self.MODAL_SELECTORS:
+                try:
+                    element = await self._run_blocking(
+                        WebDriverWait(self.driver, 5).until,
+                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                    )
+                    if await self._run_blocking(element.is_displayed):
+                        await self._run_blocking(element.click)
+                        await asyncio.sleep(0.5)
+                except Exception:
+                    continue
+            visible_modals = await self._run_blocking(
+                self.driver.find_elements, By.CSS_SELECTOR, "[class*='modal']:not([style*='display: none'])"
+            )
+            if not visible_modals:
+                break
+
+    def _type_search_term(self, search_input, term):
+        # Feste Pausen um Scrollen, Leeren und Eingabe (1s + 0.5s + 1s)
+        time.sleep(2.5)
+        super()._type_search_term(search_input, term)
+
+
+class LegacyOnleiheKoelnScraper(LegacyWaits, OnleiheKoelnScraper):
+    LEGACY_SLEEP_BEFORE = 1
+
+
+async def _measure(scraper_class, base_url, query, runs):
+    timings = []
+    result_count = 0
+    for _ in range(runs):
+        scraper = scraper_class()
+        scraper.base_url = base_url
+        started = time.perf_counter()
+        try:
+            results = await scraper.search(query)
+        finally:
+            scraper.cleanup()
+        timings.append(time.perf_counter() - started)
+        result_count = len(results)
+    return {
+        "median_s": round(statistics.median(timings), 3),
+        "min_s": round(min(timings), 3),
+        "max_s": round(max(timings), 3),
+        "results": result_count,
+    }
+
+
+async def run(runs: int):
+    cases = [
+        ("noworzyn", "noworzyn/", LegacyNoworzynScraper, NoworzynScraper),
+        ("onleihe_koeln", "onleihe", LegacyOnleiheKoelnScraper, OnleiheKoelnScraper),
+    ]
+    report = {}
+    with FixtureServer() as server:
+        driver_pool.min_size = 1
+        driver_pool.start()
+        try:
+            for library, path, legacy_class, current_class in cases:
+                base_url = server.url(path)
+                report[library] = {
+                    "before": await _measure(legacy_class, base_url, "Kapitelman", runs),
+                    "after": await _measure(current_class, base_url, "Kapitelman", runs),
+                }
+        finally:
+            driver_pool.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Suchen pro Scraper und Variante")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.runs))
+
+    print(f"{'Bibliothek':<16}{'Variante':<10}{'Median':>10}{'Min':>10}{'Max':>10}{'Treffer':>10}")
+    for library, variants in report.items():
+        for variant, stats in variants.items():
+            print(f"{library:<16}{variant:<10}{stats['median_s']:>9.2f}s{stats['min_s']:>9.2f}s{stats['max_s']:>9.2f}s{stats['results']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
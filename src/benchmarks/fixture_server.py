@@ -0,0 +1,62 @@
+"""
+Lokaler HTTP-Server für die Fixture-Seiten der Benchmarks.
+
+Die Seiten unter `benchmarks/fixtures/` bilden die Markup-Struktur der
+Kataloge nach, auf die die Scraper zugreifen. So laufen die Benchmarks
+reproduzierbar und ohne Netzwerkzugriff.
+"""
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    # Katalog-URLs wie ".../quickSearch" haben keine Dateiendung
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, "": "text/html"}
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """
+    Startet einen ThreadingHTTPServer auf einem freien Port, z.B.
+
+        with FixtureServer() as server:
+            url = server.url("noworzyn/")
+    """
+
+    def __init__(self, directory: str = FIXTURES_DIR, host: str = "127.0.0.1", port: int = 0):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str = "") -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self) -> "FixtureServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def read_fixture(path: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, path), encoding="utf-8") as f:
+        return f.read()
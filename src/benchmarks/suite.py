@@ -0,0 +1,442 @@
+"""
+Offline-Benchmark- und Regressionssuite.
+
+Misst gegen die lokalen Fixture-Seiten (`FixtureServer`), ohne Netzwerkzugriff:
+
+- parse: Parsen und Extrahieren gespeicherter Ergebnisseiten je Scraper
+  (Median pro Seite, Treffer pro Sekunde, Spitzen-Speicher, Trefferzahl)
+- extract: nur die Extraktionsregeln (`EXTRACTOR`) je Scraper
+- search: End-to-End-Suche eines Scrapers gegen den lokalen Server
+  (HTTP-Weg von Noworzyn; mit `--browser` zusätzlich die Selenium-Suche der
+  Onleihe, benötigt Chrome/Chromedriver)
+- api: Durchsatz und Latenz von `POST /search` unter paralleler Last, einmal
+  mit Live-Suchen (verschiedene Begriffe) und einmal aus dem Cache (gleicher
+  Begriff); die Anwendung läuft dafür in einem lokalen uvicorn
+- startup: Kaltstart der API (Import von `api.main` in frischen Prozessen)
+- process: Speicher-Höchststand des Prozesses (max RSS)
+
+Die Ergebnisse werden als flache Kennzahlen ("parse.noworzyn.median_ms")
+gespeichert und mit `benchmarks/baseline.json` verglichen. Ist eine Kennzahl
+um mehr als die Toleranz schlechter als die Baseline oder weicht eine
+Trefferzahl ab, endet die Suite mit Exit-Code 1:
+
+    cd src
+    python -m benchmarks.suite                     # messen und vergleichen
+    python -m benchmarks.suite --update-baseline   # neue Baseline speichern
+
+Laufzeiten hängen von der Maschine und den Optionen ab. Die Baseline hält
+daher beides fest: Weichen die Optionen (--runs, --boilerplate, --requests,
+--concurrency) ab, verweigert die Suite den Vergleich (Exit-Code 2).
+Stammt die Baseline aus einer anderen Umgebung (Betriebssystem, Architektur,
+CPU-Anzahl, Python-Version, HTML-Parser), werden nur die exakten Kennzahlen
+(Treffer- und Fehlerzahlen) verglichen, die Laufzeiten nicht. Die Baseline
+wird auf der Maschine (bzw. dem CI-Runner) neu aufgenommen, auf der
+verglichen wird, mit denselben Optionen wie später beim Vergleich.
+"""
+import os
+import tempfile
+
+# Vor dem Import der Anwendung: Dateien der Caches und der Datenbank in ein
+# temporäres Verzeichnis legen, keinen Browser vorwärmen und das Rate-Limit
+# aufheben, damit der lokale Server und nicht die Drosselung gemessen wird.
+# Der HTTP-Cache bleibt aus, damit jede Live-Suche den Server erreicht.
+_WORKDIR = tempfile.mkdtemp(prefix="library-search-bench-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_WORKDIR, 'library_search.db')}",
+    "SEARCH_INDEX_PATH": os.path.join(_WORKDIR, "search_index.db"),
+    "HTTP_CACHE_PATH": os.path.join(_WORKDIR, "http_cache.db"),
+    "HTTP_CACHE_ENABLED": "false",
+    "COVER_CACHE_DIR": os.path.join(_WORKDIR, "cover_cache"),
+    "HARVEST_ENABLED": "false",
+    "ENRICH_IN_BACKGROUND": "false",
+    "DRIVER_POOL_MIN_SIZE": "0",
+    "RATE_LIMIT_DEFAULT": "100000",
+    "RATE_LIMIT_BURST": "100000",
+    "LIBRARY_RATE_LIMITS": "",
+})
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import socket
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import uvicorn
+
+from benchmarks import bench_extract, bench_parse, bench_startup
+from benchmarks.fixture_server import FixtureServer, read_fixture
+from scrapers.base_scraper import HTML_PARSER
+from scrapers.noworzyn_scraper import NoworzynScraper
+from scrapers.onleihe_koeln_scraper import OnleiheKoelnScraper
+from utils.http_client import http_client
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+QUERY = "Kapitelman"
+
+# Kennzahlen, die exakt übereinstimmen müssen (Korrektheit statt Laufzeit)
+_EXACT_SUFFIXES = (".results", ".errors")
+# Kennzahlen, bei denen größere Werte besser sind
+_HIGHER_IS_BETTER_SUFFIXES = ("_per_s",)
+# Unterhalb dieser absoluten Änderung gilt eine Abweichung als Messrauschen
+_NOISE_FLOORS = {"_ms": 1.0, "_kib": 64.0, "_mib": 8.0, "_per_s": 0.0}
+# Tail-Latenzen streuen stärker als Mediane und bekommen mehr Spielraum
+_TOLERANCE_FACTORS = {".p95_ms": 2.0}
+
+Metrics = Dict[str, float]
+
+
+def _local_scraper(scraper_class, base_url: str):
+    """Scraper-Klasse, die statt des Katalogs den lokalen Fixture-Server abfragt."""
+
+    class LocalScraper(scraper_class):
+        def __init__(self):
+            super().__init__()
+            self.base_url = base_url
+
+    LocalScraper.__name__ = scraper_class.__name__
+    return LocalScraper
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def bench_parsing(runs: int, boilerplate: int) -> Metrics:
+    metrics = {}
+    for library, scraper_class, parse, paths in bench_parse.CASES:
+        pages = [bench_parse.with_boilerplate(read_fixture(path), boilerplate) for path in paths]
+        stats = bench_parse.measure(scraper_class(), parse, pages, runs)
+        prefix = f"parse.{library}"
+        metrics[f"{prefix}.median_ms"] = stats["median_ms"]
+        metrics[f"{prefix}.items_per_s"] = round(stats["results"] / (stats["median_ms"] / 1000 * len(pages)))
+        metrics[f"{prefix}.peak_kib"] = stats["peak_kib"]
+        metrics[f"{prefix}.results"] = stats["results"]
+    return metrics
+
+
+def bench_extraction(runs: int) -> Metrics:
+    metrics = {}
+    for library, stats in bench_extract.run(runs).items():
+        metrics[f"extract.{library}.items_per_s"] = stats["items_per_s"]
+        metrics[f"extract.{library}.results"] = stats["results"]
+    return metrics
+
+
+async def _search_once(scraper_class, query: str, **kwargs) -> List[Dict[str, Any]]:
+    scraper = scraper_class()
+    try:
+        return await scraper.search(query, **kwargs)
+    finally:
+        scraper.cleanup()
+
+
+async def bench_search(server: FixtureServer, runs: int, browser: bool) -> Metrics:
+    cases = [("noworzyn", _local_scraper(NoworzynScraper, server.url("noworzyn/")), {"mode": "http"})]
+    if browser:
+        cases.append(("onleihe_koeln", _local_scraper(OnleiheKoelnScraper, server.url("onleihe")), {}))
+
+    metrics = {}
+    try:
+        for library, scraper_class, kwargs in cases:
+            # Erster Durchlauf wärmt Verbindungen (bzw. den Browser) auf und zählt nicht
+            results = await _search_once(scraper_class, QUERY, **kwargs)
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                await _search_once(scraper_class, QUERY, **kwargs)
+                timings.append(time.perf_counter() - started)
+
+            tracemalloc.start()
+            await _search_once(scraper_class, QUERY, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            prefix = f"search.{library}"
+            metrics[f"{prefix}.median_ms"] = round(statistics.median(timings) * 1000, 2)
+            metrics[f"{prefix}.p95_ms"] = round(_percentile(timings, 0.95) * 1000, 2)
+            metrics[f"{prefix}.peak_kib"] = round(peak / 1024, 1)
+            metrics[f"{prefix}.results"] = len(results)
+    finally:
+        # Die Verbindungen gehören zu diesem Event-Loop; die API öffnet eigene
+        await http_client.close()
+    return metrics
+
+
+class _AppServer:
+    """
+    Startet `api.main.app` in einem eigenen Thread (mit eigenem Event-Loop),
+    damit Last-Erzeugung und Anwendung sich nicht einen Loop teilen.
+    """
+
+    def __init__(self, app):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="on"))
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.socket]}, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "_AppServer":
+        self.thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("API-Server konnte nicht gestartet werden")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+        self.socket.close()
+
+
+async def _load(url: str, payloads: List[Dict[str, Any]], concurrency: int) -> Dict[str, float]:
+    latencies = []
+    errors = 0
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(session: aiohttp.ClientSession, payload: Dict[str, Any]):
+        nonlocal errors
+        async with limit:
+            started = time.perf_counter()
+            async with session.post(f"{url}/search", json=payload) as response:
+                body = await response.json()
+            latencies.append(time.perf_counter() - started)
+            if response.status != 200 or body.get("errors") or not body.get("total_count"):
+                errors += 1
+
+    async with aiohttp.ClientSession() as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(session, payload) for payload in payloads))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests_per_s": round(len(payloads) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "errors": errors,
+    }
+
+
+async def _bench_api_load(url: str, requests: int, concurrency: int) -> Metrics:
+    def payload(query: str) -> Dict[str, Any]:
+        return {"query": query, "libraries": ["noworzyn"], "filters": {"mode": "http"}}
+
+    metrics = {}
+    # Verschiedene Begriffe: jede Anfrage ist ein Cache-Fehlschlag und sucht live
+    live = await _load(url, [payload(f"{QUERY} {i}") for i in range(requests)], concurrency)
+    # Gleicher Begriff: nach der ersten Anfrage nur noch Cache-Treffer
+    await _load(url, [payload(QUERY)], 1)
+    cached = await _load(url, [payload(QUERY)] * requests, concurrency)
+    for scenario, stats in (("live", live), ("cached", cached)):
+        for name, value in stats.items():
+            metrics[f"api.search_{scenario}.{name}"] = value
+    return metrics
+
+
+def bench_api(server: FixtureServer, requests: int, concurrency: int) -> Metrics:
+    from api import main
+
+    main.LIBRARY_SCRAPERS["noworzyn"] = _local_scraper(NoworzynScraper, server.url("noworzyn/"))
+    with _AppServer(main.app) as app_server:
+        return asyncio.run(_bench_api_load(app_server.url, requests, concurrency))
+
+
+def bench_cold_start(runs: int) -> Metrics:
+    stats = bench_startup.run(runs)
+    metrics = {"startup.import_ms": stats["import_median_ms"], "startup.modules": stats["modules"]}
+    if stats["max_rss_mib"] is not None:
+        metrics["startup.max_rss_mib"] = stats["max_rss_mib"]
+    return metrics
+
+
+def _max_rss_mib() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # z.B. Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KiB, macOS Bytes
+    return round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run(args) -> Metrics:
+    metrics = bench_cold_start(max(3, args.runs // 4))
+    metrics.update(bench_parsing(args.runs, args.boilerplate))
+    metrics.update(bench_extraction(args.runs * 10))
+    with FixtureServer() as server:
+        metrics.update(asyncio.run(bench_search(server, args.runs, args.browser)))
+        metrics.update(bench_api(server, args.requests, args.concurrency))
+    max_rss = _max_rss_mib()
+    if max_rss is not None:
+        metrics["process.max_rss_mib"] = max_rss
+    return metrics
+
+
+def environment() -> Dict[str, Any]:
+    """Merkmale der Umgebung, von denen die gemessenen Laufzeiten abhängen."""
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": ".".join(platform.python_version_tuple()[:2]),
+        "parser": HTML_PARSER,
+    }
+
+
+def _options(args) -> Dict[str, Any]:
+    return {
+        "runs": args.runs,
+        "boilerplate": args.boilerplate,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+    }
+
+
+def _differences(expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    return [
+        f"{name}: Baseline {expected.get(name)}, aktuell {actual.get(name)}"
+        for name in sorted(set(expected) | set(actual)) if expected.get(name) != actual.get(name)
+    ]
+
+
+def compare(baseline: Metrics, current: Metrics, tolerance: float, timings: bool = True) -> List[Dict[str, Any]]:
+    """
+    Vergleicht alle Kennzahlen der Baseline mit den aktuellen Werten; mit
+    `timings=False` nur die exakten (Treffer- und Fehlerzahlen).
+    Status: ok, regression, improved oder skipped (nicht gemessen, z.B. ohne
+    --browser, bzw. nicht vergleichbar).
+    """
+    rows = []
+    for name, expected in baseline.items():
+        actual = current.get(name)
+        row = {"metric": name, "baseline": expected, "current": actual, "change": None, "status": "ok"}
+        rows.append(row)
+        if actual is None:
+            row["status"] = "skipped"
+            continue
+        if name.endswith(_EXACT_SUFFIXES):
+            row["status"] = "ok" if actual == expected else "regression"
+            continue
+        if not timings:
+            row["status"] = "skipped"
+            continue
+        if expected:
+            row["change"] = (actual - expected) / expected
+        worse = expected - actual if name.endswith(_HIGHER_IS_BETTER_SUFFIXES) else actual - expected
+        floor = next((value for suffix, value in _NOISE_FLOORS.items() if name.endswith(suffix)), 0.0)
+        if abs(worse) <= floor or not expected:
+            continue
+        allowed = tolerance * abs(expected) * next(
+            (factor for suffix, factor in _TOLERANCE_FACTORS.items() if name.endswith(suffix)), 1.0
+        )
+        if worse > allowed:
+            row["status"] = "regression"
+        elif -worse > allowed:
+            row["status"] = "improved"
+    return rows
+
+
+def _print_report(metrics: Metrics, rows: Optional[List[Dict[str, Any]]]):
+    if rows is None:
+        print(f"{'Kennzahl':<40}{'Wert':>14}")
+        for name, value in metrics.items():
+            print(f"{name:<40}{value:>14}")
+        return
+    print(f"{'Kennzahl':<40}{'Baseline':>14}{'Aktuell':>14}{'Änderung':>10}  Status")
+    for row in rows:
+        change = f"{row['change']:+.0%}" if row["change"] is not None else ""
+        current = row["current"] if row["current"] is not None else "-"
+        print(f"{row['metric']:<40}{row['baseline']:>14}{current:>14}{change:>10}  {row['status']}")
+    new = [name for name in metrics if all(row["metric"] != name for row in rows)]
+    if new:
+        print(f"Nicht in der Baseline: {', '.join(new)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="Durchläufe pro Parse- und Suchmessung")
+    parser.add_argument("--boilerplate", type=int, default=1000, help="Navigationseinträge vor den Treffern (siehe bench_parse)")
+    parser.add_argument("--requests", type=int, default=200, help="Anfragen pro API-Lastszenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="Gleichzeitige Anfragen im API-Lasttest")
+    parser.add_argument("--browser", action="store_true", help="Auch die Selenium-Suche messen (benötigt Chrome)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline-Datei (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte relative Verschlechterung, z.B. 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="Aktuelle Werte als Baseline speichern")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        # Mit anderen Optionen gemessene Werte sind nicht vergleichbar; vor dem Messen abbrechen
+        differences = _differences(baseline["meta"].get("options", {}), _options(args))
+        if differences:
+            print("Optionen weichen von der Baseline ab, kein Vergleich möglich:")
+            for difference in differences:
+                print(f"  {difference}")
+            print("Mit denselben Optionen messen oder die Baseline mit --update-baseline neu aufnehmen")
+            shutil.rmtree(_WORKDIR, ignore_errors=True)
+            sys.exit(2)
+
+    try:
+        metrics = run(args)
+    finally:
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "environment": environment(),
+            "options": _options(args),
+        },
+        "metrics": metrics,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        _print_report(metrics, None)
+        print(f"Baseline gespeichert: {args.baseline}")
+        return
+
+    if baseline is None:
+        _print_report(metrics, None)
+        print(f"Keine Baseline unter {args.baseline}; mit --update-baseline anlegen")
+        return
+
+    differences = _differences(baseline["meta"].get("environment", {}), environment())
+    rows = compare(baseline["metrics"], metrics, args.tolerance, timings=not differences)
+    _print_report(metrics, rows)
+    if differences:
+        print("Baseline stammt aus einer anderen Umgebung, Laufzeiten werden nicht verglichen:")
+        for difference in differences:
+            print(f"  {difference}")
+        print("Für einen Laufzeitvergleich die Baseline auf dieser Maschine mit --update-baseline neu aufnehmen")
+    regressions = [row["metric"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"Regressionen (Toleranz {args.tolerance:.0%}): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
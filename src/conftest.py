@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# Before the application is imported: keep databases and caches of the test
+# run in a temporary directory, don't prewarm browsers and lift the rate limit
+_WORKDIR = tempfile.mkdtemp(prefix="library-search-test-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_WORKDIR, 'library_search.db')}",
+    "SEARCH_INDEX_PATH": os.path.join(_WORKDIR, "search_index.db"),
+    "HTTP_CACHE_PATH": os.path.join(_WORKDIR, "http_cache.db"),
+    "COVER_CACHE_DIR": os.path.join(_WORKDIR, "cover_cache"),
+    "HARVEST_ENABLED": "false",
+    "ENRICH_IN_BACKGROUND": "false",
+    "DRIVER_POOL_MIN_SIZE": "0",
+    "RATE_LIMIT_DEFAULT": "0",
+})
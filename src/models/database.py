@@ -0,0 +1,44 @@
+"""
+Datenbankanbindung über SQLAlchemy.
+"""
+import threading
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+
+from utils import config
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Gibt die prozessweite Engine zurück und legt beim ersten Aufruf die Tabellen an.
+    """
+    global _engine, _session_factory
+    if _engine is None:
+        # Erste Zugriffe kommen oft gleichzeitig aus mehreren Worker-Threads
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(config.DATABASE_URL)
+                Base.metadata.create_all(engine)
+                _session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+                _engine = engine
+    return _engine
+
+
+def get_session():
+    """
+    Erzeugt eine neue Session, z.B. `with get_session() as session: ...`.
+    """
+    get_engine()
+    return _session_factory()
@@ -0,0 +1,17 @@
+from sqlalchemy import Float, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.database import Base
+
+
+class BookDetails(Base):
+    """
+    Auf der Detailseite eines Treffers gefundene Zusatzangaben (ISBN, Jahr, Verlag, ...).
+    """
+    __tablename__ = "book_details"
+
+    key: Mapped[str] = mapped_column(String(1024), primary_key=True)  # "<bibliothek>|<detail-url>"
+    library: Mapped[str] = mapped_column(String(64), index=True)
+    url: Mapped[str] = mapped_column(String(1024))
+    data: Mapped[str] = mapped_column(Text)  # JSON-kodierte Felder; leer, wenn die Seite nichts ergab
+    fetched_at: Mapped[float] = mapped_column(Float)
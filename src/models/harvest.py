@@ -0,0 +1,30 @@
+from sqlalchemy import Float, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.database import Base
+
+
+class HarvestedResult(Base):
+    """
+    Vom Harvester im Hintergrund vorab geladene Treffer einer Anfrage.
+    """
+    __tablename__ = "harvested_results"
+
+    key: Mapped[str] = mapped_column(String(512), primary_key=True)  # utils.cache.make_cache_key
+    library: Mapped[str] = mapped_column(String(64), index=True)
+    query: Mapped[str] = mapped_column(String(256))
+    results: Mapped[str] = mapped_column(Text)  # JSON-kodierte Liste von Treffern
+    harvested_at: Mapped[float] = mapped_column(Float)
+
+
+class QueryLogEntry(Base):
+    """
+    Häufigkeit interaktiver Suchanfragen pro Bibliothek; Grundlage für die Top-N-Anfragen des Harvesters.
+    """
+    __tablename__ = "query_log"
+
+    key: Mapped[str] = mapped_column(String(320), primary_key=True)  # "<bibliothek>|<normalisierte anfrage>"
+    library: Mapped[str] = mapped_column(String(64), index=True)
+    query: Mapped[str] = mapped_column(String(256))
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    last_seen: Mapped[float] = mapped_column(Float, index=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Float, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.database import Base
+
+
+class SearchCacheEntry(Base):
+    """
+    Persistierte Suchergebnisse einer Bibliothek für eine normalisierte Anfrage.
+    """
+    __tablename__ = "search_cache"
+
+    key: Mapped[str] = mapped_column(String(512), primary_key=True)
+    library: Mapped[str] = mapped_column(String(64), index=True)
+    results: Mapped[str] = mapped_column(Text)  # JSON-kodierte Liste von Treffern
+    created_at: Mapped[float] = mapped_column(Float)
@@ -1,59 +1,612 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-import requests
-from bs4 import BeautifulSoup
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+import asyncio
+import json
 import logging
+import random
+import re
+import threading
+import time
+import aiohttp
+import soupsieve
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from utils import config
+from utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from utils.driver_pool import driver_pool
+from utils.executor import scraper_executor
+from utils.http_cache import REQUESTS as HTTP_CACHE_REQUESTS, cache_key, http_cache, is_cacheable_request
+from utils.http_client import HttpClient, HttpError, HttpResponse, http_client
+from utils.merge import normalize_isbn
+from utils.metrics import histogram
+from utils.rate_limiter import rate_limiter
+
+def _default_parser() -> str:
+    """
+    lxml ist deutlich schneller als der eingebaute Parser, aber optional.
+    """
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+# Parser-Backend für BeautifulSoup, über HTML_PARSER festlegbar
+HTML_PARSER = config.HTML_PARSER or _default_parser()
+
+
+def compile_selectors(selectors: Dict[str, str]) -> Dict[str, soupsieve.SoupSieve]:
+    """
+    Kompiliert CSS-Selektoren einmalig (z.B. als Klassenattribut eines Scrapers),
+    statt sie bei jedem `select_one` pro Treffer neu zu parsen.
+    """
+    return {name: soupsieve.compile(css) for name, css in selectors.items()}
+
+
+# stage: driver_acquire, navigate, wait, http, parse, extract (sowie scraperspezifische wie modals)
+STAGE_SECONDS = histogram("scraper_stage_seconds", "Dauer einzelner Abschnitte einer Suche im Scraper", ["library", "stage"])
+
+
+class SearchCancelled(Exception):
+    """Die Suche wurde abgebrochen, weil ihr Zeitbudget abgelaufen ist."""
+
+
+class LibraryTimeout(Exception):
+    """Zeitüberschreitung bei der Bibliothek selbst (z.B. Lesetimeout), nicht des Zeitbudgets."""
+
+
+# HTTP-Status, bei denen sich ein erneuter Versuch lohnt
+_TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return error.status in _TRANSIENT_STATUS
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+
+# Beschriftungen auf Detailseiten ("ISBN: ...", "Verlag: ...") und das Feld, das sie belegen
+_DETAIL_LABELS = (
+    ('isbn', re.compile(r'^(isbn(-1[03])?|ean|gtin)\b', re.IGNORECASE)),
+    ('year', re.compile(r'^(erscheinungs(jahr|datum|termin)|jahr|veröffentlicht|publication date|published)', re.IGNORECASE)),
+    ('publisher', re.compile(r'^(verlag|publisher)', re.IGNORECASE)),
+)
+_YEAR = re.compile(r'\b(1[5-9]\d\d|20\d\d)\b')
+
+# Auf Detailseiten nur JSON-LD und typische Beschriftung/Wert-Strukturen parsen
+_DETAILS_SCOPE = SoupStrainer(['script', 'dl', 'table', 'ul'])
+
+
+def _clean_detail(field: str, value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get('name')
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None:
+        return None
+    value = ' '.join(str(value).split())
+    if field == 'isbn':
+        return normalize_isbn(value)
+    if field == 'year':
+        match = _YEAR.search(value)
+        return match.group(1) if match else None
+    return value or None
+
+
+# schema.org ItemAvailability -> Anzeige
+_SCHEMA_AVAILABILITY = {
+    'instock': 'verfügbar',
+    'instoreonly': 'im Laden verfügbar',
+    'limitedavailability': 'begrenzt verfügbar',
+    'onlineonly': 'online verfügbar',
+    'outofstock': 'nicht verfügbar',
+    'soldout': 'nicht verfügbar',
+    'discontinued': 'nicht mehr lieferbar',
+    'preorder': 'vorbestellbar',
+    'presale': 'vorbestellbar',
+    'backorder': 'nachbestellbar',
+}
+
+
+def _schema_availability(value: str) -> str:
+    # "https://schema.org/InStock" bzw. "InStock" übersetzen, sonstigen Text unverändert lassen
+    name = value.rstrip('/').rsplit('/', 1)[-1]
+    return _SCHEMA_AVAILABILITY.get(name.lower(), value)
+
+
+def _json_ld_nodes(data: Any):
+    if isinstance(data, list):
+        for entry in data:
+            yield from _json_ld_nodes(entry)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _json_ld_nodes(data['@graph'])
+
+
+# JavaScript-Bausteine für die Wartebedingungen der Selenium-Scraper
+_JS_SELECTOR_PRESENT = "return document.querySelector(arguments[0]) !== null;"
+_JS_MARK_PAGE = """
+window.__scraperMark = arguments[0];
+window.__scraperMutated = false;
+new MutationObserver(function () { window.__scraperMutated = true; })
+    .observe(document.documentElement, {childList: true, subtree: true});
+"""
+_JS_PAGE_CHANGED = "return window.__scraperMark !== arguments[0] || window.__scraperMutated === true;"
+_JS_DOM_QUIET_MS = """
+if (!window.__scraperMutations) {
+    window.__scraperMutations = {last: performance.now()};
+    new MutationObserver(function () { window.__scraperMutations.last = performance.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return performance.now() - window.__scraperMutations.last;
+"""
+_JS_NETWORK_IDLE_MS = """
+var entries = performance.getEntriesByType('resource');
+var last = 0;
+for (var i = 0; i < entries.length; i++) {
+    last = Math.max(last, entries[i].responseEnd);
+}
+var nav = performance.getEntriesByType('navigation')[0];
+if (nav) {
+    last = Math.max(last, nav.responseEnd);
+}
+return performance.now() - last;
+"""
+_JS_VISIBLE_ELEMENTS = """
+var result = [];
+arguments[0].forEach(function (selector) {
+    document.querySelectorAll(selector).forEach(function (el) {
+        if (el.offsetParent !== null || el.getClientRects().length > 0) {
+            result.push(el);
+        }
+    });
+});
+return result;
+"""
+
 
 class BaseScraper(ABC):
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, http: Optional[HttpClient] = None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.http = http or http_client
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Name in LIBRARY_SCRAPERS, von api.main gesetzt; bestimmt das Rate-Limit
+        self.library: Optional[str] = None
+        # Zeitbudget und Abbruch: api.main setzt `deadline` (time.monotonic()) und ruft
+        # bei Ablauf `cancel()` auf. Bis dahin gesammelte Treffer stehen in `partial_results`.
+        self.deadline: Optional[float] = None
+        self.partial_results: List[Dict[str, Any]] = []
+        self.truncated = False
+        self._cancelled = threading.Event()
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._page_mark = 0
 
     @abstractmethod
     async def search(self, query: str, **kwargs) -> List[Dict[str, Any]]:
         """
         Führt eine Suche in der Bibliothek durch.
-        
+
         Args:
             query: Der Suchbegriff
             **kwargs: Weitere Suchparameter (z.B. Filter)
-            
+
         Returns:
             Liste von gefundenen Büchern/Medien als Dictionaries
         """
         pass
 
-    def _make_request(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
+    # Weitere Hosts, auf denen Detailseiten der Bibliothek liegen (neben dem Host von base_url)
+    DETAIL_HOSTS: Sequence[str] = ()
+
+    def owns_url(self, url: str) -> bool:
         """
-        Führt einen HTTP-Request durch mit Fehlerbehandlung und Retry-Logik.
+        Prüft, ob `url` eine Seite der Bibliothek ist: http(s), Host von
+        `base_url` oder aus `DETAIL_HOSTS`, Standardport oder der Port von
+        `base_url`. Von Clients übergebene URLs werden nur dann geladen.
         """
+        parsed = urlparse(url)
+        base = urlparse(self.base_url)
         try:
-            response = self.session.request(method, url, **kwargs)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Fehler beim Request zu {url}: {str(e)}")
-            raise
+            port = parsed.port
+        except ValueError:
+            return False
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            return False
+        if parsed.hostname not in {base.hostname, *self.DETAIL_HOSTS}:
+            return False
+        return port is None or port in (80, 443, base.port)
+
+    async def get_details(self, url: str) -> Dict[str, Any]:
+        """
+        Lädt die Detailseite eines Treffers per HTTP und extrahiert zusätzliche
+        Metadaten (siehe `parse_details`).
+        """
+        response = await self._make_request(url)
+        return await self._run_blocking(self.parse_details, response.text)
 
-    def _parse_html(self, html: str) -> BeautifulSoup:
+    def parse_details(self, html: str) -> Dict[str, Any]:
         """
-        Parsed HTML mit BeautifulSoup.
+        Extrahiert ISBN, Jahr und Verlag aus einer Detailseite: zuerst aus
+        schema.org-Angaben (JSON-LD), dann aus Beschriftung/Wert-Paaren
+        (dt/dd, th/td, "Verlag: ..."). Scraper mit bekanntem Seitenaufbau
+        können die Methode überschreiben.
         """
-        return BeautifulSoup(html, 'html.parser')
+        soup = self._parse_html(html, _DETAILS_SCOPE)
+        data: Dict[str, Any] = {}
+
+        def put(field: str, value: Any):
+            if field not in data:
+                value = _clean_detail(field, value)
+                if value:
+                    data[field] = value
+
+        for script in soup.find_all('script', type='application/ld+json'):
+            try:
+                nodes = list(_json_ld_nodes(json.loads(script.string or '')))
+            except ValueError:
+                continue
+            for node in nodes:
+                put('isbn', node.get('isbn') or node.get('gtin13'))
+                put('year', node.get('datePublished'))
+                put('publisher', node.get('publisher'))
+
+        pairs = [(dt.get_text(), dt.find_next_sibling('dd')) for dt in soup.find_all('dt')]
+        pairs += [(th.get_text(), th.find_next_sibling('td')) for th in soup.find_all('th')]
+        for li in soup.find_all('li'):
+            label, _, value = li.get_text(' ').partition(':')
+            if value:
+                pairs.append((label, value))
+        for label, value in pairs:
+            if value is None:
+                continue
+            label = ' '.join(label.split()).rstrip(':')
+            for field, pattern in _DETAIL_LABELS:
+                if pattern.match(label):
+                    put(field, value if isinstance(value, str) else value.get_text(' '))
+        return data
+
+    # Verfügbarkeitsangabe auf Detailseiten; Scraper mit bekanntem Seitenaufbau überschreiben den Selektor
+    AVAILABILITY_SELECTOR = "[itemprop='availability'], .availability, .status"
+
+    async def get_availability(self, url: str) -> Optional[str]:
+        """
+        Lädt die Detailseite eines Treffers frisch (am HTTP-Cache vorbei) und
+        liefert nur die aktuelle Verfügbarkeit.
+        """
+        response = await self._make_request(url, use_cache=False)
+        return await self._run_blocking(self.parse_availability, response.text)
+
+    def parse_availability(self, html: str) -> Optional[str]:
+        """
+        Verfügbarkeit aus schema.org-Angaben (JSON-LD `offers.availability`)
+        oder dem Element zu `AVAILABILITY_SELECTOR`.
+        """
+        soup = self._parse_html(html)
+        for script in soup.find_all('script', type='application/ld+json'):
+            try:
+                nodes = list(_json_ld_nodes(json.loads(script.string or '')))
+            except ValueError:
+                continue
+            for node in nodes:
+                offers = node.get('offers')
+                for offer in offers if isinstance(offers, list) else [offers]:
+                    if isinstance(offer, dict) and offer.get('availability'):
+                        return _schema_availability(str(offer['availability']))
+        element = soup.select_one(self.AVAILABILITY_SELECTOR)
+        if element is None:
+            return None
+        # <link itemprop="availability" href="https://schema.org/InStock"> hat keinen Text
+        value = ' '.join(element.get_text(' ').split()) or element.get('content') or element.get('href')
+        return _schema_availability(value) if value else None
+
+    async def _make_request(
+        self, url: str, method: str = 'GET', retries: Optional[int] = None, use_cache: bool = True, **kwargs
+    ) -> HttpResponse:
+        """
+        Führt einen asynchronen HTTP-Request über den gemeinsamen Client durch.
+
+        Vorübergehende Fehler (Verbindungsfehler, Timeouts, HTTP 429/5xx) werden
+        bei GET/HEAD bis zu `retries` Mal (Standard: HTTP_RETRIES) mit
+        exponentiellem Backoff und Jitter wiederholt, solange das Zeitbudget
+        reicht. Ist die Bibliothek gesperrt, schlägt der Request sofort fehl.
+
+        GET-Requests ohne Cookies laufen über den HTTP-Cache: frische Antworten
+        kommen ohne Netzzugriff, abgelaufene werden bedingt nachgeladen.
+        """
+        cached = None
+        key = None
+        if use_cache and config.HTTP_CACHE_ENABLED and is_cacheable_request(method, kwargs):
+            key = cache_key(url, kwargs.get('params'))
+            cached = await scraper_executor.run_blocking(http_cache.get, key)
+            if cached is not None and cached.fresh:
+                HTTP_CACHE_REQUESTS.inc(result="hit")
+                return cached.response
+            if cached is not None:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **cached.conditional_headers()}
+        else:
+            HTTP_CACHE_REQUESTS.inc(result="bypass")
+
+        breaker = circuit_breakers.get(self.library)
+        if breaker is not None and breaker.is_open():
+            raise CircuitOpenError(self.library, breaker.retry_in())
+
+        if retries is None:
+            retries = config.HTTP_RETRIES if method.upper() in ('GET', 'HEAD') else 0
+
+        attempt = 0
+        while True:
+            await self._throttle(url)
+            try:
+                with self._stage("http"):
+                    response = await self.http.request(method, url, **kwargs)
+                response.raise_for_status()
+            except Exception as e:
+                if attempt >= retries or not _is_transient(e):
+                    self.logger.error(f"Fehler beim Request zu {url}: {str(e)}")
+                    raise
+                delay = self._backoff(attempt, getattr(e, 'retry_after', None))
+                if self._remaining(delay) < delay:
+                    self.logger.error(f"Fehler beim Request zu {url}, Zeitbudget reicht für keinen weiteren Versuch: {str(e)}")
+                    raise
+                attempt += 1
+                self.logger.warning(f"Request zu {url} fehlgeschlagen ({str(e) or type(e).__name__}), Versuch {attempt + 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                self._check_cancelled()
+                continue
+
+            if key is None:
+                return response
+            try:
+                cached_response = await self._cache_response(key, response)
+            except Exception as e:
+                # Ein Fehler beim Schreiben des Caches (Platte, SQLite) macht den Abruf nicht ungültig
+                self.logger.warning(f"HTTP-Cache für {url} konnte nicht aktualisiert werden: {str(e)}")
+                return cached.response if response.status == 304 and cached is not None else response
+            if cached_response is not None or cached is None:
+                return cached_response or response
+            # 304, aber der Eintrag wurde inzwischen verdrängt: einmal ohne bedingte Header laden
+            self.logger.info(f"Cache-Eintrag für {url} nicht mehr vorhanden, lade vollständig neu")
+            conditional = cached.conditional_headers()
+            kwargs['headers'] = {name: value for name, value in kwargs['headers'].items() if name not in conditional}
+            cached = None
+
+    async def _cache_response(self, key: str, response: HttpResponse) -> Optional[HttpResponse]:
+        """
+        Speichert eine geladene Antwort bzw. liefert bei `304 Not Modified` die
+        gespeicherte. Returns None, wenn der Eintrag zu einem 304 fehlt.
+        """
+        if response.status == 304:
+            cached = await scraper_executor.run_blocking(http_cache.refresh, key, response.headers)
+            if cached is None:
+                return None
+            HTTP_CACHE_REQUESTS.inc(result="revalidated")
+            return cached
+        HTTP_CACHE_REQUESTS.inc(result="miss")
+        await scraper_executor.run_blocking(http_cache.set, key, response)
+        return response
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Wartezeit vor dem nächsten Versuch: "Full Jitter" über ein exponentiell
+        wachsendes Intervall, mindestens aber ein gesendetes Retry-After.
+        """
+        delay = random.uniform(0, min(config.HTTP_RETRY_MAX_DELAY, config.HTTP_RETRY_BACKOFF * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, config.HTTP_RETRY_MAX_DELAY))
+        return delay
+
+    @contextmanager
+    def _stage(self, stage: str):
+        """
+        Misst einen Abschnitt der Suche (z.B. "navigate", "wait", "parse",
+        "extract") für das Histogramm `scraper_stage_seconds`.
+        """
+        with STAGE_SECONDS.time(library=self.library or self.__class__.__name__, stage=stage):
+            yield
+
+    def _acquire_driver(self):
+        """Leiht einen WebDriver aus dem Pool (blockiert, ggf. bis einer frei ist)."""
+        with self._stage("driver_acquire"):
+            return driver_pool.acquire()
+
+    async def _navigate(self, url: str):
+        """Lädt `url` im geliehenen WebDriver."""
+        with self._stage("navigate"):
+            await self._run_blocking(self.driver.get, url)
+
+    async def _throttle(self, url: Optional[str] = None):
+        """
+        Wartet auf das Rate-Limit des Hosts; Selenium-Scraper rufen dies vor
+        jedem Seitenaufruf (Navigation, Absenden, Blättern) auf.
+        """
+        await rate_limiter.acquire(url or self.base_url, self.library)
+
+    async def _run_blocking(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Lagert blockierende Arbeit (Selenium, Parsing) in den Thread-Pool aus.
+        Nach einem Abbruch wird keine weitere Arbeit mehr gestartet.
+        """
+        self._check_cancelled()
+        with self._inflight_lock:
+            self._inflight += 1
+        return await scraper_executor.run_blocking(self._tracked, func, *args, **kwargs)
+
+    def _tracked(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        # Läuft im Worker-Thread; zählt erst nach Ende des Aufrufs herunter, auch
+        # wenn die aufrufende Coroutine bereits abgebrochen wurde.
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+
+    @property
+    def busy(self) -> bool:
+        """
+        True, solange noch ein ausgelagerter Aufruf dieses Scrapers im Thread-Pool läuft.
+        """
+        return self._inflight > 0
+
+    def cancel(self):
+        """
+        Bricht die Suche kooperativ ab: laufende Schritte enden, neue starten nicht mehr.
+        """
+        self._cancelled.set()
+
+    def _check_cancelled(self):
+        if self._cancelled.is_set():
+            raise SearchCancelled(f"Suche in {self.__class__.__name__} abgebrochen")
+
+    def _remaining(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Begrenzt eine Wartezeit auf das verbleibende Zeitbudget der Suche.
+        """
+        if self.deadline is None:
+            return timeout
+        remaining = max(0.0, self.deadline - time.monotonic())
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def _deadline_reached(self) -> bool:
+        return self._cancelled.is_set() or (self.deadline is not None and time.monotonic() >= self.deadline)
+
+    # ------------------------------------------------------------------
+    # Wartebedingungen für Selenium-Scraper
+    #
+    # Scraper deklarieren in READY_CONDITIONS pro Schritt (z.B. "home", "results")
+    # eine Liste von Bedingungen, die nacheinander erfüllt sein müssen:
+    #   ("document_ready",)                 document.readyState == "complete"
+    #   ("page_changed", timeout)           neues Dokument oder DOM-Änderung seit _mark_page()
+    #   ("selector", css, timeout)          ein Element passt auf den Selektor
+    #   ("dom_quiet", quiet_ms, timeout)    keine DOM-Mutation seit quiet_ms
+    #   ("network_idle", idle_ms, timeout)  keine abgeschlossene Ressource seit idle_ms
+    # Die optionalen Timeouts begrenzen einzelne Bedingungen; alle Wartezeiten
+    # werden zusätzlich auf das Zeitbudget der Suche gekürzt. Eine nicht erfüllte
+    # Bedingung wird protokolliert, bricht die Suche aber nicht ab.
+    # ------------------------------------------------------------------
+
+    READY_CONDITIONS: Dict[str, Sequence[Tuple[Any, ...]]] = {}
+    WAIT_POLL_INTERVAL = 0.1
+
+    # Bedingung -> (Wartemethode, Anzahl Argumente vor dem optionalen Timeout)
+    _WAIT_CONDITIONS = {
+        "document_ready": ("_wait_for_document_ready", 0),
+        "page_changed": ("_wait_for_page_changed", 0),
+        "selector": ("_wait_for_selector", 1),
+        "dom_quiet": ("_wait_for_dom_quiet", 1),
+        "network_idle": ("_wait_for_network_idle", 1),
+    }
+
+    async def _wait_until(self, predicate: Callable[[], Any], timeout: float = 20) -> bool:
+        """
+        Prüft `predicate` im Thread-Pool, bis es wahr ist oder `timeout` abläuft.
+        """
+        end = time.monotonic() + self._remaining(timeout)
+        while True:
+            try:
+                if await self._run_blocking(predicate):
+                    return True
+            except SearchCancelled:
+                raise
+            except Exception as e:
+                self.logger.debug(f"Wartebedingung fehlgeschlagen: {str(e)}")
+            if time.monotonic() >= end:
+                return False
+            await asyncio.sleep(self.WAIT_POLL_INTERVAL)
+
+    async def _wait_for_document_ready(self, timeout: float = 20) -> bool:
+        return await self._wait_until(
+            lambda: self.driver.execute_script("return document.readyState") == "complete", timeout
+        )
+
+    async def _wait_for_selector(self, selector: str, timeout: float = 20) -> bool:
+        return await self._wait_until(
+            lambda: self.driver.execute_script(_JS_SELECTOR_PRESENT, selector), timeout
+        )
+
+    async def _wait_for_dom_quiet(self, quiet_ms: float = 300, timeout: float = 10) -> bool:
+        return await self._wait_until(
+            lambda: self.driver.execute_script(_JS_DOM_QUIET_MS) >= quiet_ms, timeout
+        )
+
+    async def _wait_for_network_idle(self, idle_ms: float = 500, timeout: float = 10) -> bool:
+        return await self._wait_until(
+            lambda: self.driver.execute_script(_JS_NETWORK_IDLE_MS) >= idle_ms, timeout
+        )
+
+    async def _mark_page(self):
+        """
+        Markiert die aktuelle Seite, damit ("page_changed",) nach einem Klick oder
+        Absenden erkennt, dass eine neue Seite geladen oder das DOM aktualisiert wurde.
+        """
+        self._page_mark += 1
+        await self._run_blocking(self.driver.execute_script, _JS_MARK_PAGE, self._page_mark)
+
+    async def _wait_for_page_changed(self, timeout: float = 10) -> bool:
+        mark = self._page_mark
+        return await self._wait_until(
+            lambda: self.driver.execute_script(_JS_PAGE_CHANGED, mark), timeout
+        )
+
+    async def _wait_for_step(self, step: str, timeout: float = 20) -> bool:
+        """
+        Wartet, bis alle für `step` deklarierten Bedingungen erfüllt sind.
+        """
+        started = time.monotonic()
+        ready = True
+        with self._stage("wait"):
+            for kind, *args in self.READY_CONDITIONS.get(step, (("document_ready",),)):
+                method_name, arity = self._WAIT_CONDITIONS[kind]
+                remaining = max(0.0, timeout - (time.monotonic() - started))
+                # Ein optionales bedingungsspezifisches Timeout folgt auf die Argumente
+                if len(args) > arity:
+                    remaining = min(remaining, args[arity])
+                if not await getattr(self, method_name)(*args[:arity], timeout=remaining):
+                    self.logger.debug(f"Bedingung {kind}{tuple(args[:arity])} für Schritt '{step}' nicht erfüllt")
+                    ready = False
+        self.logger.debug(f"Schritt '{step}' nach {time.monotonic() - started:.2f}s bereit")
+        return ready
+
+    def _visible_elements(self, selectors: Sequence[str]) -> list:
+        """
+        Liefert alle sichtbaren Elemente zu den Selektoren in einem einzigen
+        Browser-Aufruf, ohne auf nicht vorhandene Elemente zu warten.
+        """
+        return self.driver.execute_script(_JS_VISIBLE_ELEMENTS, list(selectors)) or []
+
+    # Parser-Backend dieses Scrapers; None = HTML_PARSER
+    PARSER: Optional[str] = None
+
+    def _parse_html(self, html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """
+        Parsed HTML mit BeautifulSoup. Mit `parse_only` wird nur der passende
+        Ausschnitt (z.B. die Ergebniscontainer) als Baum aufgebaut.
+        """
+        with self._stage("parse"):
+            return BeautifulSoup(html, self.PARSER or HTML_PARSER, parse_only=parse_only)
+
+    def cleanup(self):
+        """
+        Gibt belegte Ressourcen (z.B. einen geliehenen WebDriver) wieder frei.
+        """
+        pass
 
     @abstractmethod
-    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def extract_metadata(self, soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
         """
-        Extrahiert Metadaten aus der HTML-Struktur.
-        
+        Extrahiert Metadaten aus der HTML-Struktur eines Treffers. Scraper mit
+        deklarativen Regeln erben die Methode von
+        `scrapers.extraction.RuleExtraction`.
+
         Args:
-            soup: BeautifulSoup Objekt der HTML-Seite
-            
+            soup: BeautifulSoup Objekt des Treffers
+
         Returns:
-            Dictionary mit Metadaten (Titel, Autor, Jahr, etc.)
+            Dictionary mit Metadaten (Titel, Autor, Jahr, etc.) oder None,
+            wenn Pflichtfelder fehlen
         """
-        pass 
\ No newline at end of file
+        pass
@@ -1,9 +1,25 @@
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import asyncio
-from scrapers.base_scraper import BaseScraper
+from scrapers.base_scraper import BaseScraper, compile_selectors
+from scrapers.extraction import RuleExtraction, compile_rules
+
+class ExampleLibraryScraper(RuleExtraction, BaseScraper):
+    # Nur die Trefferliste parsen; Selektoren einmalig kompilieren (Beispiel-Selektoren)
+    RESULTS_SCOPE = SoupStrainer(class_='search-result-item')
+    SELECTORS = compile_selectors({
+        'item': '.search-result-item',
+    })
+    # Felder eines Treffers (Beispiel-Selektoren)
+    EXTRACTOR = compile_rules({
+        'title': '.title',
+        'author': '.author',
+        'year': '.year',
+        'isbn': '.isbn',
+        'availability': '.availability',
+        'location': '.location',
+    })
 
-class ExampleLibraryScraper(BaseScraper):
     def __init__(self):
         super().__init__("https://example-library.com")  # Beispiel-URL
         
@@ -16,47 +32,29 @@ class ExampleLibraryScraper(BaseScraper):
         
         try:
             # Request durchführen
-            response = self._make_request(
+            response = await self._make_request(
                 search_url,
                 params={'q': query, **kwargs}
             )
             
-            # HTML parsen
-            soup = self._parse_html(response.text)
-            
-            # Ergebnisse extrahieren
-            results = []
-            for item in soup.select('.search-result-item'):  # Beispiel-Selektor
-                metadata = self.extract_metadata(item)
-                if metadata:
-                    results.append(metadata)
-            
-            return results
+            # HTML parsen und Ergebnisse extrahieren, ohne den Event-Loop zu blockieren
+            return await self._run_blocking(self._parse_results, response.text)
             
         except Exception as e:
             self.logger.error(f"Fehler bei der Suche: {str(e)}")
-            return []
+            raise
 
-    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _parse_results(self, html: str) -> List[Dict[str, Any]]:
         """
-        Extrahiert Metadaten aus einem einzelnen Suchergebnis.
+        Parsed eine Ergebnisseite und extrahiert alle Treffer.
         """
-        try:
-            title_elem = soup.select_one('.title')
-            author_elem = soup.select_one('.author')
-            year_elem = soup.select_one('.year')
-            isbn_elem = soup.select_one('.isbn')
-            availability_elem = soup.select_one('.availability')
-            location_elem = soup.select_one('.location')
-            
-            return {
-                'title': title_elem.text.strip() if title_elem else None,
-                'author': author_elem.text.strip() if author_elem else None,
-                'year': year_elem.text.strip() if year_elem else None,
-                'isbn': isbn_elem.text.strip() if isbn_elem else None,
-                'availability': availability_elem.text.strip() if availability_elem else None,
-                'location': location_elem.text.strip() if location_elem else None,
-            }
-        except Exception as e:
-            self.logger.error(f"Fehler beim Extrahieren der Metadaten: {str(e)}")
-            return {} 
\ No newline at end of file
+        soup = self._parse_html(html, self.RESULTS_SCOPE)
+        
+        results = []
+        with self._stage("extract"):
+            for item in self.SELECTORS['item'].select(soup):
+                metadata = self.extract_metadata(item)
+                if metadata:
+                    results.append(metadata)
+        
+        return results
@@ -0,0 +1,273 @@
+"""
+Deklarative Extraktionsregeln für Treffer.
+
+Statt pro Feld `select_one(...)`, `.text.strip()` und Sonderfälle von Hand zu
+schreiben, beschreibt ein Scraper seine Felder als Regeln:
+
+    EXTRACTOR = compile_rules({
+        'title': Field('.title', '.media-title'),
+        'cover_url': Field('img.cover', attr='src'),
+        'details_url': Field('a.details-link', attr='href', url=True),
+        'year': Field('.metadata', pattern=r'\\b(1[5-9]\\d\\d|20\\d\\d)\\b'),
+    }, required=('title',))
+
+`compile_rules` kompiliert alle Selektoren einmalig; `Extractor.extract`
+wendet die Regeln dann auf einen Trefferbehälter an, wobei jeder Selektor pro
+Behälter höchstens einmal gesucht wird, auch wenn ihn mehrere Felder nutzen.
+Scraper, die `RuleExtraction` vor `BaseScraper` erben, bekommen daraus ihr
+`extract_metadata`.
+Regeln können auch als Dictionary angegeben werden (z.B. aus JSON), siehe
+`Field.from_spec`.
+"""
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import soupsieve
+from bs4 import Tag
+
+
+class Field:
+    def __init__(
+        self,
+        *selectors: str,
+        attr: Optional[str] = None,
+        pattern: Optional[str] = None,
+        url: bool = False,
+        count: Optional[str] = None,
+        within: Optional[str] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ):
+        """
+        Args:
+            selectors: CSS-Selektoren, die der Reihe nach probiert werden, bis
+                einer einen nicht leeren Wert liefert
+            attr: Attribut des Elements statt seines Texts
+            pattern: Regulärer Ausdruck; Wert ist die erste Gruppe (bzw. der
+                ganze Treffer), ohne Übereinstimmung gilt der Selektor als leer
+            url: Relativen Link an die Basis-URL des Scrapers anhängen
+            count: Statt eines Texts die Anzahl der Elemente zu diesem
+                Selektor im gefundenen Element (0 gilt als leer)
+            within: Nur im ersten Element zu diesem Selektor suchen (z.B. einem
+                Metadatenblock); Felder mit demselben `within` teilen die Suche
+            transform: Wird zuletzt auf den Wert angewendet
+        """
+        if not selectors:
+            raise ValueError("Field benötigt mindestens einen Selektor")
+        self.selectors = selectors
+        self.attr = attr
+        self.pattern = re.compile(pattern) if pattern else None
+        self.url = url
+        self.count = count
+        self.within = within
+        self.transform = transform
+
+    @classmethod
+    def from_spec(cls, spec: Union["Field", str, Mapping[str, Any]]) -> "Field":
+        """
+        Regel aus einem Selektor oder Dictionary, z.B.
+        `{"selectors": [".isbn", ".ean"], "pattern": "([0-9Xx-]{10,17})"}`.
+        """
+        if isinstance(spec, Field):
+            return spec
+        if isinstance(spec, str):
+            return cls(spec)
+        spec = dict(spec)
+        selectors = spec.pop("selectors", None) or [spec.pop("selector")]
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        return cls(*selectors, **spec)
+
+
+# Einfache Selektoren (tag, .klasse, tag.klasse, tag[attr], tag[attr='wert'] sowie
+# Alternativen wie ".a, .b") werden direkt über die Nachfahren geprüft; das spart
+# den Aufwand, den soupsieve bzw. BeautifulSoup.find pro Aufruf haben
+_SIMPLE_SELECTOR = re.compile(
+    r"^(?P<tag>[a-zA-Z][a-zA-Z0-9]*)?(?:\.(?P<cls>[\w-]+))?"
+    r"(?:\[(?P<attr>[\w-]+)(?:=(?P<quote>['\"])(?P<value>[^'\"]*)(?P=quote))?\])?$"
+)
+
+
+class _SimpleMatcher:
+    def __init__(self, tag: Optional[str], classes: Sequence[str] = (), attr: Optional[str] = None, value: Optional[str] = None):
+        # Tag- und Attributnamen sind in HTML unabhängig von Groß-/Kleinschreibung,
+        # ebenso der Wert von type (wie bei soupsieve)
+        self.tag = tag.lower() if tag else tag
+        self.classes = frozenset(classes)  # eine der Klassen genügt (Alternativen)
+        self.attr = attr.lower() if attr else attr
+        self.ignore_case = self.attr == "type"
+        self.value = value.lower() if value is not None and self.ignore_case else value
+
+    def _matches(self, element) -> bool:
+        if self.tag is not None and element.name != self.tag:
+            return False
+        if self.classes and self.classes.isdisjoint(element.get("class") or ()):
+            return False
+        if self.attr is not None:
+            value = element.get(self.attr)
+            if value is None:
+                return False
+            if self.value is not None:
+                value = " ".join(value) if isinstance(value, list) else value
+                if (value.lower() if self.ignore_case else value) != self.value:
+                    return False
+        return True
+
+    def select_one(self, element):
+        for descendant in element.descendants:
+            if isinstance(descendant, Tag) and self._matches(descendant):
+                return descendant
+        return None
+
+    def select(self, element):
+        return [descendant for descendant in element.descendants if isinstance(descendant, Tag) and self._matches(descendant)]
+
+
+def compile_selector(selector: str):
+    """
+    Kompiliert einen CSS-Selektor; einfache Selektoren werden direkt
+    geprüft, alle anderen von soupsieve ausgewertet. Beide bieten
+    `select_one` und `select`.
+    """
+    matches = [_SIMPLE_SELECTOR.match(part.strip()) for part in selector.split(",")]
+    if any(match is None or not (match.group("tag") or match.group("cls") or match.group("attr")) for match in matches):
+        return soupsieve.compile(selector)
+    if len(matches) > 1:
+        # Alternativen wie ".title, .media-title" als eine Suche nach mehreren Klassen
+        tags = {match.group("tag") for match in matches}
+        if len(tags) > 1 or any(match.group("attr") or not match.group("cls") for match in matches):
+            return soupsieve.compile(selector)
+        return _SimpleMatcher(tags.pop(), [match.group("cls") for match in matches])
+    match = matches[0]
+    return _SimpleMatcher(
+        match.group("tag"),
+        [match.group("cls")] if match.group("cls") else (),
+        match.group("attr"),
+        match.group("value") if match.group("quote") else None,
+    )
+
+
+def _absolute(base_url: str, href: str) -> str:
+    if href.startswith(("http://", "https://", "//")):
+        return href
+    return base_url.rstrip("/") + "/" + href.lstrip("/")
+
+
+class _CompiledField:
+    __slots__ = ("name", "candidates", "attr", "pattern", "url", "count", "transform")
+
+    def __init__(self, name: str, field: Field, lookups: List[int], count: Optional[Any]):
+        self.name = name
+        self.candidates = lookups  # Indizes in Extractor.lookups, in Fallback-Reihenfolge
+        self.attr = field.attr
+        self.pattern = field.pattern
+        self.url = field.url
+        self.count = count
+        self.transform = field.transform
+
+    def value(self, element, base_url: str) -> Any:
+        if self.count is not None:
+            return len(self.count.select(element)) or None
+        if self.attr is not None:
+            value = element.get(self.attr)
+            if isinstance(value, list):  # mehrwertige Attribute wie class
+                value = " ".join(value)
+            value = value.strip() if value else None
+        else:
+            value = element.get_text().strip()
+        if value and self.pattern is not None:
+            match = self.pattern.search(value)
+            value = (match.group(1) if match.groups() else match.group(0)) if match else None
+        if value and self.url:
+            value = _absolute(base_url, value)
+        return value or None
+
+
+class Extractor:
+    def __init__(self, fields: Mapping[str, Field], required: Sequence[str] = ()):
+        """
+        Args:
+            fields: Feldname -> Regel
+            required: Felder, ohne die ein Treffer verworfen wird; ohne Angabe
+                wird ein Treffer nur verworfen, wenn er gar keinen Wert hat
+        """
+        # Jede Suche ist (Index der umgebenden Suche oder None, kompilierter Selektor)
+        self.lookups: List[Tuple[Optional[int], Any]] = []
+        self._indexes: Dict[Tuple[Optional[str], str], int] = {}
+        self.fields: List[_CompiledField] = []
+        for name, field in fields.items():
+            scope = self._lookup(None, field.within) if field.within else None
+            candidates = [self._lookup(scope, selector) for selector in field.selectors]
+            count = compile_selector(field.count) if field.count else None
+            self.fields.append(_CompiledField(name, field, candidates, count))
+        self.required = tuple(required)
+
+    def _lookup(self, scope: Optional[int], selector: str) -> int:
+        key = (scope, selector)
+        if key not in self._indexes:
+            self._indexes[key] = len(self.lookups)
+            self.lookups.append((scope, compile_selector(selector)))
+        return self._indexes[key]
+
+    def extract(self, container, base_url: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Wendet alle Regeln auf einen Trefferbehälter an. Returns die gefundenen
+        Felder oder None, wenn Pflichtfelder fehlen.
+        """
+        # Pro Behälter gefundene Elemente je Suche (False = nicht vorhanden)
+        found: List[Any] = [None] * len(self.lookups)
+
+        def lookup(index: int):
+            element = found[index]
+            if element is None:
+                scope, matcher = self.lookups[index]
+                parent = container if scope is None else lookup(scope)
+                element = found[index] = parent is not False and matcher.select_one(parent) or False
+            return element
+
+        data: Dict[str, Any] = {}
+        for field in self.fields:
+            for index in field.candidates:
+                element = lookup(index)
+                if element is False:
+                    continue
+                value = field.value(element, base_url)
+                if value is not None:
+                    data[field.name] = field.transform(value) if field.transform else value
+                    break
+        if self.required:
+            if any(data.get(name) is None for name in self.required):
+                return None
+        elif not data:
+            return None
+        return data
+
+    def extract_all(self, containers: Iterable[Any], base_url: str = "") -> List[Dict[str, Any]]:
+        return [data for data in (self.extract(container, base_url) for container in containers) if data is not None]
+
+
+def compile_rules(
+    fields: Mapping[str, Union[Field, str, Mapping[str, Any]]], required: Sequence[str] = ()
+) -> Extractor:
+    """
+    Kompiliert Extraktionsregeln einmalig, typischerweise als Klassenattribut
+    `EXTRACTOR` eines Scrapers.
+    """
+    return Extractor({name: Field.from_spec(spec) for name, spec in fields.items()}, required)
+
+
+class RuleExtraction:
+    """
+    Mixin für Scraper: implementiert `extract_metadata` über die Regeln in
+    `EXTRACTOR`, z.B. `class MeinScraper(RuleExtraction, BaseScraper)`.
+    """
+
+    EXTRACTOR: Extractor
+
+    def extract_metadata(self, soup) -> Optional[Dict[str, Any]]:
+        return self.EXTRACTOR.extract(soup, self.base_url)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Fehlende Regeln schon beim Definieren der Klasse melden, nicht erst beim ersten Treffer
+        if not isinstance(getattr(cls, "EXTRACTOR", None), Extractor):
+            raise TypeError(f"{cls.__name__} erbt RuleExtraction, definiert aber kein EXTRACTOR = compile_rules(...)")
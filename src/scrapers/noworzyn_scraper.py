@@ -1,20 +1,22 @@
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from typing import List, Dict, Any, Optional
+from bs4 import SoupStrainer
 import asyncio
-from selenium import webdriver
+import soupsieve
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException, ElementClickInterceptedException
-from scrapers.base_scraper import BaseScraper
+from scrapers.base_scraper import BaseScraper, SearchCancelled
+from scrapers.extraction import Field, RuleExtraction, compile_rules
 import logging
 import time
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 from datetime import datetime
-from selenium.webdriver.chrome.options import Options
+from utils import config
+from utils.driver_pool import driver_pool
 
-class NoworzynScraper(BaseScraper):
+class NoworzynScraper(RuleExtraction, BaseScraper):
     def __init__(self):
         base_url = "https://buchhandlung-noworzyn.buchhandlung.de/shop/"
         super().__init__(base_url=base_url)
@@ -22,28 +24,114 @@ class NoworzynScraper(BaseScraper):
         self.page_source_path = "page_source.html"
         self.logger.setLevel(logging.DEBUG)
         self.driver = None
-        self._init_selenium()
+
+    # Common overlay/modal close controls
+    OVERLAY_SELECTORS = [
+        "button.close",
+        "button.modal-close",
+        ".modal-close",
+        ".close-button",
+        "[aria-label='Close']",
+        ".cookie-consent button",
+        "#cookie-notice .accept",
+        ".modal .close"
+    ]
+
+    MODAL_SELECTORS = [
+        "[class*='modal'] button",
+        "[class*='modal'] .close",
+        ".modal-close",
+        ".cookie-banner button",
+        "#cookiebanner button",
+        ".consent-banner button",
+        "[aria-label='Close']",
+        ".popup-close"
+    ]
+
+    SEARCH_INPUT_SELECTORS = [
+        "input[type='search']",
+        "#search",
+        "#searchbox",
+        "input[name='search']",
+        "input[placeholder*='such']",
+        "input[placeholder*='Search']"
+    ]
+
+    # Results page requested directly by the HTTP fast path (?searchString=...)
+    SEARCH_PATH = "quickSearch"
+
+    # Markers of bot checks and error pages that only a real browser gets past
+    BLOCKED_MARKERS = (
+        "captcha",
+        "cf-challenge",
+        "challenge-platform",
+        "enable javascript",
+        "javascript aktivieren",
+    )
+
+    # Status block on product pages, as in the result list
+    AVAILABILITY_SELECTOR = "[itemprop='availability'], .article-status, .availability"
+
+    # Look for product containers with multiple possible selectors
+    PRODUCT_SELECTORS = [
+        'table.article-table tr.article',  # Main selector for the table structure
+        '.article',  # Backup selector for article rows
+        '.product-container',
+        '.article-container',
+        '.book-container',
+        '.product-list-item',
+        '.search-result-item'
+    ]
+
+    PRODUCT_MATCHERS = [soupsieve.compile(selector) for selector in PRODUCT_SELECTORS]
+
+    # Fields of a product row in the article table
+    EXTRACTOR = compile_rules({
+        'title': 'span.article-title',
+        'author': 'span.article-author',
+        'url': Field("a[data-content-ignoreinteraction='']", attr='href', url=True),
+        'image_url': Field('img', attr='src'),
+        'image_alt': Field('img', attr='alt'),
+        'format': Field("span[data-testid='product-type-sm']", 'td.article-data'),
+        'availability': 'div.article-status',
+        'price': 'td.th-price',
+        'rating': Field('span.star-rating', count='i.fas.fa-star'),
+        'review_count': Field('span.star-rating', pattern=r'\(([^)]*)\)'),
+    })
+
+    # Only the heading and the product containers are built into a tree
+    RESULTS_SCOPE = SoupStrainer(class_=[
+        'search-result-heading', 'article-table', 'article', 'product-container',
+        'article-container', 'book-container', 'product-list-item', 'search-result-item',
+    ])
+
+    READY_CONDITIONS = {
+        "home": (
+            ("document_ready",),
+            ("selector", ", ".join(SEARCH_INPUT_SELECTORS), 10),
+        ),
+        "results": (
+            ("page_changed", 10),
+            ("document_ready",),
+            ("selector", ", ".join(PRODUCT_SELECTORS + ['h1.search-result-heading']), 10),
+            ("dom_quiet", 250, 3),
+        ),
+        "modal_closed": (
+            ("dom_quiet", 200, 2),
+        ),
+    }
 
     def __del__(self):
         self.cleanup()
 
     def _init_selenium(self):
-        """Initialize Selenium WebDriver with custom options."""
+        """Lease a WebDriver from the shared pool."""
         try:
             if self.driver is not None:
                 self.cleanup()
 
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.implicitly_wait(10)
-            self.logger.debug("Selenium WebDriver erfolgreich initialisiert")
+            self.driver = self._acquire_driver()
+            self.logger.debug("Selenium WebDriver aus dem Pool übernommen")
         except Exception as e:
             self.logger.error(f"Fehler beim Initialisieren des WebDrivers: {str(e)}")
             self.driver = None
@@ -53,7 +141,7 @@ class NoworzynScraper(BaseScraper):
         """Wartet auf ein Element und gibt es zurück."""
         try:
             self.logger.debug(f"Warte auf Element: {selector}")
-            element = WebDriverWait(self.driver, timeout).until(
+            element = WebDriverWait(self.driver, self._remaining(timeout)).until(
                 EC.presence_of_element_located((by, selector))
             )
             self.logger.debug(f"Element gefunden: {selector}")
@@ -65,271 +153,216 @@ class NoworzynScraper(BaseScraper):
     async def _close_overlays(self):
         """Handle and close any overlays or modals that might appear."""
         try:
-            # List of common overlay/modal selectors
-            overlay_selectors = [
-                "button.close",
-                "button.modal-close",
-                ".modal-close",
-                ".close-button",
-                "[aria-label='Close']",
-                ".cookie-consent button",
-                "#cookie-notice .accept",
-                ".modal .close"
-            ]
-
-            for selector in overlay_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            await asyncio.sleep(0.5)  # Wait for animation
-                except Exception as e:
-                    self.logger.debug(f"Error handling overlay with selector {selector}: {str(e)}")
-                    continue
+            if await self._run_blocking(self._click_visible, self.OVERLAY_SELECTORS):
+                await self._wait_for_step("modal_closed")
 
             # Click outside any modal as a fallback
             try:
-                body = self.driver.find_element(By.TAG_NAME, "body")
-                body.click()
+                body = await self._run_blocking(self.driver.find_element, By.TAG_NAME, "body")
+                await self._run_blocking(body.click)
+            except SearchCancelled:
+                raise
             except Exception as e:
                 self.logger.debug(f"Error clicking body element: {str(e)}")
 
+        except SearchCancelled:
+            raise
         except Exception as e:
             self.logger.warning(f"Error in _close_overlays: {str(e)}")
 
-    async def _wait_for_page_load(self, timeout=20):
-        """Wait for the page to be fully loaded."""
-        try:
-            await asyncio.sleep(2)  # Initial wait for page load to start
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            # Wait for any dynamic content to load
-            WebDriverWait(self.driver, timeout).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            # Wait for network requests to finish
-            WebDriverWait(self.driver, timeout).until(
-                lambda d: d.execute_script("return window.performance.getEntriesByType('resource').length") > 0
-            )
-            await asyncio.sleep(1)  # Additional wait for dynamic content
-        except Exception as e:
-            self.logger.warning(f"Timeout waiting for page load: {str(e)}")
+    def _click_visible(self, selectors) -> int:
+        """Click every visible element matching one of the selectors; returns the number of clicks."""
+        clicked = 0
+        for element in self._visible_elements(selectors):
+            try:
+                element.click()
+                clicked += 1
+            except Exception as e:
+                self.logger.debug(f"Element not clickable: {str(e)}")
+        return clicked
 
     async def _handle_modals(self):
-        """Handle any modal dialogs that appear with retry mechanism."""
+        """Close cookie banners and modal dialogs that cover the search box."""
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                await asyncio.sleep(1)  # Wait before attempting to handle modals
-                
-                # Get fresh page state
-                self.driver.refresh()
-                await self._wait_for_page_load()
-                
-                # Try to find and close modal with explicit wait
-                modal_selectors = [
-                    "[class*='modal'] button",
-                    "[class*='modal'] .close",
-                    ".modal-close",
-                    ".cookie-banner button",
-                    "#cookiebanner button",
-                    ".consent-banner button",
-                    "[aria-label='Close']",
-                    ".popup-close"
-                ]
-                
-                for selector in modal_selectors:
-                    try:
-                        # Wait for element to be present and visible
-                        element = WebDriverWait(self.driver, 5).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        if element and element.is_displayed():
-                            # Wait for element to be clickable
-                            clickable = WebDriverWait(self.driver, 5).until(
-                                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                            )
-                            if clickable:
-                                clickable.click()
-                                await asyncio.sleep(0.5)
-                    except Exception as e:
-                        self.logger.debug(f"Modal selector {selector} not found or not clickable: {str(e)}")
-                        continue
-                
-                # Check if any modals are still visible
-                visible_modals = self.driver.find_elements(By.CSS_SELECTOR, "[class*='modal']:not([style*='display: none'])")
-                if not visible_modals:
-                    break
-                
+                clicked = await self._run_blocking(self._click_visible, self.MODAL_SELECTORS)
+            except SearchCancelled:
+                raise
             except Exception as e:
-                if attempt == max_retries - 1:
-                    self.logger.warning(f"Failed to handle modals after {max_retries} attempts: {str(e)}")
-                await asyncio.sleep(1)  # Wait before retry
+                self.logger.debug(f"Error handling modals: {str(e)}")
+                clicked = 0
+
+            # Stop as soon as no visible modal control is left
+            if not clicked:
+                break
+            self.logger.debug(f"Closed {clicked} modal controls (attempt {attempt + 1})")
+            await self._wait_for_step("modal_closed")
+
+    def _find_search_input(self):
+        """Locate the visible, enabled search box on the current page."""
+        for element in self._visible_elements(self.SEARCH_INPUT_SELECTORS):
+            if element.is_enabled():
+                return element
+        
+        # Try to find any visible input that might be the search box
+        inputs = self._visible_elements(["input[type='text']", "input[type='search']"])
+        return inputs[0] if inputs else None
+
+    def _type_search_term(self, search_input, term):
+        """Enter term into the search box, falling back to JavaScript input."""
+        try:
+            # Direct input
+            search_input.send_keys(term)
+        except Exception as e:
+            self.logger.debug(f"Direct input failed, trying JavaScript: {str(e)}")
+            # JavaScript input
+            self.driver.execute_script(
+                """
+                arguments[0].value = arguments[1];
+                arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
+                arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
+                """,
+                search_input,
+                term
+            )
 
-    async def search(self, term):
+    def _submit_search(self, search_input):
+        """Submit the search form, trying Enter, the submit button and form.submit()."""
+        # Method 1: Press Enter
+        try:
+            search_input.send_keys(Keys.RETURN)
+            return True
+        except Exception as e:
+            self.logger.debug(f"Enter key failed: {str(e)}")
+        
+        # Method 2: Click submit button if available
+        try:
+            submit_button = WebDriverWait(self.driver, self._remaining(5)).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
+            )
+            submit_button.click()
+            return True
+        except Exception as e:
+            self.logger.debug(f"Submit button click failed: {str(e)}")
+        
+        # Method 3: JavaScript form submit
+        try:
+            self.driver.execute_script("arguments[0].form.submit();", search_input)
+            return True
+        except Exception as e:
+            self.logger.debug(f"JavaScript form submit failed: {str(e)}")
+        
+        return False
+
+    async def search(self, query: str, **kwargs) -> List[Dict[str, Any]]:
         """
         Search for a term on the website and extract product information.
         
         Args:
-            term (str): The search term to look for
+            query (str): The search term to look for
+            **kwargs: Additional search parameters; `mode` selects "auto"
+                (HTTP fast path with browser fallback), "http" or "browser"
             
         Returns:
             list: List of dictionaries containing product information
         """
+        mode = kwargs.get('mode') or config.NOWORZYN_SEARCH_MODE
+        if mode != 'browser':
+            results = await self._search_http(query)
+            if results is not None:
+                return results
+            if mode == 'http':
+                raise Exception("HTTP fast path not usable and browser fallback disabled")
+            self.logger.info("HTTP fast path not usable, falling back to browser search")
+
+        return await self._search_browser(query)
+
+    async def _search_http(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the results page directly with a single GET and parse it with the
+        regular extraction logic. Returns None if the response needs a browser.
+        """
+        try:
+            response = await self._make_request(self.base_url + self.SEARCH_PATH, params={'searchString': query})
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            # 403/429, bot protection or network errors: let the browser try
+            self.logger.debug(f"HTTP fast path failed: {str(e)}")
+            return None
+
+        page = await self._run_blocking(self._parse_search_page, response.text)
+        if page is None:
+            return None
+
+        results = await self._run_blocking(self._extract_results, page)
+        self.partial_results = results
+        self.logger.info(f"Found {len(results)} results via HTTP fast path")
+        return results
+
+    def _parse_search_page(self, page_source):
+        """
+        Return the product containers of a server-rendered results page, or
+        None if the page is JS-only or blocked and must be loaded in a browser.
+        """
+        lowered = page_source.lower()
+        if any(marker in lowered for marker in self.BLOCKED_MARKERS):
+            self.logger.debug("HTTP fast path: response looks like a bot check")
+            return None
+
+        product_containers = self._find_product_containers(page_source)
+        if product_containers:
+            return product_containers
+
+        # An empty result list is only trusted if the results page itself was rendered
+        if 'search-result-heading' in page_source:
+            return []
+        self.logger.debug("HTTP fast path: no result markup in response, page needs JavaScript")
+        return None
+
+    async def _search_browser(self, query: str) -> List[Dict[str, Any]]:
+        """Run the search by driving the shop's search form in a pooled browser."""
         if not self.driver:
-            self._init_selenium()
+            await self._run_blocking(self._init_selenium)
 
         try:
-            # Navigate to page and ensure it's loaded
-            self.driver.get(self.base_url)
-            await self._wait_for_page_load()
+            # Navigate to page and wait until the search box is there
+            await self._throttle()
+            await self._navigate(self.base_url)
+            await self._wait_for_step("home")
             
             # Handle any modals before proceeding
-            await self._handle_modals()
-            
-            # Find search input with explicit wait
-            search_selectors = [
-                "input[type='search']",
-                "#search",
-                "#searchbox",
-                "input[name='search']",
-                "input[placeholder*='such']",
-                "input[placeholder*='Search']"
-            ]
-            
-            search_input = None
-            for selector in search_selectors:
-                try:
-                    # Wait for element with explicit conditions
-                    element = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if element.is_displayed() and element.is_enabled():
-                        search_input = element
-                        self.logger.debug(f"Found search input with selector: {selector}")
-                        break
-                except Exception:
-                    continue
+            with self._stage("modals"):
+                await self._handle_modals()
             
+            # Find search input
+            search_input = await self._run_blocking(self._find_search_input)
             if not search_input:
-                # Try to find any visible input that might be the search box
-                inputs = self.driver.find_elements(By.TAG_NAME, "input")
-                for input_elem in inputs:
-                    try:
-                        if input_elem.is_displayed() and input_elem.get_attribute("type") in ["text", "search"]:
-                            search_input = input_elem
-                            break
-                    except:
-                        continue
-                
-                if not search_input:
-                    raise Exception("Could not find search input")
+                raise Exception("Could not find search input")
 
             # Ensure search input is interactable
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", search_input)
-            await asyncio.sleep(1)
+            await self._run_blocking(
+                self.driver.execute_script, "arguments[0].scrollIntoView({block: 'center'});", search_input
+            )
             
             # Clear existing value and input search term
             try:
-                search_input.clear()
-                await asyncio.sleep(0.5)
-                
-                # Try different input methods
-                try:
-                    # Direct input
-                    search_input.send_keys(term)
-                except Exception as e:
-                    self.logger.debug(f"Direct input failed, trying JavaScript: {str(e)}")
-                    # JavaScript input
-                    self.driver.execute_script(
-                        """
-                        arguments[0].value = arguments[1];
-                        arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
-                        arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
-                        """,
-                        search_input,
-                        term
-                    )
-                
-                await asyncio.sleep(1)
+                await self._run_blocking(search_input.clear)
+                await self._run_blocking(self._type_search_term, search_input, query)
                 
                 # Try to submit the search
-                submitted = False
-                
-                # Method 1: Press Enter
-                try:
-                    search_input.send_keys(Keys.RETURN)
-                    submitted = True
-                except Exception as e:
-                    self.logger.debug(f"Enter key failed: {str(e)}")
-                
-                # Method 2: Click submit button if available
-                if not submitted:
-                    try:
-                        submit_button = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
-                        )
-                        submit_button.click()
-                        submitted = True
-                    except Exception as e:
-                        self.logger.debug(f"Submit button click failed: {str(e)}")
-                
-                # Method 3: JavaScript form submit
-                if not submitted:
-                    try:
-                        self.driver.execute_script("arguments[0].form.submit();", search_input)
-                        submitted = True
-                    except Exception as e:
-                        self.logger.debug(f"JavaScript form submit failed: {str(e)}")
-                
-                if not submitted:
+                await self._mark_page()
+                await self._throttle()
+                if not await self._run_blocking(self._submit_search, search_input):
                     raise Exception("Failed to submit search")
                 
                 # Wait for results page to load
-                await self._wait_for_page_load()
-                
-                # Get page source and parse with BeautifulSoup
-                page_source = self.driver.page_source
-                soup = BeautifulSoup(page_source, 'html.parser')
-                
-                # Look for product containers with multiple possible selectors
-                product_selectors = [
-                    'table.article-table tr.article',  # Main selector for the table structure
-                    '.article',  # Backup selector for article rows
-                    '.product-container',
-                    '.article-container',
-                    '.book-container',
-                    '.product-list-item',
-                    '.search-result-item'
-                ]
-                
-                # Try to find products with more detailed logging
-                product_containers = []
-                
-                # Check for search results heading
-                search_heading = soup.find('h1', class_='search-result-heading')
-                if search_heading:
-                    self.logger.info(f"Found search heading: {search_heading.text.strip()}")
+                await self._wait_for_step("results")
                 
-                # First try the table structure
-                article_table = soup.find('table', class_='article-table')
-                if article_table:
-                    self.logger.debug("Found article table")
-                    articles = article_table.find_all('tr', class_='article')
-                    if articles:
-                        self.logger.info(f"Found {len(articles)} articles in table")
-                        product_containers = articles
-                
-                # If no articles found in table, try other selectors
-                if not product_containers:
-                    for selector in product_selectors:
-                        containers = soup.select(selector)
-                        if containers:
-                            self.logger.debug(f"Found {len(containers)} products with selector: {selector}")
-                            product_containers = containers
-                            break
+                # Get page source and parse it off the event loop
+                page_source = await self._run_blocking(lambda: self.driver.page_source)
+                product_containers = await self._run_blocking(self._find_product_containers, page_source)
                 
                 if not product_containers:
                     self.logger.warning("No product containers found on the page")
@@ -339,16 +372,8 @@ class NoworzynScraper(BaseScraper):
                     )
                     return []
 
-                results = []
-                for container in product_containers:
-                    try:
-                        product_info = self._extract_table_metadata(container)
-                        if product_info:
-                            results.append(product_info)
-                    except Exception as e:
-                        self.logger.error(f"Error extracting product info: {str(e)}")
-                        continue
-                
+                results = await self._run_blocking(self._extract_results, product_containers)
+                self.partial_results = results
                 self.logger.info(f"Found {len(results)} results")
                 return results
                 
@@ -356,78 +381,70 @@ class NoworzynScraper(BaseScraper):
                 self.logger.error(f"Error during search input: {str(e)}")
                 raise
                 
+        except SearchCancelled:
+            raise
         except Exception as e:
-            self.logger.error(f"Error during search for '{term}': {str(e)}")
+            self.logger.error(f"Error during search for '{query}': {str(e)}")
             await self._save_debug_info(
                 f"error_screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
                 f"page_source_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
             )
-            return []
+            # Surface the failure so api.main reports it and the circuit breaker sees it
+            raise
 
-    def _extract_table_metadata(self, container) -> Dict[str, Any]:
-        """Extract metadata from a table row structure."""
-        try:
-            data = {}
-            
-            # Extract title
-            title_elem = container.find('span', class_='article-title')
-            if title_elem:
-                data['title'] = title_elem.text.strip()
-            
-            # Extract author
-            author_elem = container.find('span', class_='article-author')
-            if author_elem:
-                data['author'] = author_elem.text.strip()
-            
-            # Extract link
-            link_elem = container.find('a', attrs={'data-content-ignoreinteraction': ''})
-            if link_elem:
-                data['url'] = self.base_url.rstrip('/') + link_elem.get('href', '')
-            
-            # Extract image
-            img_elem = container.find('img')
-            if img_elem:
-                data['image_url'] = img_elem.get('src', '')
-                data['image_alt'] = img_elem.get('alt', '')
-            
-            # Extract type/format
-            type_elem = container.find('span', attrs={'data-testid': 'product-type-sm'})
-            if type_elem:
-                data['format'] = type_elem.text.strip()
-            else:
-                # Try alternative location in data cell
-                data_cell = container.find('td', class_='article-data')
-                if data_cell:
-                    data['format'] = data_cell.text.strip()
-            
-            # Extract status
-            status_elem = container.find('div', class_='article-status')
-            if status_elem:
-                data['availability'] = status_elem.text.strip()
-            
-            # Extract price
-            price_cell = container.find('td', class_='th-price')
-            if price_cell:
-                data['price'] = price_cell.text.strip()
-            
-            # Extract rating if available
-            rating_elem = container.find('span', class_='star-rating')
-            if rating_elem:
-                stars = rating_elem.find_all('i', class_='fas fa-star')
-                data['rating'] = len(stars) if stars else None
-                # Extract review count
-                review_count = rating_elem.text.strip()
-                if '(' in review_count and ')' in review_count:
-                    data['review_count'] = review_count[review_count.find('(')+1:review_count.find(')')]
-            
-            return data if any(data.values()) else None
-            
-        except Exception as e:
-            self.logger.error(f"Error extracting table metadata: {str(e)}")
-            return None
+    def _find_product_containers(self, page_source):
+        """Parse the results page and return the product containers."""
+        soup = self._parse_html(page_source, self.RESULTS_SCOPE)
+        
+        # Try to find products with more detailed logging
+        product_containers = []
+        
+        # Check for search results heading
+        search_heading = soup.find('h1', class_='search-result-heading')
+        if search_heading:
+            self.logger.info(f"Found search heading: {search_heading.text.strip()}")
+        
+        # First try the table structure
+        article_table = soup.find('table', class_='article-table')
+        if article_table:
+            self.logger.debug("Found article table")
+            articles = article_table.find_all('tr', class_='article')
+            if articles:
+                self.logger.info(f"Found {len(articles)} articles in table")
+                product_containers = articles
+        
+        # If no articles found in table, try other selectors
+        if not product_containers:
+            for selector, matcher in zip(self.PRODUCT_SELECTORS, self.PRODUCT_MATCHERS):
+                containers = matcher.select(soup)
+                if containers:
+                    self.logger.debug(f"Found {len(containers)} products with selector: {selector}")
+                    product_containers = containers
+                    break
+        
+        return product_containers
+
+    def _extract_results(self, product_containers) -> List[Dict[str, Any]]:
+        """Extract product information from all containers."""
+        results = []
+        with self._stage("extract"):
+            for container in product_containers:
+                try:
+                    product_info = self.extract_metadata(container)
+                    if product_info:
+                        results.append(product_info)
+                except Exception as e:
+                    self.logger.error(f"Error extracting product info: {str(e)}")
+                    continue
+        return results
 
     async def _save_debug_info(self, screenshot_path, page_source_path):
         """Speichert Debug-Informationen im Fehlerfall."""
+        if self.driver is None:
+            return
+        await self._run_blocking(self._write_debug_info, screenshot_path, page_source_path)
+
+    def _write_debug_info(self, screenshot_path, page_source_path):
         try:
             # Screenshot speichern
             self.driver.save_screenshot(screenshot_path)
@@ -443,35 +460,17 @@ class NoworzynScraper(BaseScraper):
 
     def _close_selenium(self):
         """
-        Schließt den Selenium WebDriver.
+        Gibt den Selenium WebDriver an den Pool zurück.
         """
-        if self.driver:
-            self.driver.quit()
-            self.driver = None 
+        self.cleanup()
 
-    def cleanup(self):
-        """Clean up resources by closing the Selenium WebDriver."""
+    def cleanup(self, discard: bool = False):
+        """Clean up resources by returning the Selenium WebDriver to the pool."""
         try:
             if hasattr(self, 'driver') and self.driver is not None:
-                self.driver.quit()
+                # A driver still busy with a cancelled step cannot be reset safely
+                driver_pool.release(self.driver, discard=discard or self.busy)
         except Exception as e:
             self.logger.error(f"Error during cleanup: {str(e)}")
         finally:
-            self.driver = None 
-
-    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """
-        Implements the abstract method from BaseScraper.
-        This is a fallback method that uses the table-specific extraction.
-        
-        Args:
-            soup: BeautifulSoup object containing the HTML structure
-            
-        Returns:
-            Dictionary containing book information
-        """
-        try:
-            return self._extract_table_metadata(soup)
-        except Exception as e:
-            self.logger.error(f"Error in extract_metadata: {str(e)}")
-            return {} 
\ No newline at end of file
+            self.driver = None
@@ -1,18 +1,21 @@
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from typing import List, Dict, Any, Optional
+from bs4 import SoupStrainer
 import asyncio
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from scrapers.base_scraper import BaseScraper
+from scrapers.base_scraper import BaseScraper, SearchCancelled, compile_selectors
+from scrapers.extraction import Field, RuleExtraction, compile_rules
+from utils import config
 import logging
-from selenium.webdriver.chrome.options import Options
+import re
+from urllib.parse import urljoin
+from utils.driver_pool import driver_pool
 from selenium.webdriver.common.keys import Keys
 from datetime import datetime
 
-class OnleiheKoelnScraper(BaseScraper):
+class OnleiheKoelnScraper(RuleExtraction, BaseScraper):
     def __init__(self, username: str = None, password: str = None):
         base_url = "https://www.onleihe.de/koeln"
         super().__init__(base_url=base_url)
@@ -20,28 +23,66 @@ class OnleiheKoelnScraper(BaseScraper):
         self.password = password
         self.driver = None
         self.is_authenticated = False
-        self._init_selenium()
+
+    RESULT_SELECTOR = '.result-item, .media-item'
+
+    # Result pages are only parsed as far as the result items and the pagination
+    RESULTS_SCOPE = SoupStrainer(class_=['result-item', 'media-item'])
+    PAGINATION_SCOPE = SoupStrainer(class_='pagination')
+
+    SELECTORS = compile_selectors({
+        'result': RESULT_SELECTOR,
+        'page_links': '.pagination a[href]',
+    })
+
+    # Fields of a result item; publisher, year and ISBN sit in the metadata block
+    EXTRACTOR = compile_rules({
+        'title': '.title, .media-title',
+        'author': '.author, .creator',
+        'format': '.format, .media-type',
+        'availability': '.availability, .status',
+        'cover_url': Field('img.cover, img.media-image', attr='src'),
+        'details_url': Field('a.details-link, a.media-link', attr='href', url=True),
+        'publisher': Field('.publisher', within='.metadata, .media-metadata'),
+        'year': Field('.year', within='.metadata, .media-metadata'),
+        'isbn': Field('.isbn', within='.metadata, .media-metadata'),
+    }, required=('title',))
+
+    # Availability on the media detail page uses the same classes as the result list
+    AVAILABILITY_SELECTOR = '.availability, .status'
+
+    READY_CONDITIONS = {
+        "login_form": (
+            ("document_ready",),
+            ("selector", "input[name='username']", 10),
+        ),
+        "logged_in": (
+            ("page_changed", 10),
+            ("document_ready",),
+        ),
+        "search_form": (
+            ("document_ready",),
+            ("selector", "input#searchTerm", 10),
+        ),
+        "results": (
+            ("page_changed", 10),
+            ("document_ready",),
+            ("selector", RESULT_SELECTOR + ', .pagination', 10),
+        ),
+    }
 
     def __del__(self):
         self.cleanup()
 
     def _init_selenium(self):
-        """Initialize Selenium WebDriver with custom options."""
+        """Lease a WebDriver from the shared pool."""
         try:
             if self.driver is not None:
                 self.cleanup()
 
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.implicitly_wait(10)
-            self.logger.debug("Selenium WebDriver erfolgreich initialisiert")
+            self.driver = self._acquire_driver()
+            self.is_authenticated = False
+            self.logger.debug("Selenium WebDriver aus dem Pool übernommen")
         except Exception as e:
             self.logger.error(f"Fehler beim Initialisieren des WebDrivers: {str(e)}")
             self.driver = None
@@ -55,27 +96,30 @@ class OnleiheKoelnScraper(BaseScraper):
 
         try:
             # Navigate to login page
-            self.driver.get(f"{self.base_url}/frontend/myBib,0-0-0-100-0-0-0-0-0-0-0.html")
-            await self._wait_for_page_load()
+            await self._throttle()
+            await self._navigate(f"{self.base_url}/frontend/myBib,0-0-0-100-0-0-0-0-0-0-0.html")
+            await self._wait_for_step("login_form")
 
             # Find and fill username field
-            username_field = self._wait_for_element("input[name='username']", timeout=10)
+            username_field = await self._run_blocking(self._wait_for_element, "input[name='username']", timeout=10)
             if not username_field:
                 raise Exception("Username field not found")
-            username_field.send_keys(self.username)
+            await self._run_blocking(username_field.send_keys, self.username)
 
             # Find and fill password field
-            password_field = self._wait_for_element("input[name='password']", timeout=5)
+            password_field = await self._run_blocking(self._wait_for_element, "input[name='password']", timeout=5)
             if not password_field:
                 raise Exception("Password field not found")
-            password_field.send_keys(self.password)
+            await self._run_blocking(password_field.send_keys, self.password)
 
             # Submit login form
-            password_field.send_keys(Keys.RETURN)
-            await self._wait_for_page_load()
+            await self._mark_page()
+            await self._throttle()
+            await self._run_blocking(password_field.send_keys, Keys.RETURN)
+            await self._wait_for_step("logged_in")
 
             # Check if login was successful
-            self.is_authenticated = self._check_authentication()
+            self.is_authenticated = await self._run_blocking(self._check_authentication)
             return self.is_authenticated
 
         except Exception as e:
@@ -95,167 +139,236 @@ class OnleiheKoelnScraper(BaseScraper):
     def _wait_for_element(self, selector: str, timeout: int = 5, by: By = By.CSS_SELECTOR):
         """Wait for an element to be present and return it."""
         try:
-            return WebDriverWait(self.driver, timeout).until(
+            return WebDriverWait(self.driver, self._remaining(timeout)).until(
                 EC.presence_of_element_located((by, selector))
             )
         except TimeoutException:
             self.logger.error(f"Timeout waiting for element: {selector}")
             return None
 
-    async def _wait_for_page_load(self, timeout: int = 20):
-        """Wait for the page to be fully loaded."""
-        try:
-            await asyncio.sleep(1)
-            WebDriverWait(self.driver, timeout).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            await asyncio.sleep(1)
-        except Exception as e:
-            self.logger.warning(f"Timeout waiting for page load: {str(e)}")
-
     async def search(self, query: str, **kwargs) -> List[Dict[str, Any]]:
         """
         Search for media in the Onleihe Köln catalog.
         
         Args:
             query: Search term
-            **kwargs: Additional search parameters
+            **kwargs: Additional search parameters; `max_pages` limits pagination
             
         Returns:
             List of dictionaries containing media information
         """
         if not self.driver:
-            self._init_selenium()
+            await self._run_blocking(self._init_selenium)
 
         try:
             # Try to authenticate if credentials are provided and not already authenticated
             if self.username and self.password and not self.is_authenticated:
                 if not await self._authenticate():
-                    self.logger.error("Authentication failed")
-                    return []
+                    raise Exception("Authentication failed")
 
             # Navigate to search page
             search_url = f"{self.base_url}/frontend/search,0-0-0-100-0-0-0-0-0-0-0.html"
-            self.driver.get(search_url)
-            await self._wait_for_page_load()
+            await self._throttle()
+            await self._navigate(search_url)
+            await self._wait_for_step("search_form")
 
             # Find and fill search input
-            search_input = self._wait_for_element("input#searchTerm", timeout=10)
+            search_input = await self._run_blocking(self._wait_for_element, "input#searchTerm", timeout=10)
             if not search_input:
                 raise Exception("Search input not found")
 
-            search_input.clear()
-            search_input.send_keys(query)
-            search_input.send_keys(Keys.RETURN)
-            await self._wait_for_page_load()
-
-            # Extract results
-            results = []
-            page = 1
-            while True:
-                # Parse current page
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                items = soup.select('.result-item, .media-item')
-                
-                if not items:
-                    break
-
-                for item in items:
-                    metadata = self.extract_metadata(item)
-                    if metadata:
-                        results.append(metadata)
-
-                # Check for next page
-                next_page = self.driver.find_elements(By.CSS_SELECTOR, '.pagination .next:not(.disabled)')
-                if not next_page:
-                    break
-
-                # Click next page and wait for load
-                next_page[0].click()
-                await self._wait_for_page_load()
-                page += 1
+            await self._run_blocking(search_input.clear)
+            await self._run_blocking(search_input.send_keys, query)
+            await self._mark_page()
+            await self._throttle()
+            await self._run_blocking(search_input.send_keys, Keys.RETURN)
+            await self._wait_for_step("results")
+
+            # Extract results; collected incrementally so a timeout still yields partial results
+            max_pages = int(kwargs.get('max_pages') or config.ONLEIHE_MAX_PAGES)
+            max_results = int(kwargs['max_results']) if kwargs.get('max_results') else None
+            results = self.partial_results
 
+            page_source, current_url = await self._run_blocking(
+                lambda: (self.driver.page_source, self.driver.current_url)
+            )
+            first_page = await self._run_blocking(self._parse_results, page_source)
+            if first_page is None:
+                return results
+            results.extend(first_page)
+
+            # Prefer fetching the remaining pages concurrently by URL; pagination that
+            # only works via JavaScript is still walked by clicking "next"
+            page_urls = await self._run_blocking(self._pagination_urls, page_source, current_url)
+            if page_urls:
+                wanted = max_pages - 1
+                if max_results is not None and first_page:
+                    wanted = min(wanted, -(-max_results // len(first_page)) - 1)
+                if wanted < len(page_urls):
+                    self.logger.info(f"Fetching {max(wanted, 0)} of {len(page_urls)} further pages")
+                    self.truncated = True
+                await self._fetch_pages(page_urls[:max(wanted, 0)], results)
+            else:
+                await self._paginate_by_clicking(results, max_pages, max_results)
+
+            if max_results is not None and len(results) > max_results:
+                del results[max_results:]
+                self.truncated = True
             return results
 
+        except SearchCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Error during search: {str(e)}")
-            return []
+            if not self.partial_results:
+                # Nothing usable: surface the failure instead of an empty result list
+                raise
+            self.truncated = True
+            return self.partial_results
         finally:
             self.logger.debug("finally")
             # Don't close the driver here as it might be reused
 
-    def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    async def _paginate_by_clicking(self, results: List[Dict[str, Any]], max_pages: int, max_results: Optional[int]):
+        """Walk the result pages one by one via the "next" link in the browser."""
+        page = 1
+        while True:
+            next_page = await self._run_blocking(
+                self.driver.find_elements, By.CSS_SELECTOR, '.pagination .next:not(.disabled)'
+            )
+            if not next_page:
+                break
+
+            if page >= max_pages or self._deadline_reached() or (
+                max_results is not None and len(results) >= max_results
+            ):
+                self.logger.info(f"Stopping pagination after {page} pages")
+                self.truncated = True
+                break
+
+            # Click next page and wait for load
+            await self._mark_page()
+            await self._throttle()
+            await self._run_blocking(next_page[0].click)
+            await self._wait_for_step("results")
+            page += 1
+
+            # Parse current page off the event loop
+            page_source = await self._run_blocking(lambda: self.driver.page_source)
+            page_results = await self._run_blocking(self._parse_results, page_source)
+            if page_results is None:
+                break
+            results.extend(page_results)
+
+    async def _fetch_pages(self, page_urls: List[str], results: List[Dict[str, Any]]):
         """
-        Extract metadata from a search result item.
-        
-        Args:
-            soup: BeautifulSoup object of the result item
-            
-        Returns:
-            Dictionary containing media information
+        Fetch further result pages concurrently over HTTP, reusing the browser's
+        session cookies. Pages that cannot be fetched that way are loaded in the
+        browser afterwards. `results` is kept in page order as pages arrive.
         """
-        try:
-            data = {}
-
-            # Extract title
-            title_elem = soup.select_one('.title, .media-title')
-            if title_elem:
-                data['title'] = title_elem.text.strip()
-
-            # Extract author
-            author_elem = soup.select_one('.author, .creator')
-            if author_elem:
-                data['author'] = author_elem.text.strip()
-
-            # Extract format/type
-            format_elem = soup.select_one('.format, .media-type')
-            if format_elem:
-                data['format'] = format_elem.text.strip()
-
-            # Extract availability
-            availability_elem = soup.select_one('.availability, .status')
-            if availability_elem:
-                data['availability'] = availability_elem.text.strip()
-
-            # Extract cover image
-            cover_elem = soup.select_one('img.cover, img.media-image')
-            if cover_elem:
-                data['cover_url'] = cover_elem.get('src', '')
-
-            # Extract details link
-            link_elem = soup.select_one('a.details-link, a.media-link')
-            if link_elem:
-                data['details_url'] = self.base_url + link_elem.get('href', '')
-
-            # Extract additional metadata if available
-            metadata_elem = soup.select_one('.metadata, .media-metadata')
-            if metadata_elem:
-                # Publisher
-                publisher = metadata_elem.select_one('.publisher')
-                if publisher:
-                    data['publisher'] = publisher.text.strip()
-                
-                # Publication year
-                year = metadata_elem.select_one('.year')
-                if year:
-                    data['year'] = year.text.strip()
-                
-                # ISBN
-                isbn = metadata_elem.select_one('.isbn')
-                if isbn:
-                    data['isbn'] = isbn.text.strip()
-
-            return data if data.get('title') else None
+        if not page_urls:
+            return
+
+        cookie_header = await self._run_blocking(self._cookie_header)
+        headers = {'Cookie': cookie_header} if cookie_header else {}
+        semaphore = asyncio.Semaphore(max(1, config.ONLEIHE_PAGE_CONCURRENCY))
+        first_page = list(results)
+        pages: Dict[int, List[Dict[str, Any]]] = {}
+
+        def publish():
+            results[:] = first_page + [item for index in sorted(pages) for item in pages[index]]
+
+        async def fetch(index: int, url: str) -> bool:
+            async with semaphore:
+                self._check_cancelled()
+                try:
+                    response = await self._make_request(url, headers=headers)
+                    page_results = await self._run_blocking(self._parse_results, response.text)
+                except SearchCancelled:
+                    raise
+                except Exception as e:
+                    self.logger.debug(f"HTTP fetch of {url} failed: {str(e)}")
+                    return False
+                # No result items usually means the session was not accepted
+                if page_results is None:
+                    return False
+                pages[index] = page_results
+                publish()
+                return True
+
+        fetched = await asyncio.gather(*(fetch(index, url) for index, url in enumerate(page_urls)))
+
+        for index, url in enumerate(page_urls):
+            if fetched[index] or self._deadline_reached():
+                continue
+            self.logger.debug(f"Loading {url} in the browser")
+            await self._mark_page()
+            await self._throttle(url)
+            await self._navigate(url)
+            await self._wait_for_step("results")
+            page_source = await self._run_blocking(lambda: self.driver.page_source)
+            page_results = await self._run_blocking(self._parse_results, page_source)
+            if page_results is not None:
+                pages[index] = page_results
+                publish()
+
+        if len(pages) < len(page_urls):
+            self.truncated = True
+
+    def _cookie_header(self) -> str:
+        """Serialize the browser's cookies for use in HTTP requests."""
+        return "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in self.driver.get_cookies())
+
+    def _pagination_urls(self, page_source: str, current_url: str) -> List[str]:
+        """
+        Collect the URLs of result pages 2..n from the numbered pagination links.
+        Pages hidden behind an ellipsis ("1 2 3 … 12") are derived from the URL
+        of the last page, whose page number appears as a path segment.
+        """
+        soup = self._parse_html(page_source, self.PAGINATION_SCOPE)
+        links = {}
+        for link in self.SELECTORS['page_links'].select(soup):
+            text = link.get_text(strip=True)
+            href = link['href']
+            if text.isdigit() and not href.startswith(('#', 'javascript:')):
+                links[int(text)] = urljoin(current_url, href)
+        if not links:
+            return []
 
-        except Exception as e:
-            self.logger.error(f"Error extracting metadata: {str(e)}")
+        last = max(links)
+        pattern = re.compile(r'(?<=[-,])%d(?=[-.,])' % last)
+        if len(pattern.findall(links[last])) == 1:
+            for page in range(2, last):
+                links.setdefault(page, pattern.sub(str(page), links[last]))
+
+        return [links[page] for page in sorted(links) if page >= 2]
+
+    def _parse_results(self, page_source: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Parse a result page. Returns None if the page contains no result items.
+        """
+        soup = self._parse_html(page_source, self.RESULTS_SCOPE)
+        items = self.SELECTORS['result'].select(soup)
+        if not items:
             return None
 
+        results = []
+        with self._stage("extract"):
+            for item in items:
+                metadata = self.extract_metadata(item)
+                if metadata:
+                    results.append(metadata)
+        return results
+
     def cleanup(self):
-        """Clean up resources."""
+        """Return the WebDriver to the pool."""
         try:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
+            if getattr(self, 'driver', None) is not None:
+                # Authenticated sessions must not be handed to other users, and a driver
+                # still busy with a cancelled step cannot be reset safely
+                driver_pool.release(self.driver, discard=self.is_authenticated or self.busy)
         except Exception as e:
-            self.logger.error(f"Error during cleanup: {str(e)}") 
\ No newline at end of file
+            self.logger.error(f"Error during cleanup: {str(e)}")
+        finally:
+            self.driver = None
+            self.is_authenticated = False 
\ No newline at end of file
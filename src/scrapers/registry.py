@@ -0,0 +1,197 @@
+"""
+Registry der Bibliotheks-Scraper mit verzögertem Import.
+
+Jede Bibliothek ist durch eine `ScraperSpec` beschrieben: Name, Importpfad der
+Scraper-Klasse ("modul:Klasse") und Fähigkeiten (benötigt einen Browser,
+blättert durch Ergebnisseiten, unterstützt Filter). Das Scraper-Modul (und mit
+ihm z.B. Selenium) wird erst beim ersten Zugriff auf die Klasse importiert, so
+dass der Start der API nicht mit der Zahl der Bibliotheken wächst.
+
+Neben den eingebauten Scrapern werden Specs aus installierten Paketen über den
+Entry-Point `library_search.scrapers` gefunden. Der Entry-Point verweist auf
+eine `ScraperSpec` (oder eine Liste davon) in einem leichtgewichtigen Modul,
+z.B. in der setup.py eines Plugins:
+
+    entry_points={"library_search.scrapers": ["stadtbib = stadtbib.specs:SPEC"]}
+
+Mit `LIBRARIES` lässt sich die Auswahl auf bestimmte Bibliotheken beschränken.
+"""
+import importlib
+import logging
+import threading
+import time
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Optional, Sequence, Type, Union
+
+from scrapers.base_scraper import BaseScraper
+from utils import config
+from utils.metrics import gauge
+
+ENTRY_POINT_GROUP = "library_search.scrapers"
+
+
+class ScraperSpec:
+    def __init__(
+        self,
+        name: str,
+        target: Union[str, Type[BaseScraper]],
+        display_name: Optional[str] = None,
+        needs_browser: bool = False,
+        supports_pagination: bool = False,
+        supports_filters: bool = False,
+        filters: Sequence[str] = (),
+    ):
+        """
+        Args:
+            target: "modul:Klasse" oder bereits geladene Scraper-Klasse
+            needs_browser: Die Suche kann einen WebDriver aus dem Pool benötigen
+            supports_pagination: Der Scraper lädt mehrere Ergebnisseiten
+            supports_filters: Filter der Anfrage werden an die Suche durchgereicht
+            filters: Bekannte Filter (z.B. "max_pages")
+        """
+        self.name = name
+        self.target = target
+        self.display_name = display_name or name
+        self.needs_browser = needs_browser
+        self.supports_pagination = supports_pagination
+        self.supports_filters = supports_filters or bool(filters)
+        self.filters = tuple(filters)
+        self._class: Optional[Type[BaseScraper]] = None if isinstance(target, str) else target
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._class is not None
+
+    def load(self) -> Type[BaseScraper]:
+        """Importiert die Scraper-Klasse beim ersten Aufruf."""
+        if self._class is None:
+            with self._lock:
+                if self._class is None:
+                    module_name, _, attribute = self.target.partition(":")
+                    started = time.perf_counter()
+                    scraper_class = getattr(importlib.import_module(module_name), attribute)
+                    elapsed = time.perf_counter() - started
+                    IMPORT_SECONDS.set(elapsed, library=self.name)
+                    logging.getLogger(__name__).info(f"Scraper '{self.name}' in {elapsed:.3f}s geladen")
+                    self._class = scraper_class
+        return self._class
+
+    def capabilities(self) -> Dict[str, Any]:
+        return {
+            "display_name": self.display_name,
+            "needs_browser": self.needs_browser,
+            "supports_pagination": self.supports_pagination,
+            "supports_filters": self.supports_filters,
+            "filters": list(self.filters),
+        }
+
+
+BUILTIN_SCRAPERS = (
+    ScraperSpec(
+        "example_library", "scrapers.example_library_scraper:ExampleLibraryScraper",
+        display_name="Beispielbibliothek", supports_filters=True,
+    ),
+    ScraperSpec(
+        "noworzyn", "scrapers.noworzyn_scraper:NoworzynScraper",
+        display_name="Buchhandlung Noworzyn", needs_browser=True, filters=("mode",),
+    ),
+    ScraperSpec(
+        "onleihe_koeln", "scrapers.onleihe_koeln_scraper:OnleiheKoelnScraper",
+        display_name="Onleihe Köln", needs_browser=True, supports_pagination=True, filters=("max_pages", "max_results"),
+    ),
+)
+
+
+class ScraperRegistry(MutableMapping):
+    """
+    Bibliothek -> Scraper-Klasse. Verhält sich wie ein Dictionary; Mitgliedschaft,
+    Iteration und Fähigkeiten kommen ohne Import aus, erst `registry[name]`
+    lädt die Klasse.
+    """
+
+    def __init__(self, specs: Iterable[ScraperSpec] = ()):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._specs: Dict[str, ScraperSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    @classmethod
+    def from_config(cls) -> "ScraperRegistry":
+        registry = cls(BUILTIN_SCRAPERS)
+        registry.discover()
+        if config.LIBRARIES:
+            for name in [name for name in registry if name not in config.LIBRARIES]:
+                del registry[name]
+        return registry
+
+    def register(self, spec: ScraperSpec):
+        if spec.name in self._specs:
+            self.logger.warning(f"Scraper '{spec.name}' wird ersetzt")
+        self._specs[spec.name] = spec
+
+    def discover(self, group: str = ENTRY_POINT_GROUP):
+        """Registriert die Specs aus den Entry-Points installierter Pakete."""
+        for entry_point in _entry_points(group):
+            try:
+                loaded = entry_point.load()
+            except Exception as e:
+                self.logger.error(f"Scraper-Plugin '{entry_point.name}' konnte nicht geladen werden: {str(e)}")
+                continue
+            for spec in loaded if isinstance(loaded, (list, tuple)) else [loaded]:
+                if not isinstance(spec, ScraperSpec):
+                    self.logger.error(f"Scraper-Plugin '{entry_point.name}' liefert keine ScraperSpec")
+                    continue
+                self.register(spec)
+
+    def spec(self, name: str) -> ScraperSpec:
+        return self._specs[name]
+
+    def capabilities(self) -> Dict[str, Dict[str, Any]]:
+        return {name: spec.capabilities() for name, spec in self._specs.items()}
+
+    def loaded(self) -> List[str]:
+        """Bibliotheken, deren Scraper-Modul bereits importiert ist."""
+        return [name for name, spec in self._specs.items() if spec.loaded]
+
+    def needs_browser(self) -> bool:
+        return any(spec.needs_browser for spec in self._specs.values())
+
+    def __getitem__(self, name: str) -> Type[BaseScraper]:
+        return self._specs[name].load()
+
+    def __setitem__(self, name: str, scraper_class: Type[BaseScraper]):
+        # Direkt eingetragene Klassen übernehmen die Fähigkeiten eines vorhandenen Eintrags
+        previous = self._specs.get(name)
+        spec = ScraperSpec(name, scraper_class)
+        if previous is not None:
+            spec = ScraperSpec(
+                name, scraper_class, previous.display_name, previous.needs_browser,
+                previous.supports_pagination, previous.supports_filters, previous.filters,
+            )
+        self._specs[name] = spec
+
+    def __delitem__(self, name: str):
+        del self._specs[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+def _entry_points(group: str) -> List[Any]:
+    selected = entry_points()
+    # Python < 3.10 liefert ein Dictionary nach Gruppen
+    if hasattr(selected, "select"):
+        return list(selected.select(group=group))
+    return list(selected.get(group, ()))
+
+
+IMPORT_SECONDS = gauge("scraper_import_seconds", "Dauer des ersten Imports eines Scraper-Moduls", ["library"])
+
+scraper_registry = ScraperRegistry.from_config()
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.models import SearchRequest
+from scrapers.base_scraper import BaseScraper, LibraryTimeout
+from scrapers.registry import ScraperSpec
+from utils import config
+from utils.circuit_breaker import CLOSED, OPEN, circuit_breakers
+
+
+@pytest.fixture
+def broken_library():
+    main.LIBRARY_SCRAPERS.register(ScraperSpec("broken", "scrapers.does_not_exist:BrokenScraper"))
+    yield "broken"
+    del main.LIBRARY_SCRAPERS["broken"]
+
+
+def test_failed_scraper_load_settles_the_breaker_probe(broken_library):
+    breaker = circuit_breakers.get(broken_library)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    # Recovery timeout has passed: the next search is the half-open probe
+    breaker.opened_at = time.monotonic() - breaker.recovery_timeout
+
+    request = SearchRequest(query="test", libraries=[broken_library])
+    with pytest.raises(ImportError):
+        asyncio.run(main._scrape(broken_library, request, time.monotonic() + 10))
+
+    assert breaker.state == OPEN
+    assert not breaker._probe_running
+
+
+DETAILS_URL = "https://details.example.org/titel/1"
+
+
+class DetailsScraper(BaseScraper):
+    """Finds one thin record; its detail page adds ISBN and publisher."""
+
+    fetched = []
+
+    def __init__(self):
+        super().__init__("https://details.example.org")
+
+    async def search(self, query, **kwargs):
+        return [{"title": "Landgericht", "author": "Krechel, Ursula", "details_url": DETAILS_URL}]
+
+    def extract_metadata(self, soup):
+        return None
+
+    async def get_details(self, url):
+        DetailsScraper.fetched.append((self.library, url))
+        return {"isbn": "9783161484100", "publisher": "Jung und Jung"}
+
+    async def get_availability(self, url):
+        DetailsScraper.fetched.append((self.library, url))
+        return "verfügbar"
+
+
+@pytest.fixture
+def details_library():
+    main.LIBRARY_SCRAPERS.register(ScraperSpec("details_test", DetailsScraper))
+    DetailsScraper.fetched = []
+    yield "details_test"
+    del main.LIBRARY_SCRAPERS["details_test"]
+
+
+def test_details_enrich_records_found_by_the_server(details_library):
+    with TestClient(main.app) as client:
+        live = client.post("/search", json={"query": "Landgericht Krechel", "libraries": [details_library]})
+        assert live.json()["results"][0].get("publisher") is None
+
+        item = dict(live.json()["results"][0])
+        details = client.post("/details", json={"items": [item]})
+        assert details.status_code == 200
+        assert details.json()["enriched"] == 1
+        assert details.json()["results"][0]["library"] == details_library
+        assert details.json()["results"][0]["isbn"] == "9783161484100"
+        assert DetailsScraper.fetched == [(details_library, DETAILS_URL)]
+
+        response = client.post(
+            "/search", json={"query": "Landgericht", "libraries": [details_library], "local_first": True}
+        )
+        body = response.json()
+        assert body["cache"] == {details_library: "index"}
+        assert body["results"][0]["library"] == details_library
+        assert body["results"][0]["publisher"] == "Jung und Jung"
+
+
+def test_details_do_not_index_client_items(details_library):
+    item = {
+        "title": "Eingeschleust",
+        "author": "Niemand, Nina",
+        "details_url": "https://details.example.org/titel/2",
+        "library": details_library,
+    }
+    with TestClient(main.app) as client:
+        assert client.post("/details", json={"items": [item]}).json()["enriched"] == 1
+        response = client.post(
+            "/search", json={"query": "Eingeschleust", "libraries": [details_library], "local_first": True}
+        )
+    assert response.json()["cache"] != {details_library: "index"}
+    assert all(book["title"] != "Eingeschleust" for book in response.json()["results"])
+
+
+@pytest.mark.parametrize("url", [
+    "http://169.254.169.254/latest/meta-data/",
+    "https://details.example.org.internal.test/titel/1",
+    "https://details.example.org:6379/titel/1",
+    "file:///etc/passwd",
+])
+def test_details_only_fetch_pages_of_the_library(details_library, url):
+    item = {"title": "Landgericht", "details_url": url, "library": details_library}
+    with TestClient(main.app) as client:
+        response = client.post("/details", json={"items": [item]})
+    assert response.status_code == 200
+    assert response.json()["enriched"] == 0
+    assert response.json()["results"][0]["details_url"] == url
+    assert DetailsScraper.fetched == []
+    if url.startswith("http"):
+        assert response.json()["errors"] == [f"Detailseite {url} gehört nicht zu '{details_library}'"]
+
+
+def test_details_limit_the_number_of_items(details_library, monkeypatch):
+    monkeypatch.setattr(config, "ENRICH_MAX_ITEMS", 1)
+    items = [{"title": f"Titel {n}", "library": details_library} for n in range(2)]
+    with TestClient(main.app) as client:
+        assert client.post("/details", json={"items": items}).status_code == 400
+
+
+def test_index_records_with_a_library_key_are_accepted():
+    result = main.LibraryResult("onleihe_koeln", [{"title": "Landgericht", "library": "noworzyn"}])
+    assert [book.library for book in result.metadata()] == ["onleihe_koeln"]
+
+
+def test_availability_only_checks_pages_of_the_library(details_library):
+    items = [
+        {"library": details_library, "url": "https://details.example.org/titel/3"},
+        {"library": details_library, "url": "http://10.0.0.1:8080/admin"},
+    ]
+    with TestClient(main.app) as client:
+        results = client.post("/availability", json={"items": items}).json()["results"]
+    assert results[0]["availability"] == "verfügbar" and results[0]["error"] is None
+    assert results[1]["availability"] is None
+    assert results[1]["error"] == "URL gehört nicht zur Bibliothek"
+    assert DetailsScraper.fetched == [(details_library, "https://details.example.org/titel/3")]
+
+
+def test_new_scraper_imports_the_module_off_the_event_loop(monkeypatch):
+    spec = ScraperSpec("lazy_test", "test_api:DetailsScraper")
+    threads = []
+    load = spec.load
+
+    def recording_load():
+        threads.append(threading.current_thread())
+        return load()
+
+    monkeypatch.setattr(spec, "load", recording_load)
+    main.LIBRARY_SCRAPERS.register(spec)
+    try:
+        scraper = asyncio.run(main._new_scraper("lazy_test"))
+    finally:
+        del main.LIBRARY_SCRAPERS["lazy_test"]
+    assert scraper.library == "lazy_test"
+    assert threads[0] is not threading.main_thread()
+
+
+class TimeoutScraper(BaseScraper):
+    """Times out on its own (like an aiohttp read timeout) or runs past the budget."""
+
+    def __init__(self):
+        super().__init__("https://timeout.example.org")
+
+    async def search(self, query, **kwargs):
+        if query == "lesetimeout":
+            raise asyncio.TimeoutError()
+        self.partial_results.append({"title": "Teilergebnis"})
+        await asyncio.sleep(10)
+        return []
+
+    def extract_metadata(self, soup):
+        return None
+
+
+@pytest.fixture
+def timeout_library():
+    main.LIBRARY_SCRAPERS.register(ScraperSpec("timeout_test", TimeoutScraper))
+    yield "timeout_test"
+    del main.LIBRARY_SCRAPERS["timeout_test"]
+    circuit_breakers.get("timeout_test").record_success()
+
+
+def test_upstream_timeout_is_a_library_error(timeout_library):
+    breaker = circuit_breakers.get(timeout_library)
+    request = SearchRequest(query="lesetimeout", libraries=[timeout_library])
+    with pytest.raises(LibraryTimeout):
+        asyncio.run(main._scrape(timeout_library, request, time.monotonic() + 10))
+    assert breaker.failures == 1
+
+    result = asyncio.run(main._lookup_library(timeout_library, request, time.monotonic() + 10))
+    assert not result.timed_out
+    assert result.error == f"Fehler bei '{timeout_library}': Zeitüberschreitung: TimeoutError"
+
+
+def test_exhausted_budget_returns_partial_results(timeout_library):
+    breaker = circuit_breakers.get(timeout_library)
+    request = SearchRequest(query="langsam", libraries=[timeout_library])
+    result = asyncio.run(main._scrape(timeout_library, request, time.monotonic() + 0.05))
+    assert result.timed_out and result.truncated
+    assert result.items == [{"title": "Teilergebnis"}]
+    assert breaker.state == CLOSED and breaker.failures == 0
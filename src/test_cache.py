@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+import pytest
+
+from api import main
+from api.models import SearchRequest
+from scrapers.base_scraper import BaseScraper
+from scrapers.registry import ScraperSpec
+from utils.cache import CACHE_HIT, CACHE_MISS, CACHE_STALE, SearchCache, SQLiteCache, make_cache_key
+
+ITEMS = [{"title": "Landgericht", "author": "Krechel, Ursula"}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def test_cache_key_normalizes_query_and_filters():
+    assert make_cache_key("a", "  Müller\tHeinz ", {"y": 1, "x": 2}) == make_cache_key("a", "müller heinz", {"x": 2, "y": 1})
+    assert make_cache_key("a", "müller") != make_cache_key("b", "müller")
+    assert make_cache_key("a", "müller") != make_cache_key("a", "müller", {"format": "ebook"})
+
+
+@pytest.mark.parametrize("library, age, expected", [
+    ("a", 0, CACHE_HIT),
+    ("a", 100, CACHE_HIT),
+    ("a", 101, CACHE_STALE),
+    ("a", 150, CACHE_STALE),
+    ("a", 151, CACHE_MISS),
+    # Per-library TTL
+    ("b", 250, CACHE_HIT),
+    ("b", 301, CACHE_STALE),
+])
+def test_entries_turn_stale_then_expire(library, age, expected):
+    clock = FakeClock()
+    cache = SearchCache(ttl=100, stale_ttl=50, library_ttls={"b": 300}, clock=clock)
+
+    async def scenario():
+        await cache.set(library, "key", ITEMS)
+        clock.advance(age)
+        return await cache.get(library, "key")
+
+    results, status = asyncio.run(scenario())
+    assert status == expected
+    assert results == (None if expected == CACHE_MISS else ITEMS)
+
+
+def test_expired_entries_are_dropped_and_least_recently_used_evicted():
+    clock = FakeClock()
+    cache = SearchCache(max_entries=2, ttl=100, stale_ttl=50, clock=clock)
+
+    async def scenario():
+        await cache.set("a", "old", ITEMS)
+        clock.advance(200)
+        assert (await cache.get("a", "old"))[1] == CACHE_MISS
+        assert len(cache.memory) == 0
+
+        for key in ("one", "two"):
+            await cache.set("a", key, ITEMS)
+        await cache.get("a", "one")
+        await cache.set("a", "three", ITEMS)
+        return [(await cache.get("a", key))[1] for key in ("one", "two", "three")]
+
+    assert asyncio.run(scenario()) == [CACHE_HIT, CACHE_MISS, CACHE_HIT]
+
+
+def test_persistent_tier_survives_restart_and_keeps_age():
+    clock = FakeClock()
+    key = make_cache_key("a", "persistent-tier")
+
+    async def scenario():
+        await SearchCache(ttl=100, stale_ttl=50, persistent=SQLiteCache(), clock=clock).set("a", key, ITEMS)
+        clock.advance(120)
+        restarted = SearchCache(ttl=100, stale_ttl=50, persistent=SQLiteCache(), clock=clock)
+        status = (await restarted.get("a", key))[1]
+        return status, restarted.memory.get(key)
+
+    status, promoted = asyncio.run(scenario())
+    assert status == CACHE_STALE
+    assert promoted == (ITEMS, clock.now - 120)
+
+
+class CountingScraper(BaseScraper):
+    searches = 0
+
+    def __init__(self):
+        super().__init__("https://counting.example.org")
+
+    async def search(self, query, **kwargs):
+        CountingScraper.searches += 1
+        await asyncio.sleep(0)
+        return [{"title": "Frisch", "author": "Neu, Nora"}]
+
+    def extract_metadata(self, soup):
+        return None
+
+
+@pytest.fixture
+def counting_library():
+    main.LIBRARY_SCRAPERS.register(ScraperSpec("cache_test", CountingScraper))
+    CountingScraper.searches = 0
+    yield "cache_test"
+    del main.LIBRARY_SCRAPERS["cache_test"]
+
+
+def test_stale_entry_is_served_and_refreshed_once(counting_library):
+    request = SearchRequest(query="stale-while-revalidate", libraries=[counting_library])
+    key = make_cache_key(counting_library, request.query, request.filters)
+    ttl = main.search_cache.ttl_for(counting_library)
+    main.search_cache.memory.set(key, ITEMS, created_at=time.time() - ttl - 1)
+
+    async def scenario():
+        deadline = time.monotonic() + 10
+        first = await main._lookup_library(counting_library, request, deadline)
+        second = await main._lookup_library(counting_library, request, deadline)
+        refresh = main._refresh_tasks[key]
+        searches_before_refresh = CountingScraper.searches
+        await refresh
+        return first, second, searches_before_refresh, await main.search_cache.get(counting_library, key)
+
+    first, second, searches_before_refresh, (results, status) = asyncio.run(scenario())
+    assert (first.cache, first.items) == (CACHE_STALE, ITEMS)
+    assert second.cache == CACHE_STALE
+    assert searches_before_refresh == 0
+    assert CountingScraper.searches == 1
+    assert key not in main._refresh_tasks
+    assert status == CACHE_HIT and results[0]["title"] == "Frisch"
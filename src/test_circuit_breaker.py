@@ -0,0 +1,198 @@
+import asyncio
+import time
+
+import pytest
+
+from scrapers.base_scraper import BaseScraper
+from utils import config
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, circuit_breakers
+from utils.http_client import HttpError, HttpResponse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def _breaker(clock):
+    return CircuitBreaker("katalog", failure_threshold=3, recovery_timeout=30.0, clock=clock)
+
+
+def test_opens_after_consecutive_failures():
+    breaker = _breaker(FakeClock())
+    for _ in range(2):
+        breaker.check()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_success_resets_failure_count():
+    breaker = _breaker(FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_admits_exactly_one_probe():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.advance(29)
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(1)
+
+    clock.advance(1)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_for_full_timeout():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == pytest.approx(30)
+    assert breaker.is_open()
+
+
+def test_released_probe_can_be_taken_again():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    breaker.check()
+    breaker.release_probe()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_backoff_is_capped_and_respects_retry_after(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_RETRY_BACKOFF", 0.5)
+    monkeypatch.setattr(config, "HTTP_RETRY_MAX_DELAY", 8.0)
+    # Upper end of the jitter interval
+    monkeypatch.setattr("scrapers.base_scraper.random.uniform", lambda low, high: high)
+    assert [BaseScraper._backoff(attempt) for attempt in range(6)] == [0.5, 1.0, 2.0, 4.0, 8.0, 8.0]
+    assert BaseScraper._backoff(0, retry_after=3.0) == 3.0
+    assert BaseScraper._backoff(0, retry_after=120.0) == 8.0
+
+    monkeypatch.setattr("scrapers.base_scraper.random.uniform", lambda low, high: low)
+    assert BaseScraper._backoff(4) == 0.0
+
+
+class FakeHttp:
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    async def request(self, method, url, **kwargs):
+        self.calls += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        return HttpResponse(url, status, {}, b"ok")
+
+
+class HttpScraper(BaseScraper):
+    def __init__(self, http):
+        super().__init__("https://katalog.example.org", http=http)
+
+    async def search(self, query, **kwargs):
+        return []
+
+    def extract_metadata(self, soup):
+        return None
+
+    async def _throttle(self, url=None):
+        pass
+
+
+def _request(scraper, **kwargs):
+    return asyncio.run(scraper._make_request("https://katalog.example.org/suche", use_cache=False, **kwargs))
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_RETRIES", 2)
+    monkeypatch.setattr(BaseScraper, "_backoff", staticmethod(lambda attempt, retry_after=None: 0.001))
+
+
+def test_transient_errors_are_retried(fast_backoff):
+    http = FakeHttp(503, 429)
+    response = _request(HttpScraper(http))
+    assert response.status == 200
+    assert http.calls == 3
+
+
+def test_retries_are_limited(fast_backoff):
+    http = FakeHttp(503, 503, 503, 503)
+    with pytest.raises(HttpError):
+        _request(HttpScraper(http))
+    assert http.calls == 3
+
+
+def test_permanent_errors_are_not_retried(fast_backoff):
+    http = FakeHttp(404)
+    with pytest.raises(HttpError):
+        _request(HttpScraper(http))
+    assert http.calls == 1
+
+
+def test_no_retry_beyond_deadline(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_RETRIES", 2)
+    monkeypatch.setattr(BaseScraper, "_backoff", staticmethod(lambda attempt, retry_after=None: 5.0))
+    http = FakeHttp(503)
+    scraper = HttpScraper(http)
+    scraper.deadline = time.monotonic() + 1.0
+    started = time.monotonic()
+    with pytest.raises(HttpError):
+        _request(scraper)
+    assert http.calls == 1
+    assert time.monotonic() - started < 1.0
+
+
+def test_open_breaker_fails_requests_immediately(fast_backoff):
+    http = FakeHttp()
+    scraper = HttpScraper(http)
+    scraper.library = "test_breaker_library"
+    breaker = circuit_breakers.get(scraper.library)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    try:
+        with pytest.raises(CircuitOpenError):
+            _request(scraper)
+        assert http.calls == 0
+    finally:
+        breaker.record_success()
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from utils.covers import ORIGINAL, CoverProxy, CoverStore
+from utils.http_client import HttpClient, ResponseTooLarge
+
+MAX_BYTES = 64 * 1024
+SMALL = b"\x89PNG" + b"\0" * 100
+
+
+async def _small(request):
+    return web.Response(body=SMALL, content_type="image/png")
+
+
+async def _big_streamed(request):
+    # Chunked transfer without Content-Length: the limit must apply while reading
+    response = web.StreamResponse(headers={"Content-Type": "image/png"})
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    try:
+        for _ in range(64):
+            await response.write(b"\0" * 16 * 1024)
+    except ConnectionError:
+        pass
+    return response
+
+
+async def _big_declared(request):
+    return web.Response(body=b"\0" * (MAX_BYTES + 1), content_type="image/png")
+
+
+def _run(scenario, tmp_path):
+    async def main():
+        app = web.Application()
+        app.router.add_get("/small.png", _small)
+        app.router.add_get("/big-streamed.png", _big_streamed)
+        app.router.add_get("/big-declared.png", _big_declared)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        http = HttpClient()
+        proxy = CoverProxy(CoverStore(str(tmp_path)), http=http, max_bytes=MAX_BYTES)
+        try:
+            return await scenario(proxy, f"http://127.0.0.1:{port}")
+        finally:
+            proxy.close()
+            await http.close()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_register_adds_cover_and_keeps_original_urls(tmp_path):
+    async def scenario(proxy, base):
+        items = [
+            {"title": "Mit Cover", "cover_url": f"{base}/small.png"},
+            {"title": "Relativ", "image_url": "/small.png", "details_url": f"{base}/details/1"},
+            {"title": "Ohne Cover"},
+        ]
+        await proxy.register("test", items)
+        return items
+
+    items = _run(scenario, tmp_path)
+    assert items[0]["cover"].startswith("/covers/")
+    assert items[0]["cover_url"].endswith("/small.png")
+    assert items[1]["cover"].startswith("/covers/")
+    assert items[1]["image_url"] == "/small.png"
+    assert "cover" not in items[2]
+
+
+def test_small_cover_is_fetched_and_stored(tmp_path):
+    async def scenario(proxy, base):
+        items = [{"cover_url": f"{base}/small.png"}]
+        await proxy.register("test", items)
+        return await proxy.get(items[0]["cover"].rsplit("/", 1)[1], ORIGINAL)
+
+    path, media_type, etag = _run(scenario, tmp_path)
+    assert media_type == "image/png"
+    with open(path, "rb") as f:
+        assert f.read() == SMALL
+
+
+@pytest.mark.parametrize("name", ["big-streamed.png", "big-declared.png"])
+def test_oversized_cover_is_aborted(tmp_path, name):
+    async def scenario(proxy, base):
+        items = [{"cover_url": f"{base}/{name}"}]
+        await proxy.register("test", items)
+        with pytest.raises(ResponseTooLarge):
+            await proxy.get(items[0]["cover"].rsplit("/", 1)[1], ORIGINAL)
+
+    _run(scenario, tmp_path)
+    assert list(tmp_path.rglob("*.png")) == []
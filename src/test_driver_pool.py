@@ -0,0 +1,159 @@
+import asyncio
+import threading
+
+import pytest
+
+from scrapers import noworzyn_scraper
+from scrapers.noworzyn_scraper import NoworzynScraper
+from utils.driver_pool import DriverPoolError, WebDriverPool
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.pages = []
+        self.quit_called = False
+        self.healthy = True
+
+    def get(self, url):
+        self.pages.append(url)
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("Browser abgestürzt")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def _pool(**kwargs):
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver(len(drivers)))
+        return drivers[-1]
+
+    kwargs.setdefault("min_size", 0)
+    return WebDriverPool(driver_factory=factory, **kwargs), drivers
+
+
+def test_released_driver_is_reset_and_reused():
+    pool, drivers = _pool(max_size=2)
+    driver = pool.acquire()
+    pool.release(driver)
+    assert driver.pages == ["about:blank"]
+    assert pool.acquire() is driver
+    assert len(drivers) == 1
+    assert pool.stats() == {"size": 1, "idle": 0, "leased": 1, "max_size": 2}
+
+
+def test_exhausted_pool_times_out_then_waits_for_a_release():
+    pool, drivers = _pool(max_size=1)
+    driver = pool.acquire()
+    with pytest.raises(DriverPoolError):
+        pool.acquire(timeout=0.05)
+
+    leased = []
+    waiter = threading.Thread(target=lambda: leased.append(pool.acquire(timeout=5)))
+    waiter.start()
+    pool.release(driver)
+    waiter.join(5)
+    assert leased == [driver]
+    assert len(drivers) == 1
+
+
+def test_discarded_driver_is_quit_and_replaced_up_to_min_size():
+    pool, drivers = _pool(min_size=1, max_size=2)
+    pool.start()
+    driver = pool.acquire()
+    pool.release(driver, discard=True)
+    assert driver.quit_called
+    assert len(drivers) == 2
+    assert pool.stats()["size"] == 1 and pool.stats()["idle"] == 1
+    pool.close()
+    assert drivers[1].quit_called
+
+
+def test_worn_out_and_crashed_drivers_are_replaced():
+    pool, drivers = _pool(max_size=1, max_uses=2)
+    driver = pool.acquire()
+    pool.release(driver)
+    assert pool.acquire() is driver
+    pool.release(driver)
+    assert driver.quit_called and pool.stats()["size"] == 0
+
+    crashed = pool.acquire()
+    pool.release(crashed)
+    crashed.healthy = False
+    replacement = pool.acquire()
+    assert replacement is not crashed and crashed.quit_called
+    assert pool.stats()["size"] == 1
+
+
+def test_failing_factory_frees_its_slot():
+    pool = WebDriverPool(min_size=0, max_size=1, driver_factory=lambda: 1 / 0)
+    with pytest.raises(DriverPoolError):
+        pool.acquire()
+    assert pool.stats()["size"] == 0
+
+
+def test_idle_drivers_are_evicted_down_to_min_size():
+    clock = FakeClock()
+    pool, drivers = _pool(min_size=1, max_size=3, idle_timeout=60, clock=clock)
+    leased = [pool.acquire() for _ in range(3)]
+    for driver in leased:
+        pool.release(driver)
+        clock.advance(10)
+
+    pool.evict_idle()
+    assert pool.stats()["size"] == 3
+
+    clock.advance(35)
+    pool.evict_idle()
+    # Only the driver idle for longer than 60s (65s) goes
+    assert [driver.quit_called for driver in leased] == [True, False, False]
+
+    clock.advance(100)
+    pool.evict_idle()
+    assert pool.stats()["size"] == 1
+    assert [driver.quit_called for driver in leased] == [True, True, False]
+
+
+def test_driver_busy_with_a_cancelled_step_is_discarded(monkeypatch):
+    pool, drivers = _pool(max_size=1)
+    monkeypatch.setattr(noworzyn_scraper, "driver_pool", pool)
+    scraper = NoworzynScraper()
+    scraper.driver = pool.acquire()
+    step_running = threading.Event()
+    release_step = threading.Event()
+
+    def slow_step():
+        step_running.set()
+        release_step.wait(5)
+
+    async def scenario():
+        task = asyncio.ensure_future(scraper._run_blocking(slow_step))
+        await asyncio.get_running_loop().run_in_executor(None, step_running.wait, 5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        busy = scraper.busy
+        scraper.cleanup()
+        release_step.set()
+        return busy
+
+    assert asyncio.run(scenario())
+    assert drivers[0].quit_called
+    assert drivers[0].pages == []
+    assert pool.stats() == {"size": 0, "idle": 0, "leased": 0, "max_size": 1}
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from api import main
+from api.models import SearchRequest
+from scrapers.base_scraper import BaseScraper
+from scrapers.registry import ScraperSpec
+from utils.export import FORMATS, export_batches, export_bibtex
+
+RECORDS = [
+    {"library": "a", "title": "Landgericht", "author": "Krechel, Ursula", "year": "2012", "isbn": "3-16-148410-X"},
+    {"library": "b", "title": "Landgericht", "author": "Ursula Krechel", "year": "2012"},
+    {"library": "b", "title": "Über & unter 100%", "url": "https://example.org/a_b?q={x}&p=100%"},
+]
+
+
+def test_bibtex_escapes_url():
+    entry = "".join(export_bibtex([RECORDS[2]]))
+    assert r"url = {https://example.org/a\_b?q=\{x\}\&p=100\%}" in entry
+    assert entry.count("{") - entry.count(r"\{") == entry.count("}") - entry.count(r"\}")
+
+
+async def _batches(*batches):
+    for batch in batches:
+        await asyncio.sleep(0)
+        yield batch
+
+
+def _collect(export, *batches):
+    async def main():
+        return [text async for text in export_batches(export, _batches(*batches))]
+
+    return "".join(asyncio.run(main()))
+
+
+@pytest.mark.parametrize("format", sorted(FORMATS))
+def test_export_batches_matches_export(format):
+    export = FORMATS[format][0]
+    expected = "".join(export(RECORDS))
+    assert _collect(export, RECORDS[:1], [], RECORDS[1:]) == expected
+    assert _collect(export) == "".join(export([]))
+
+
+class FastScraper(BaseScraper):
+    def __init__(self):
+        super().__init__("https://fast.example.org")
+
+    async def search(self, query, **kwargs):
+        return [{"title": "Schnell", "author": "Eilig, Erna"}]
+
+    def extract_metadata(self, soup):
+        return None
+
+
+class SlowScraper(BaseScraper):
+    release: asyncio.Event = None
+
+    def __init__(self):
+        super().__init__("https://slow.example.org")
+
+    async def search(self, query, **kwargs):
+        await SlowScraper.release.wait()
+        return [{"title": "Langsam", "author": "Träge, Tom"}]
+
+    def extract_metadata(self, soup):
+        return None
+
+
+@pytest.fixture
+def libraries():
+    main.LIBRARY_SCRAPERS.register(ScraperSpec("export_fast", FastScraper))
+    main.LIBRARY_SCRAPERS.register(ScraperSpec("export_slow", SlowScraper))
+    yield ["export_slow", "export_fast"]
+    del main.LIBRARY_SCRAPERS["export_fast"]
+    del main.LIBRARY_SCRAPERS["export_slow"]
+
+
+def test_export_streams_each_library_when_it_is_done(libraries):
+    async def scenario():
+        SlowScraper.release = asyncio.Event()
+        request = SearchRequest(query="export-streaming", libraries=libraries)
+        output = main._export_response(main._export_search(request), "jsonl", "suche").body_iterator
+        first = await asyncio.wait_for(output.__anext__(), timeout=5)
+        SlowScraper.release.set()
+        rest = [text async for text in output]
+        return first, rest
+
+    first, rest = asyncio.run(scenario())
+    assert '"Schnell"' in first
+    assert len(rest) == 1 and '"Langsam"' in rest[0]
@@ -0,0 +1,130 @@
+import pytest
+import soupsieve
+from bs4 import BeautifulSoup
+
+from scrapers.base_scraper import BaseScraper
+from scrapers.extraction import Field, RuleExtraction, _SimpleMatcher, compile_rules, compile_selector
+
+FIXTURE = """
+<div class="result">
+  <h2 class="title main">Landgericht</h2>
+  <span class="media-title">Landgericht (E-Book)</span>
+  <p class="author">Krechel, Ursula</p>
+  <p class="metadata" data-year="2012">Jung und Jung, 2012</p>
+  <img class="cover thumb" src="/cover/1.jpg" alt="">
+  <a class="details-link" href="/titel/1" rel="nofollow">Details</a>
+  <a href="/titel/1/merken" rel="bookmark">Merken</a>
+  <input type="checkbox" name="merkliste" value="1">
+  <ul class="formats">
+    <li class="format">E-Book</li>
+    <li class="format selected">Hörbuch</li>
+  </ul>
+</div>
+<div class="result">
+  <h2 class="title">Ohne Cover</h2>
+  <a class="details-link" href="/titel/2">Details</a>
+</div>
+"""
+
+SELECTORS = [
+    # tag
+    "h2",
+    "li",
+    "table",
+    "H2",
+    # class
+    ".title",
+    ".format",
+    ".missing",
+    # tag.class
+    "p.author",
+    "span.title",
+    "IMG.cover",
+    # attribute
+    "[href]",
+    "img[src]",
+    "a[rel]",
+    "a[REL]",
+    # attribute with value
+    "a[rel='nofollow']",
+    'input[type="checkbox"]',
+    "a[href='/titel/2']",
+    "[rel='external']",
+    "input[type='CHECKBOX']",
+    "[REL='nofollow']",
+    "a[rel='NOFOLLOW']",
+    # alternatives
+    ".title, .media-title",
+    ".media-title, .title",
+    "h2.title, h2.main",
+    # multi-valued class
+    ".main",
+    "img.thumb",
+    "li.selected",
+    "[class='title main']",
+    "[class='main title']",
+    "[class='title']",
+]
+
+
+@pytest.fixture(scope="module", params=["html.parser", "lxml"])
+def soup(request):
+    return BeautifulSoup(FIXTURE, request.param)
+
+
+@pytest.mark.parametrize("selector", SELECTORS)
+def test_compiled_selector_matches_soupsieve(soup, selector):
+    compiled = compile_selector(selector)
+    # The table is about the fast path; soupsieve fallbacks would compare with themselves
+    assert isinstance(compiled, _SimpleMatcher)
+    expected = soupsieve.compile(selector)
+    for container in [soup, *soup.select("div.result")]:
+        assert compiled.select(container) == expected.select(container)
+        assert compiled.select_one(container) is expected.select_one(container)
+
+
+@pytest.mark.parametrize("selector", ["div > h2", "a:not([rel])", ".title, p", "a[href^='/titel']"])
+def test_other_selectors_fall_back_to_soupsieve(selector):
+    assert isinstance(compile_selector(selector), soupsieve.SoupSieve)
+
+
+class RuleScraper(RuleExtraction, BaseScraper):
+    EXTRACTOR = compile_rules({
+        "title": Field(".title"),
+        "details_url": Field("a.details-link", attr="href", url=True),
+        "cover_url": Field("img.cover", attr="src", url=True),
+    }, required=("title",))
+
+    def __init__(self):
+        super().__init__("https://katalog.example.org")
+
+    async def search(self, query, **kwargs):
+        return []
+
+
+def test_rule_extraction_implements_extract_metadata(soup):
+    scraper = RuleScraper()
+    assert [scraper.extract_metadata(item) for item in soup.select("div.result")] == [
+        {
+            "title": "Landgericht",
+            "details_url": "https://katalog.example.org/titel/1",
+            "cover_url": "https://katalog.example.org/cover/1.jpg",
+        },
+        {"title": "Ohne Cover", "details_url": "https://katalog.example.org/titel/2"},
+    ]
+
+
+def test_extract_metadata_stays_abstract():
+    class NoExtraction(BaseScraper):
+        async def search(self, query, **kwargs):
+            return []
+
+    with pytest.raises(TypeError):
+        NoExtraction("https://katalog.example.org")
+
+
+def test_rule_extraction_requires_rules():
+    with pytest.raises(TypeError, match="EXTRACTOR"):
+        class NoRules(RuleExtraction, BaseScraper):
+            async def search(self, query, **kwargs):
+                return []
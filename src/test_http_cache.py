@@ -0,0 +1,120 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from scrapers.base_scraper import BaseScraper
+from utils import config
+from utils.http_cache import HttpCache, cache_key, freshness_lifetime, http_cache
+from utils.http_client import HttpResponse
+
+URL = "https://katalog.example.org/details/1"
+
+
+@pytest.mark.parametrize("cache_control, lifetime", [
+    ("max-age=60", 60.0),
+    ("public, max-age=60", 60.0),
+    ("no-cache", 0.0),
+    ("no-store", None),
+    ("private", None),
+    ("private, max-age=60", None),
+    ('max-age=60, private="Set-Cookie"', None),
+    ("x-private-extension, max-age=5", 5.0),
+])
+def test_freshness_lifetime(cache_control, lifetime):
+    assert freshness_lifetime({"Cache-Control": cache_control}, now=0.0) == lifetime
+
+
+def test_private_responses_are_not_stored(tmp_path):
+    cache = HttpCache(str(tmp_path / "http_cache.db"))
+    private = HttpResponse(URL, 200, {"Cache-Control": "private, max-age=60"}, b"mein Konto")
+    public = HttpResponse(URL, 200, {"Cache-Control": "max-age=60"}, b"Katalog")
+    assert not cache.set("private", private)
+    assert cache.set("public", public)
+    assert cache.get("private") is None
+    cache.close()
+
+
+def test_revalidation_turning_private_drops_the_entry(tmp_path):
+    cache = HttpCache(str(tmp_path / "http_cache.db"))
+    cache.set("key", HttpResponse(URL, 200, {"ETag": '"v1"'}, b"Katalog"))
+    assert cache.refresh("key", {"Cache-Control": "private"}).content == b"Katalog"
+    assert cache.get("key") is None
+    cache.close()
+
+
+class EvictingHttp:
+    """Answers the conditional request with 304 after the entry was evicted."""
+
+    def __init__(self, key):
+        self.key = key
+        self.requests = []
+
+    async def request(self, method, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        if headers and "If-None-Match" in headers:
+            with http_cache._lock:
+                with http_cache._connect() as connection:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (self.key,))
+            return HttpResponse(url, 304, {"ETag": '"v1"'}, b"")
+        return HttpResponse(url, 200, {"ETag": '"v2"'}, b"neu")
+
+
+class HttpScraper(BaseScraper):
+    def __init__(self, http):
+        super().__init__("https://katalog.example.org", http=http)
+
+    async def search(self, query, **kwargs):
+        return []
+
+    def extract_metadata(self, soup):
+        return None
+
+    async def _throttle(self, url=None):
+        pass
+
+
+def test_not_modified_for_evicted_entry_refetches_unconditionally(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", True)
+    key = cache_key(URL)
+    http_cache.set(key, HttpResponse(URL, 200, {"ETag": '"v1"'}, b"alt"))
+    http = EvictingHttp(key)
+
+    response = asyncio.run(HttpScraper(http)._make_request(URL, headers={"Accept-Language": "de"}))
+
+    assert response.status == 200
+    assert response.content == b"neu"
+    assert [("If-None-Match" in headers) for headers in http.requests] == [True, False]
+    assert http.requests[1] == {"Accept-Language": "de"}
+    assert http_cache.get(key).response.content == b"neu"
+
+
+class CountingHttp:
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = 0
+
+    async def request(self, method, url, headers=None, **kwargs):
+        self.requests += 1
+        return HttpResponse(url, self.status, {"ETag": '"v1"'}, b"" if self.status == 304 else b"live")
+
+
+def _fail(*args, **kwargs):
+    raise sqlite3.OperationalError("disk I/O error")
+
+
+@pytest.mark.parametrize("status, content", [(200, b"live"), (304, b"alt")])
+def test_cache_write_errors_do_not_fail_the_request(monkeypatch, status, content):
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", True)
+    url = f"{URL}?status={status}"
+    key = cache_key(url)
+    if status == 304:
+        http_cache.set(key, HttpResponse(url, 200, {"ETag": '"v1"'}, b"alt"))
+    monkeypatch.setattr(http_cache, "set", _fail)
+    monkeypatch.setattr(http_cache, "refresh", _fail)
+    http = CountingHttp(status)
+
+    response = asyncio.run(HttpScraper(http)._make_request(url))
+
+    assert response.content == content
+    assert http.requests == 1
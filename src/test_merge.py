@@ -0,0 +1,59 @@
+from utils.merge import fuzzy_key, merge_results, normalize_isbn
+
+
+def test_normalize_isbn_converts_isbn10_to_isbn13():
+    assert normalize_isbn("3-16-148410-X") == "9783161484100"
+    assert normalize_isbn("978-3-16-148410-0") == "9783161484100"
+    assert normalize_isbn("ISBN 3 16 148410 X (kart.)") == "9783161484100"
+
+
+def test_normalize_isbn_rejects_invalid_check_digits():
+    assert normalize_isbn("3-16-148410-1") is None
+    assert normalize_isbn("978-3-16-148410-1") is None
+    assert normalize_isbn("") is None
+    assert normalize_isbn(None) is None
+
+
+def test_merge_isbn10_and_isbn13_into_one_work():
+    works = merge_results([
+        {"library": "a", "title": "Landgericht", "author": "Krechel, Ursula", "isbn": "3-16-148410-X"},
+        {"library": "b", "title": "Ganz anders", "isbn": "9783161484100"},
+    ])
+    assert len(works) == 1
+    assert works[0]["key"] == "isbn:9783161484100"
+    assert [holding["library"] for holding in works[0]["holdings"]] == ["a", "b"]
+
+
+def test_fuzzy_key_ignores_case_diacritics_articles_and_subtitles():
+    assert fuzzy_key("Die Blechtrommel: Roman", "Grass, Günter") == fuzzy_key("blechtrommel", "Günter Grass")
+    assert fuzzy_key("Müller", "Süß, Anna") == fuzzy_key("Muller", "Anna Suss")
+
+
+def test_merge_fuzzy_title_and_author():
+    works = merge_results([
+        {"library": "a", "title": "Landgericht: Roman", "author": "Krechel, Ursula", "year": "2012"},
+        {"library": "b", "title": "Landgericht", "author": "Ursula Krechel", "publisher": "Jung und Jung"},
+    ])
+    assert len(works) == 1
+    assert works[0]["year"] == "2012"
+    assert works[0]["publisher"] == "Jung und Jung"
+
+
+def test_merge_keeps_different_authors_apart():
+    works = merge_results([
+        {"library": "a", "title": "Gedichte", "author": "Rilke, Rainer Maria"},
+        {"library": "b", "title": "Gedichte", "author": "Heine, Heinrich"},
+    ])
+    assert len(works) == 2
+
+
+def test_merge_without_author_does_not_fuzzy_merge():
+    assert fuzzy_key("Gedichte", None) is None
+    assert fuzzy_key("Tagebuch", "") is None
+    works = merge_results([
+        {"library": "a", "title": "Gedichte"},
+        {"library": "b", "title": "Gedichte"},
+        {"library": "c", "title": "Gedichte", "author": "Heine, Heinrich"},
+    ])
+    assert len(works) == 3
+    assert len({work["key"] for work in works}) == 3
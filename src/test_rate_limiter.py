@@ -0,0 +1,136 @@
+import asyncio
+
+from utils.rate_limiter import PRIORITY_BACKGROUND, RateLimiter, _HostBucket, request_flow, request_priority
+
+URL = "https://katalog.example.org/suche"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def test_bucket_refills_at_rate_up_to_burst():
+    clock = FakeClock()
+    bucket = _HostBucket("host", rate=2.0, burst=3.0, clock=clock)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.advance(0.4)
+    assert not bucket.try_acquire()
+    clock.advance(0.1)
+    assert bucket.try_acquire()
+
+    clock.advance(60)
+    bucket._refill()
+    assert bucket.tokens == 3.0
+
+
+# Very low rate: the bucket's real-time timer never fires during a test, tokens
+# only appear by advancing the fake clock and calling dispatch() explicitly
+RATE = 0.001
+TOKEN = 1 / RATE
+
+
+async def _acquire(limiter: RateLimiter, name: str, done: list, priority=None, flow=None):
+    if priority is not None:
+        request_priority.set(priority)
+    if flow is not None:
+        request_flow.set(flow)
+    await limiter.acquire(URL)
+    done.append(name)
+
+
+async def _release_one(limiter: RateLimiter, clock: FakeClock):
+    clock.advance(TOKEN)
+    limiter._buckets["katalog.example.org"].dispatch()
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def _run(scenario):
+    async def main():
+        clock = FakeClock()
+        limiter = RateLimiter(default_rate=RATE, burst=1, clock=clock)
+        # Use up the burst so that every following acquire has to wait
+        await limiter.acquire(URL)
+        return await scenario(limiter, clock)
+
+    return asyncio.run(main())
+
+
+def test_waiters_are_released_one_token_at_a_time():
+    async def scenario(limiter, clock):
+        done = []
+        tasks = [asyncio.create_task(_acquire(limiter, f"r{i}", done)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert done == []
+
+        clock.advance(TOKEN / 2)
+        limiter._buckets["katalog.example.org"].dispatch()
+        await asyncio.sleep(0)
+        assert done == []
+
+        for expected in (["r0"], ["r0", "r1"], ["r0", "r1", "r2"]):
+            await _release_one(limiter, clock)
+            assert done == expected
+        await asyncio.gather(*tasks)
+
+    _run(scenario)
+
+
+def test_interactive_requests_overtake_background_requests():
+    async def scenario(limiter, clock):
+        done = []
+        tasks = [
+            asyncio.create_task(_acquire(limiter, "harvest-1", done, PRIORITY_BACKGROUND, "harvest")),
+            asyncio.create_task(_acquire(limiter, "harvest-2", done, PRIORITY_BACKGROUND, "harvest")),
+        ]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(_acquire(limiter, "search", done, flow="user")))
+        await asyncio.sleep(0)
+
+        for _ in range(3):
+            await _release_one(limiter, clock)
+        await asyncio.gather(*tasks)
+        assert done == ["search", "harvest-1", "harvest-2"]
+
+    _run(scenario)
+
+
+def test_tokens_are_shared_round_robin_across_flows():
+    async def scenario(limiter, clock):
+        done = []
+        tasks = [asyncio.create_task(_acquire(limiter, f"big-{i}", done, flow="big")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(_acquire(limiter, f"small-{i}", done, flow="small")) for i in range(2)]
+        await asyncio.sleep(0)
+
+        for _ in range(5):
+            await _release_one(limiter, clock)
+        await asyncio.gather(*tasks)
+        assert done == ["big-0", "small-0", "big-1", "small-1", "big-2"]
+
+    _run(scenario)
+
+
+def test_cancelled_waiter_does_not_consume_a_token():
+    async def scenario(limiter, clock):
+        done = []
+        cancelled = asyncio.create_task(_acquire(limiter, "cancelled", done, flow="a"))
+        waiting = asyncio.create_task(_acquire(limiter, "waiting", done, flow="b"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        await _release_one(limiter, clock)
+        await waiting
+        assert done == ["waiting"]
+        assert limiter._buckets["katalog.example.org"].depth() == 0
+
+    _run(scenario)
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return "ergebnis"
+
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        in_flight = flights.in_flight("key")
+        release.set()
+        results = await asyncio.gather(first, second)
+        return calls, in_flight, results, flights.in_flight("key")
+
+    calls, in_flight, results, after = asyncio.run(scenario())
+    assert calls == [1]
+    assert in_flight and not after
+    assert results == ["ergebnis", "ergebnis"]
+
+
+def test_exception_reaches_every_waiter():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            raise ValueError("kaputt")
+
+        return await asyncio.gather(flights.do("key", work), flights.do("key", work), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+def test_work_continues_for_remaining_waiters():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "ergebnis"
+
+        leaving = asyncio.ensure_future(flights.do("key", work, cancel_orphans=True))
+        staying = asyncio.ensure_future(flights.do("key", work, cancel_orphans=True))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await staying, leaving.cancelled()
+
+    assert asyncio.run(scenario()) == ("ergebnis", True)
+
+
+@pytest.mark.parametrize("cancel_orphans, cancelled", [(True, True), (False, False)])
+def test_orphaned_work(cancel_orphans, cancelled):
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        state = {}
+
+        async def work():
+            try:
+                await release.wait()
+                state["finished"] = True
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        waiter = asyncio.ensure_future(flights.do("key", work, cancel_orphans=cancel_orphans))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return state
+
+    state = asyncio.run(scenario())
+    assert state.get("cancelled", False) is cancelled
+    assert state.get("finished", False) is not cancelled
+
+
+def test_new_caller_does_not_join_a_cancelled_call():
+    async def scenario():
+        flights = SingleFlight()
+        cleanup = asyncio.Event()
+        runs = []
+
+        async def work():
+            runs.append(len(runs))
+            if len(runs) == 1:
+                try:
+                    await asyncio.Event().wait()
+                finally:
+                    # Like _scrape returning the WebDriver: cancellation takes a while
+                    await cleanup.wait()
+            return f"lauf {len(runs)}"
+
+        doomed = asyncio.ensure_future(flights.do("key", work, cancel_orphans=True))
+        await asyncio.sleep(0)
+        doomed.cancel()
+        await asyncio.sleep(0)
+        assert not flights.in_flight("key")
+        fresh = await flights.do("key", work, cancel_orphans=True)
+        cleanup.set()
+        await asyncio.sleep(0)
+        return fresh, runs, doomed.cancelled(), flights.in_flight("key")
+
+    fresh, runs, doomed_cancelled, in_flight = asyncio.run(scenario())
+    assert fresh == "lauf 2"
+    assert runs == [0, 1]
+    assert doomed_cancelled
+    assert not in_flight
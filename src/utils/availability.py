@@ -0,0 +1,136 @@
+"""
+Schnelle Aktualisierung der Verfügbarkeit einzelner Treffer.
+
+Statt die ganze Suche zu wiederholen, lädt der `AvailabilityChecker` nur die
+Detailseiten der angefragten Treffer (`BaseScraper.get_availability`) und
+liest die Verfügbarkeit aus. Ergebnisse werden `AVAILABILITY_TTL` Sekunden im
+Speicher gehalten, damit das Frontend günstig pollen kann; gleichzeitige
+Abfragen desselben Treffers teilen sich einen Abruf, und pro Host laufen
+höchstens `AVAILABILITY_CONCURRENCY_PER_HOST` Abrufe gleichzeitig. Geladen
+werden nur Seiten der Bibliothek (`BaseScraper.owns_url`), alle anderen URLs
+werden mit Fehler gemeldet.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from utils import config
+from utils.cache import LRUCache
+from utils.metrics import counter
+from utils.singleflight import SingleFlight
+
+
+class AvailabilityStatus:
+    def __init__(
+        self,
+        library: str,
+        url: str,
+        availability: Optional[str] = None,
+        checked_at: Optional[float] = None,
+        cached: bool = False,
+        error: Optional[str] = None,
+    ):
+        self.library = library
+        self.url = url
+        self.availability = availability
+        self.checked_at = checked_at  # Unix-Zeit der Abfrage bei der Bibliothek
+        self.cached = cached
+        self.error = error
+
+
+class AvailabilityChecker:
+    def __init__(
+        self,
+        scrapers: Callable[[str], Awaitable[Any]],
+        ttl: float = 60.0,
+        max_entries: int = 10000,
+        per_host: int = 4,
+    ):
+        """
+        Args:
+            scrapers: Bibliothek -> neue Scraper-Instanz (für `get_availability`), asynchron
+        """
+        self.scrapers = scrapers
+        self.ttl = ttl
+        self.per_host = per_host
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._cache = LRUCache(max_entries)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._flights = SingleFlight()
+
+    @classmethod
+    def from_config(cls, scrapers: Callable[[str], Awaitable[Any]]) -> "AvailabilityChecker":
+        return cls(
+            scrapers,
+            ttl=config.AVAILABILITY_TTL,
+            max_entries=config.AVAILABILITY_CACHE_SIZE,
+            per_host=config.AVAILABILITY_CONCURRENCY_PER_HOST,
+        )
+
+    async def check(self, entries: Sequence[Tuple[str, str]], timeout: Optional[float] = None) -> List[AvailabilityStatus]:
+        """
+        Verfügbarkeit für (Bibliothek, URL)-Paare, in derselben Reihenfolge.
+        Was bis `timeout` nicht geladen ist, wird mit Fehler gemeldet.
+        """
+        now = time.time()
+        statuses: Dict[Tuple[str, str], AvailabilityStatus] = {}
+        tasks: Dict[asyncio.Future, Tuple[str, str]] = {}
+        scrapers: Dict[str, Any] = {}
+        for library, url in dict.fromkeys(entries):
+            key = f"{library}|{url}"
+            cached = self._cache.get(key)
+            if cached is not None and now - cached[1] < self.ttl:
+                statuses[(library, url)] = AvailabilityStatus(library, url, cached[0], cached[1], cached=True)
+                CHECKS.inc(library=library, result="cached")
+                continue
+            if library not in scrapers:
+                scrapers[library] = await self.scrapers(library)
+            scraper = scrapers[library]
+            # Keine beliebigen vom Client genannten URLs laden
+            if not scraper.owns_url(url):
+                statuses[(library, url)] = AvailabilityStatus(library, url, error="URL gehört nicht zur Bibliothek")
+                CHECKS.inc(library=library, result="rejected")
+                continue
+            task = asyncio.ensure_future(
+                self._flights.do(key, lambda scraper=scraper, library=library, url=url: self._fetch(scraper, library, url))
+            )
+            tasks[task] = (library, url)
+
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+                library, url = tasks[task]
+                statuses[(library, url)] = AvailabilityStatus(library, url, error="Zeitüberschreitung")
+            for task in done:
+                library, url = tasks[task]
+                error = task.exception()
+                if error is not None:
+                    statuses[(library, url)] = AvailabilityStatus(library, url, error=str(error) or type(error).__name__)
+                else:
+                    availability, checked_at = task.result()
+                    statuses[(library, url)] = AvailabilityStatus(library, url, availability, checked_at)
+        return [statuses[entry] for entry in entries]
+
+    async def _fetch(self, scraper: Any, library: str, url: str) -> Tuple[Optional[str], float]:
+        host = urlparse(url).hostname or url
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(max(1, self.per_host))
+        async with self._host_limits[host]:
+            try:
+                availability = await scraper.get_availability(url)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                CHECKS.inc(library=library, result="error")
+                raise
+        checked_at = time.time()
+        self._cache.set(f"{library}|{url}", availability, checked_at)
+        CHECKS.inc(library=library, result="fetched")
+        return availability, checked_at
+
+
+# result: cached (aus dem Kurzzeit-Cache), fetched (Detailseite geladen), rejected (fremde URL), error
+CHECKS = counter("availability_checks_total", "Verfügbarkeitsabfragen einzelner Treffer", ["library", "result"])
@@ -0,0 +1,161 @@
+"""
+Zweistufiger Cache für Suchergebnisse.
+
+Stufe 1 ist ein LRU-Cache im Prozess, Stufe 2 optional eine SQLite-Tabelle
+(`models.search_cache`), die Neustarts überdauert. Einträge sind nach Ablauf
+ihrer TTL noch `stale_ttl` Sekunden als veraltet nutzbar; `api.main` liefert
+sie dann sofort aus und aktualisiert sie im Hintergrund.
+"""
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models.database import get_session
+from models.search_cache import SearchCacheEntry
+from utils import config
+from utils.executor import scraper_executor
+
+# Status eines Cache-Zugriffs, wird in SearchResponse.cache gemeldet
+CACHE_HIT = "hit"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalisiert einen Suchbegriff (Unicode NFC, Kleinschreibung, Leerraum),
+    damit z.B. "Müller " und "müller" denselben Cache-Eintrag treffen.
+    """
+    query = unicodedata.normalize("NFC", query)
+    return " ".join(query.lower().split())
+
+
+def make_cache_key(library: str, query: str, filters: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Bildet den Cache-Schlüssel aus Bibliothek, normalisierter Anfrage und Filtern.
+    """
+    filters_key = json.dumps(filters or {}, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{library}|{normalize_query(query)}|{filters_key}"
+
+
+class LRUCache:
+    """
+    Einfacher LRU-Cache mit Zeitstempel pro Eintrag.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, created_at: Optional[float] = None):
+        self._entries[key] = (value, time.time() if created_at is None else created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Persistente Cache-Stufe auf Basis von SQLAlchemy. Alle Methoden blockieren
+    und werden von `SearchCache` im Scraper-Executor aufgerufen.
+    """
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        with get_session() as session:
+            entry = session.get(SearchCacheEntry, key)
+            if entry is None:
+                return None
+            return json.loads(entry.results), entry.created_at
+
+    def set(self, key: str, library: str, results: List[Dict[str, Any]], created_at: float):
+        with get_session() as session:
+            session.merge(SearchCacheEntry(
+                key=key,
+                library=library,
+                results=json.dumps(results, ensure_ascii=False, default=str),
+                created_at=created_at,
+            ))
+            session.commit()
+
+
+class SearchCache:
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 900.0,
+        stale_ttl: float = 3600.0,
+        library_ttls: Optional[Dict[str, float]] = None,
+        persistent: Optional[SQLiteCache] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            clock: Zeitquelle als Unix-Zeit (für Tests austauschbar)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.library_ttls = library_ttls or {}
+        self.memory = LRUCache(max_entries)
+        self.persistent = persistent
+        self.clock = clock
+
+    @classmethod
+    def from_config(cls) -> "SearchCache":
+        return cls(
+            max_entries=config.CACHE_MAX_ENTRIES,
+            ttl=config.CACHE_TTL,
+            stale_ttl=config.CACHE_STALE_TTL,
+            library_ttls=config.LIBRARY_CACHE_TTL,
+            persistent=SQLiteCache() if config.CACHE_PERSISTENT else None,
+        )
+
+    def ttl_for(self, library: str) -> float:
+        return self.library_ttls.get(library, self.ttl)
+
+    async def get(self, library: str, key: str) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+        """
+        Sucht einen Eintrag erst im Speicher, dann in der persistenten Stufe.
+
+        Returns:
+            (Treffer oder None, CACHE_HIT / CACHE_STALE / CACHE_MISS)
+        """
+        entry = self.memory.get(key)
+        if entry is None and self.persistent is not None:
+            entry = await scraper_executor.run_blocking(self.persistent.get, key)
+            if entry is not None:
+                self.memory.set(key, entry[0], created_at=entry[1])
+        if entry is None:
+            return None, CACHE_MISS
+
+        results, created_at = entry
+        age = self.clock() - created_at
+        ttl = self.ttl_for(library)
+        if age <= ttl:
+            return results, CACHE_HIT
+        if age <= ttl + self.stale_ttl:
+            return results, CACHE_STALE
+        self.memory.delete(key)
+        return None, CACHE_MISS
+
+    async def set(self, library: str, key: str, results: List[Dict[str, Any]]):
+        created_at = self.clock()
+        self.memory.set(key, results, created_at=created_at)
+        if self.persistent is not None:
+            await scraper_executor.run_blocking(self.persistent.set, key, library, results, created_at)
+
+
+search_cache = SearchCache.from_config()
@@ -0,0 +1,134 @@
+"""
+Circuit-Breaker pro Bibliothek.
+
+Nach `failure_threshold` aufeinanderfolgenden fehlgeschlagenen Suchen wird
+die Bibliothek für `recovery_timeout` Sekunden gesperrt ("open"): Suchen
+schlagen sofort fehl, statt ihr volles Zeitbudget an einem ausgefallenen
+Katalog zu verbrauchen. Danach lässt der Breaker genau eine Probesuche zu
+("half_open"); gelingt sie, ist die Bibliothek wieder freigegeben, sonst
+beginnt die Sperre von vorn.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from utils import config
+from utils.metrics import gauge
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Die Bibliothek ist nach wiederholten Fehlern vorübergehend gesperrt."""
+
+    def __init__(self, library: str, retry_in: float):
+        super().__init__(f"Bibliothek '{library}' vorübergehend nicht verfügbar (erneuter Versuch in {retry_in:.0f}s)")
+        self.library = library
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        library: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.library = library
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_running = False
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.recovery_timeout - self.clock())
+
+    def is_open(self) -> bool:
+        """
+        True, solange die Sperre läuft. Verbraucht keine Probesuche und eignet
+        sich daher für Prüfungen innerhalb einer bereits zugelassenen Suche.
+        """
+        return self.state == OPEN and self.retry_in() > 0
+
+    def allow(self) -> bool:
+        """
+        Entscheidet, ob eine Suche starten darf. Im Zustand "half_open" wird
+        genau eine Probesuche zugelassen, bis ihr Ergebnis gemeldet ist.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if self.retry_in() > 0:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_running = False
+            if self._probe_running:
+                return False
+            self._probe_running = True
+            return True
+
+    def check(self):
+        """Wie `allow()`, wirft aber `CircuitOpenError`."""
+        if not self.allow():
+            raise CircuitOpenError(self.library, self.retry_in())
+
+    def release_probe(self):
+        """Gibt eine abgebrochene Probesuche frei, ohne ein Ergebnis zu werten."""
+        with self._lock:
+            self._probe_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+
+class CircuitBreakers:
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_config(cls) -> "CircuitBreakers":
+        return cls(
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=config.CIRCUIT_RECOVERY_TIMEOUT,
+        )
+
+    def get(self, library: Optional[str]) -> Optional[CircuitBreaker]:
+        if library is None or self.failure_threshold <= 0:
+            return None
+        if library not in self._breakers:
+            self._breakers[library] = CircuitBreaker(library, self.failure_threshold, self.recovery_timeout)
+        return self._breakers[library]
+
+    def states(self) -> Dict[Tuple[str], float]:
+        # 0 = closed, 1 = half_open, 2 = open
+        levels = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+        return {(library, ): levels[breaker.state] for library, breaker in self._breakers.items()}
+
+
+circuit_breakers = CircuitBreakers.from_config()
+
+CIRCUIT_STATE = gauge(
+    "circuit_breaker_state", "Zustand pro Bibliothek (0 = closed, 1 = half_open, 2 = open)", ["library"],
+    callback=circuit_breakers.states,
+)
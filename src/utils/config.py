@@ -0,0 +1,182 @@
+"""
+Zentrale Konfiguration der Anwendung.
+
+Alle Werte werden aus Umgebungsvariablen gelesen; eine `.env`-Datei im
+Arbeitsverzeichnis wird automatisch geladen.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _get_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _get_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_list(name: str, default: str = "") -> list:
+    """
+    Liest eine kommagetrennte Liste, z.B. `noworzyn,onleihe_koeln`.
+    """
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+def _get_mapping(name: str, default: str = "") -> dict:
+    """
+    Liest eine Zuordnung im Format `bibliothek=wert,bibliothek2=wert2`.
+    """
+    result = {}
+    for pair in os.getenv(name, default).split(","):
+        if "=" in pair:
+            key, value = pair.split("=", 1)
+            result[key.strip()] = value.strip()
+    return result
+
+
+# Ablage für Datenbanken und Caches; relativ angegeben bezogen auf das Projektverzeichnis
+# (oberhalb von src/), damit der Ort nicht vom Arbeitsverzeichnis abhängt
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.normpath(os.path.join(PROJECT_DIR, os.getenv("DATA_DIR") or "."))
+
+
+def _get_path(name: str, default: str) -> str:
+    """
+    Liest einen Datei- oder Verzeichnispfad; relative Pfade gelten relativ zu DATA_DIR.
+    """
+    return os.path.join(DATA_DIR, os.getenv(name) or default)
+
+
+# WebDriver-Pool für die Selenium-Scraper
+DRIVER_POOL_MIN_SIZE = _get_int("DRIVER_POOL_MIN_SIZE", 1)
+DRIVER_POOL_MAX_SIZE = _get_int("DRIVER_POOL_MAX_SIZE", 4)
+DRIVER_POOL_IDLE_TIMEOUT = _get_float("DRIVER_POOL_IDLE_TIMEOUT", 300.0)
+DRIVER_POOL_MAX_USES = _get_int("DRIVER_POOL_MAX_USES", 50)
+DRIVER_POOL_ACQUIRE_TIMEOUT = _get_float("DRIVER_POOL_ACQUIRE_TIMEOUT", 60.0)
+
+# Ausführungsschicht für blockierende Scraper-Arbeit (Selenium, HTML-Parsing)
+SCRAPER_THREAD_POOL_SIZE = _get_int("SCRAPER_THREAD_POOL_SIZE", 8)
+SCRAPER_CONCURRENCY_PER_LIBRARY = _get_int("SCRAPER_CONCURRENCY_PER_LIBRARY", 4)
+LIBRARY_CONCURRENCY = {
+    library: int(value)
+    for library, value in _get_mapping("LIBRARY_CONCURRENCY", "noworzyn=2,onleihe_koeln=2").items()
+}
+
+# HTTP-Transport
+HTTP_TIMEOUT = _get_float("HTTP_TIMEOUT", 30.0)
+HTTP_USER_AGENT = os.getenv(
+    "HTTP_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+)
+# Verbindungspool: Verbindungen insgesamt und pro Host, Keep-Alive und DNS-Cache in Sekunden
+HTTP_POOL_SIZE = _get_int("HTTP_POOL_SIZE", 100)
+HTTP_POOL_PER_HOST = _get_int("HTTP_POOL_PER_HOST", 8)
+HTTP_KEEPALIVE = _get_float("HTTP_KEEPALIVE", 30.0)
+HTTP_DNS_CACHE_TTL = _get_int("HTTP_DNS_CACHE_TTL", 300)
+
+# Persistenter HTTP-Cache für GET-Requests (Detailseiten, Cover); TTL gilt für Antworten ohne Cache-Header
+HTTP_CACHE_ENABLED = _get_bool("HTTP_CACHE_ENABLED", True)
+HTTP_CACHE_PATH = _get_path("HTTP_CACHE_PATH", "http_cache.db")
+HTTP_CACHE_MAX_BYTES = _get_int("HTTP_CACHE_MAX_BYTES", 100 * 1024 * 1024)
+HTTP_CACHE_DEFAULT_TTL = _get_float("HTTP_CACHE_DEFAULT_TTL", 0.0)
+
+# Cover-Proxy: Dateicache, dessen Obergrenze, max. Größe eines Originals (Bytes), Browser-Cache-Dauer (Sekunden)
+COVERS_ENABLED = _get_bool("COVERS_ENABLED", True)
+COVER_CACHE_DIR = _get_path("COVER_CACHE_DIR", "cover_cache")
+COVER_CACHE_MAX_BYTES = _get_int("COVER_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+COVER_MAX_BYTES = _get_int("COVER_MAX_BYTES", 5 * 1024 * 1024)
+COVER_MAX_AGE = _get_int("COVER_MAX_AGE", 30 * 24 * 3600)
+
+# Anreicherung über Detailseiten: gleichzeitige Abrufe pro Host, Gültigkeit gespeicherter Angaben (Sekunden),
+# Hintergrund-Anreicherung der ersten N Treffer nach einer Suche, Frist für POST /details (Sekunden)
+ENRICH_ENABLED = _get_bool("ENRICH_ENABLED", True)
+ENRICH_IN_BACKGROUND = _get_bool("ENRICH_IN_BACKGROUND", False)
+ENRICH_CONCURRENCY_PER_HOST = _get_int("ENRICH_CONCURRENCY_PER_HOST", 2)
+ENRICH_MAX_AGE = _get_float("ENRICH_MAX_AGE", 30 * 24 * 3600.0)
+ENRICH_BACKGROUND_LIMIT = _get_int("ENRICH_BACKGROUND_LIMIT", 20)
+ENRICH_TIMEOUT = _get_float("ENRICH_TIMEOUT", 20.0)
+ENRICH_MAX_ITEMS = _get_int("ENRICH_MAX_ITEMS", 100)
+
+# Verfügbarkeitsabfrage einzelner Treffer: Cache-Dauer (Sekunden), Cache-Größe, gleichzeitige Abrufe pro Host,
+# Treffer pro Anfrage und Frist (Sekunden)
+AVAILABILITY_TTL = _get_float("AVAILABILITY_TTL", 60.0)
+AVAILABILITY_CACHE_SIZE = _get_int("AVAILABILITY_CACHE_SIZE", 10000)
+AVAILABILITY_CONCURRENCY_PER_HOST = _get_int("AVAILABILITY_CONCURRENCY_PER_HOST", 4)
+AVAILABILITY_MAX_ITEMS = _get_int("AVAILABILITY_MAX_ITEMS", 100)
+AVAILABILITY_TIMEOUT = _get_float("AVAILABILITY_TIMEOUT", 10.0)
+
+# HTML-Parser für BeautifulSoup ("lxml" oder "html.parser"); leer = lxml, falls installiert
+HTML_PARSER = os.getenv("HTML_PARSER", "")
+
+# Datenbank (SQLite für lokale Installationen)
+DATABASE_URL = os.getenv("DATABASE_URL") or f"sqlite:///{os.path.join(DATA_DIR, 'library_search.db')}"
+
+# Ergebnis-Cache für Suchanfragen
+CACHE_ENABLED = _get_bool("CACHE_ENABLED", True)
+CACHE_MAX_ENTRIES = _get_int("CACHE_MAX_ENTRIES", 1000)
+CACHE_TTL = _get_float("CACHE_TTL", 900.0)
+CACHE_STALE_TTL = _get_float("CACHE_STALE_TTL", 3600.0)
+CACHE_PERSISTENT = _get_bool("CACHE_PERSISTENT", False)
+LIBRARY_CACHE_TTL = {
+    library: float(value)
+    for library, value in _get_mapping("LIBRARY_CACHE_TTL", "onleihe_koeln=1800").items()
+}
+
+# Angebotene Bibliotheken (leer = alle registrierten Scraper, siehe scrapers.registry)
+LIBRARIES = _get_list("LIBRARIES")
+
+# Zeitbudgets für Suchen (Sekunden)
+SEARCH_TIMEOUT = _get_float("SEARCH_TIMEOUT", 60.0)
+LIBRARY_TIMEOUTS = {
+    library: float(value)
+    for library, value in _get_mapping("LIBRARY_TIMEOUTS", "noworzyn=45,onleihe_koeln=60").items()
+}
+ONLEIHE_MAX_PAGES = _get_int("ONLEIHE_MAX_PAGES", 10)
+ONLEIHE_PAGE_CONCURRENCY = _get_int("ONLEIHE_PAGE_CONCURRENCY", 4)
+
+# Noworzyn: "auto" versucht zuerst die Trefferseite direkt per HTTP und fällt
+# nur bei JS-only- oder blockierten Antworten auf Selenium zurück;
+# "http" und "browser" erzwingen jeweils einen der beiden Wege
+NOWORZYN_SEARCH_MODE = os.getenv("NOWORZYN_SEARCH_MODE", "auto")
+
+# Lokaler Volltextindex über ausgelieferte Treffer (SQLite FTS5)
+SEARCH_INDEX_ENABLED = _get_bool("SEARCH_INDEX_ENABLED", True)
+SEARCH_INDEX_PATH = _get_path("SEARCH_INDEX_PATH", "search_index.db")
+SEARCH_INDEX_MAX_AGE = _get_float("SEARCH_INDEX_MAX_AGE", 7 * 24 * 3600.0)
+
+# Harvester: lädt häufige bzw. vorgegebene Anfragen im Hintergrund vorab
+HARVEST_ENABLED = _get_bool("HARVEST_ENABLED", False)
+HARVEST_IN_PROCESS = _get_bool("HARVEST_IN_PROCESS", True)
+HARVEST_QUERIES_FILE = os.getenv("HARVEST_QUERIES_FILE", "")
+HARVEST_TOP_N = _get_int("HARVEST_TOP_N", 50)
+HARVEST_LIBRARIES = _get_list("HARVEST_LIBRARIES")
+HARVEST_INTERVAL = _get_float("HARVEST_INTERVAL", 6 * 3600.0)
+HARVEST_MAX_AGE = _get_float("HARVEST_MAX_AGE", 24 * 3600.0)
+HARVEST_DELAY = _get_float("HARVEST_DELAY", 10.0)
+
+# Rate-Limit pro Katalog-Host (Zugriffe pro Sekunde, 0 = unbegrenzt)
+RATE_LIMIT_DEFAULT = _get_float("RATE_LIMIT_DEFAULT", 2.0)
+RATE_LIMIT_BURST = _get_float("RATE_LIMIT_BURST", 4.0)
+LIBRARY_RATE_LIMITS = {
+    library: float(value)
+    for library, value in _get_mapping("LIBRARY_RATE_LIMITS", "noworzyn=1,onleihe_koeln=2").items()
+}
+
+# Wiederholungen bei vorübergehenden HTTP-Fehlern und Circuit-Breaker pro Bibliothek
+HTTP_RETRIES = _get_int("HTTP_RETRIES", 2)
+HTTP_RETRY_BACKOFF = _get_float("HTTP_RETRY_BACKOFF", 0.5)
+HTTP_RETRY_MAX_DELAY = _get_float("HTTP_RETRY_MAX_DELAY", 8.0)
+CIRCUIT_FAILURE_THRESHOLD = _get_int("CIRCUIT_FAILURE_THRESHOLD", 5)
+CIRCUIT_RECOVERY_TIMEOUT = _get_float("CIRCUIT_RECOVERY_TIMEOUT", 30.0)
@@ -0,0 +1,323 @@
+"""
+Cover-Proxy: lädt Coverbilder einmal von der Bibliothek und liefert sie selbst aus.
+
+`api.main` setzt in Treffern mit `cover_url`/`image_url` zusätzlich das Feld
+`cover` auf einen Pfad `/covers/{id}`; die Original-URLs bleiben erhalten. Die
+Kennung ist ein Hash der Original-URL, und nur so registrierte URLs werden
+geladen (kein offener Proxy). Originale über `COVER_MAX_BYTES` werden schon
+beim Lesen abgebrochen. Die Bilder liegen
+inhaltsadressiert (SHA-256 des Originals) in `COVER_CACHE_DIR`, daneben
+verkleinerte Fassungen in festen Breiten als WebP oder JPEG. Übersteigt der
+Cache `COVER_CACHE_MAX_BYTES`, werden die am längsten nicht abgerufenen
+Dateien gelöscht.
+
+Verkleinern erfordert Pillow (`pip install -e ".[covers]"`); ohne Pillow wird
+stets das Original ausgeliefert.
+"""
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from utils import config
+from utils.executor import scraper_executor
+from utils.http_client import HttpClient, http_client
+from utils.metrics import counter
+from utils.rate_limiter import rate_limiter
+from utils.singleflight import SingleFlight
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Feste Breiten in Pixeln; "original" liefert das unveränderte Bild
+COVER_SIZES = {"small": 80, "medium": 160, "large": 320}
+ORIGINAL = "original"
+
+# Felder der Scraper, die auf ein Coverbild zeigen
+COVER_FIELDS = ("cover_url", "image_url")
+
+_EXTENSIONS = {
+    "image/jpeg": "jpg", "image/png": "png", "image/gif": "gif", "image/webp": "webp", "image/avif": "avif",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS covers (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    library TEXT,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    digest TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    path TEXT NOT NULL,
+    media_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (digest, variant)
+);
+CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used);
+"""
+
+
+def cover_id(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def cover_url(item: Dict) -> Optional[str]:
+    """Absolute Cover-URL eines Treffers; relative Pfade werden gegen dessen Link aufgelöst."""
+    for field in COVER_FIELDS:
+        url = item.get(field)
+        if not url or url.startswith("data:"):
+            continue
+        if url.startswith(("http://", "https://")):
+            return url
+        base = item.get("details_url") or item.get("url")
+        if base:
+            return urljoin(base, url)
+    return None
+
+
+def thumbnail(content: bytes, width: int, webp: bool) -> Tuple[bytes, str]:
+    """
+    Verkleinert ein Bild auf höchstens `width` Pixel Breite (blockiert, Pillow).
+    """
+    with Image.open(io.BytesIO(content)) as image:
+        image.thumbnail((width, width * 2))
+        output = io.BytesIO()
+        if webp:
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            image.save(output, "WEBP", quality=80, method=4)
+            return output.getvalue(), "image/webp"
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(output, "JPEG", quality=82, optimize=True, progressive=True)
+        return output.getvalue(), "image/jpeg"
+
+
+class CoverStore:
+    """
+    Zuordnung Kennung -> URL und inhaltsadressierter Dateicache. Alle Methoden blockieren.
+    """
+
+    def __init__(self, directory: str = "cover_cache", max_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(self.directory, exist_ok=True)
+            connection = sqlite3.connect(os.path.join(self.directory, "covers.db"), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def register(self, entries: Iterable[Tuple[str, str, Optional[str]]]):
+        """Merkt sich (Kennung, URL, Bibliothek) für spätere Abrufe."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany("INSERT OR IGNORE INTO covers (id, url, library) VALUES (?, ?, ?)", entries)
+
+    def lookup(self, cover: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """(URL, Bibliothek, Digest des Originals) oder None für unbekannte Kennungen."""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT url, library, digest FROM covers WHERE id = ?", (cover,)
+            ).fetchone()
+
+    def get_file(self, digest: str, variant: str) -> Optional[Tuple[str, str]]:
+        """(Pfad, Medientyp) einer gespeicherten Fassung; aktualisiert ihren Zeitstempel."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT path, media_type FROM files WHERE digest = ? AND variant = ?", (digest, variant)
+            ).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(row[0]):
+                with connection:
+                    connection.execute("DELETE FROM files WHERE digest = ? AND variant = ?", (digest, variant))
+                return None
+            with connection:
+                connection.execute(
+                    "UPDATE files SET last_used = ? WHERE digest = ? AND variant = ?", (time.time(), digest, variant)
+                )
+            return row
+
+    def read(self, digest: str) -> Optional[bytes]:
+        entry = self.get_file(digest, ORIGINAL)
+        if entry is None:
+            return None
+        with open(entry[0], "rb") as f:
+            return f.read()
+
+    def put(self, digest: str, variant: str, content: bytes, media_type: str) -> str:
+        extension = _EXTENSIONS.get(media_type, "img")
+        path = os.path.join(self.directory, digest[:2], f"{digest}_{variant}.{extension}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomar schreiben, damit parallele Leser nie eine halbe Datei sehen
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(content)
+        os.replace(temporary, path)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO files (digest, variant, path, media_type, size, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, variant, path, media_type, len(content), time.time()),
+                )
+                self._evict(connection)
+        return path
+
+    def put_original(self, cover: str, content: bytes, media_type: str) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        self.put(digest, ORIGINAL, content, media_type)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("UPDATE covers SET digest = ? WHERE id = ?", (digest, cover))
+        return digest
+
+    def _evict(self, connection: sqlite3.Connection):
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted: List[Tuple[str, str]] = []
+        for digest, variant, path, size in connection.execute(
+            "SELECT digest, variant, path, size FROM files ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            evicted.append((digest, variant))
+            total -= size
+        connection.executemany("DELETE FROM files WHERE digest = ? AND variant = ?", evicted)
+        EVICTIONS.inc(len(evicted))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class CoverProxy:
+    def __init__(self, store: CoverStore, http: Optional[HttpClient] = None, max_bytes: int = 5 * 1024 * 1024):
+        self.store = store
+        self.http = http or http_client
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._flights = SingleFlight()
+
+    @classmethod
+    def from_config(cls) -> "CoverProxy":
+        return cls(
+            CoverStore(config.COVER_CACHE_DIR, config.COVER_CACHE_MAX_BYTES),
+            max_bytes=config.COVER_MAX_BYTES,
+        )
+
+    @staticmethod
+    def thumbnails_available() -> bool:
+        return Image is not None
+
+    async def register(self, library: str, items: List[Dict]):
+        """
+        Setzt in jedem Treffer mit Coverbild das zusätzliche Feld `cover` auf den
+        Proxy-Pfad und merkt sich die URL; `cover_url`/`image_url` bleiben unverändert.
+        """
+        entries = []
+        for item in items:
+            url = cover_url(item)
+            if url is None:
+                continue
+            cover = cover_id(url)
+            item["cover"] = f"/covers/{cover}"
+            entries.append((cover, url, library))
+        if entries:
+            await scraper_executor.run_blocking(self.store.register, entries)
+
+    async def get(self, cover: str, size: str = "medium", webp: bool = False) -> Optional[Tuple[str, str, str]]:
+        """
+        Liefert (Pfad, Medientyp, ETag) der gewünschten Fassung, lädt bzw.
+        erzeugt sie bei Bedarf. None für unbekannte Kennungen.
+
+        Raises:
+            HttpError, aiohttp.ClientError: Bild konnte nicht geladen werden
+            ValueError: Antwort ist kein (lesbares) Bild
+        """
+        entry = await scraper_executor.run_blocking(self.store.lookup, cover)
+        if entry is None:
+            return None
+        url, library, digest = entry
+
+        original = await scraper_executor.run_blocking(self.store.get_file, digest, ORIGINAL) if digest else None
+        if original is None:
+            REQUESTS.inc(result="fetched")
+            digest = await self._flights.do(("fetch", cover), lambda: self._fetch(cover, url, library))
+        else:
+            REQUESTS.inc(result="hit")
+
+        variant = ORIGINAL
+        if size != ORIGINAL and self.thumbnails_available():
+            variant = f"{size}-{'webp' if webp else 'jpeg'}"
+        stored = await scraper_executor.run_blocking(self.store.get_file, digest, variant)
+        if stored is None:
+            stored = await self._flights.do(("render", digest, variant), lambda: self._render(digest, variant))
+        path, media_type = stored
+        return path, media_type, f'"{digest[:24]}-{variant}"'
+
+    async def _fetch(self, cover: str, url: str, library: Optional[str]) -> str:
+        await rate_limiter.acquire(url, library)
+        # Zu große Bilder nicht vollständig puffern, sondern beim Lesen abbrechen
+        response = await self.http.request("GET", url, max_bytes=self.max_bytes)
+        response.raise_for_status()
+        media_type = next(
+            (value.split(";")[0].strip().lower() for key, value in response.headers.items() if key.lower() == "content-type"),
+            "",
+        )
+        if not media_type.startswith("image/"):
+            raise ValueError(f"Keine Bilddatei unter {url} ({media_type or 'ohne Content-Type'})")
+        return await scraper_executor.run_blocking(self.store.put_original, cover, response.content, media_type)
+
+    async def _render(self, digest: str, variant: str) -> Tuple[str, str]:
+        def render() -> Tuple[str, str]:
+            content = self.store.read(digest)
+            if content is None:
+                raise ValueError(f"Original zu {digest[:12]} nicht mehr im Cache")
+            size, encoding = variant.rsplit("-", 1)
+            try:
+                data, media_type = thumbnail(content, COVER_SIZES[size], encoding == "webp")
+            except OSError as e:
+                raise ValueError(f"Coverbild {digest[:12]} nicht lesbar: {str(e)}")
+            return self.store.put(digest, variant, data, media_type), media_type
+
+        REQUESTS.inc(result="rendered")
+        return await scraper_executor.run_blocking(render)
+
+    def close(self):
+        self.store.close()
+
+
+cover_proxy = CoverProxy.from_config()
+
+# result: hit (Original im Cache), fetched (von der Bibliothek geladen), rendered (Fassung erzeugt)
+REQUESTS = counter("cover_requests_total", "Abrufe über den Cover-Proxy", ["result"])
+EVICTIONS = counter("cover_cache_evictions_total", "Wegen der Größenbegrenzung gelöschte Coverdateien")
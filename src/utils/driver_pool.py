@@ -0,0 +1,262 @@
+"""
+Gemeinsamer Pool von Headless-Chrome-Instanzen für die Selenium-Scraper.
+
+Statt pro Suche einen neuen Browser zu starten, leihen sich die Scraper einen
+WebDriver aus dem Pool und geben ihn nach der Suche zurück. Der Pool hält
+mindestens `min_size` Browser vorgewärmt, startet bei Bedarf bis zu `max_size`
+Instanzen, beendet Browser nach längerer Leerlaufzeit und ersetzt Instanzen,
+die abgestürzt sind oder `max_uses` Suchen bedient haben.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import config
+
+
+class DriverPoolError(Exception):
+    """Es konnte kein WebDriver aus dem Pool bereitgestellt werden."""
+
+
+def create_chrome_driver():
+    """Startet einen Headless-Chrome mit den Standardoptionen der Scraper."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+    # Kein implizites Warten: find_elements soll bei fehlenden Elementen sofort
+    # zurückkehren, die Scraper warten gezielt über BaseScraper._wait_for_step
+    return webdriver.Chrome(options=chrome_options)
+
+
+class _PooledDriver:
+    def __init__(self, driver, last_used: float):
+        self.driver = driver
+        self.uses = 0
+        self.last_used = last_used
+
+
+class WebDriverPool:
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        max_uses: int = 50,
+        acquire_timeout: float = 60.0,
+        driver_factory: Callable[[], Any] = create_chrome_driver,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            clock: Zeitquelle in Sekunden für die Leerlaufzeit (für Tests austauschbar)
+        """
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.driver_factory = driver_factory
+        self.clock = clock
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._idle: List[_PooledDriver] = []
+        self._leased: Dict[int, _PooledDriver] = {}
+        self._size = 0  # idle + geliehen + gerade im Aufbau
+        self._closed = False
+        self._condition = threading.Condition()
+        self._reaper: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls) -> "WebDriverPool":
+        return cls(
+            min_size=config.DRIVER_POOL_MIN_SIZE,
+            max_size=config.DRIVER_POOL_MAX_SIZE,
+            idle_timeout=config.DRIVER_POOL_IDLE_TIMEOUT,
+            max_uses=config.DRIVER_POOL_MAX_USES,
+            acquire_timeout=config.DRIVER_POOL_ACQUIRE_TIMEOUT,
+        )
+
+    def start(self):
+        """
+        Wärmt den Pool auf `min_size` Browser vor und startet die Leerlaufbereinigung.
+        """
+        with self._condition:
+            self._closed = False
+        self._fill_to_min()
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, name="webdriver-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Leiht einen gesunden WebDriver aus. Blockiert, solange alle `max_size`
+        Browser belegt sind, höchstens aber `timeout` Sekunden.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            entry = None
+            create = False
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise DriverPoolError("WebDriver-Pool ist geschlossen")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolError(f"Kein WebDriver innerhalb von {timeout}s verfügbar")
+                    self._condition.wait(remaining)
+
+            if create:
+                entry = self._create_entry()
+            elif not self._is_healthy(entry.driver):
+                self.logger.warning("WebDriver im Pool reagiert nicht mehr, wird ersetzt")
+                self._quit(entry.driver)
+                entry = self._create_entry()
+
+            with self._condition:
+                entry.uses += 1
+                self._leased[id(entry.driver)] = entry
+            return entry.driver
+
+    def release(self, driver, discard: bool = False):
+        """
+        Gibt einen geliehenen WebDriver zurück. Mit `discard=True` (z.B. nach
+        einem Absturz oder mit sitzungsbezogenem Zustand) wird er beendet.
+        """
+        with self._condition:
+            entry = self._leased.pop(id(driver), None)
+        if entry is None:
+            self.logger.debug("Unbekannter WebDriver zurückgegeben, wird beendet")
+            self._quit(driver)
+            return
+
+        recycle = discard or self._closed or entry.uses >= self.max_uses
+        if not recycle:
+            try:
+                # Laufende Ladevorgänge abbrechen und eine leere Seite für den nächsten Nutzer laden
+                driver.get("about:blank")
+            except Exception as e:
+                self.logger.debug(f"WebDriver konnte nicht zurückgesetzt werden: {str(e)}")
+                recycle = True
+
+        if recycle:
+            self._quit(driver)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            if not self._closed:
+                self._fill_to_min()
+            return
+
+        entry.last_used = self.clock()
+        with self._condition:
+            self._idle.append(entry)
+            self._condition.notify()
+
+    def evict_idle(self):
+        """Beendet Browser, die länger als `idle_timeout` ungenutzt sind (bis auf `min_size`)."""
+        now = self.clock()
+        evicted = []
+        with self._condition:
+            keep = []
+            # Die am längsten ungenutzten Browser zuerst betrachten
+            for entry in sorted(self._idle, key=lambda e: e.last_used):
+                if self._size - len(evicted) > self.min_size and now - entry.last_used > self.idle_timeout:
+                    evicted.append(entry)
+                else:
+                    keep.append(entry)
+            self._idle = keep
+            self._size -= len(evicted)
+
+        for entry in evicted:
+            self._quit(entry.driver)
+        if evicted:
+            self.logger.debug(f"{len(evicted)} ungenutzte WebDriver beendet")
+
+    def close(self):
+        """Beendet alle Browser im Pool. Geliehene Browser werden bei Rückgabe beendet."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for entry in idle:
+            self._quit(entry.driver)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "max_size": self.max_size,
+            }
+
+    def _create_entry(self) -> _PooledDriver:
+        try:
+            driver = self.driver_factory()
+            self.logger.debug("Neuer WebDriver für den Pool gestartet")
+            return _PooledDriver(driver, self.clock())
+        except Exception as e:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            self.logger.error(f"Fehler beim Initialisieren des WebDrivers: {str(e)}")
+            raise DriverPoolError(str(e)) from e
+
+    def _fill_to_min(self):
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._create_entry()
+            except DriverPoolError:
+                return
+            with self._condition:
+                self._idle.append(entry)
+                self._condition.notify()
+
+    def _reap_loop(self):
+        interval = max(1.0, min(self.idle_timeout / 2, 60.0))
+        while not self._closed:
+            time.sleep(interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                self.logger.warning(f"Fehler bei der Bereinigung des WebDriver-Pools: {str(e)}")
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.debug(f"Fehler beim Beenden des WebDrivers: {str(e)}")
+
+
+# Prozessweiter Pool, wird in api.main beim Start vorgewärmt und beim Beenden geschlossen
+driver_pool = WebDriverPool.from_config()
@@ -0,0 +1,228 @@
+"""
+Anreicherung dünner Treffer über ihre Detailseiten.
+
+Die Trefferlisten der Kataloge enthalten oft weder ISBN noch Jahr oder Verlag.
+Der `Enricher` lädt für solche Treffer die Detailseite (`details_url` bzw.
+`url`) über den Scraper der Bibliothek (`BaseScraper.get_details`), ergänzt
+fehlende Felder und speichert die gefundenen Angaben in der Tabelle
+`book_details`. Spätere Suchen erhalten die Angaben über `apply()` ohne
+erneuten Abruf.
+
+Detailseiten werden gleichzeitig geladen, pro Host aber höchstens
+`ENRICH_CONCURRENCY_PER_HOST` auf einmal (zusätzlich zum Rate-Limiter);
+gleichzeitige Abrufe derselben Seite werden zusammengefasst. Nach einer Suche
+kann die Anreicherung im Hintergrund mit niedriger Priorität laufen
+(`ENRICH_IN_BACKGROUND`), auf Anfrage über `POST /details`. Geladen werden nur
+Seiten der Bibliothek (`BaseScraper.owns_url`).
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+from urllib.parse import urlparse
+
+from models.database import get_session
+from models.details import BookDetails
+from utils import config
+from utils.executor import scraper_executor
+from utils.metrics import counter
+from utils.rate_limiter import PRIORITY_BACKGROUND, new_flow, request_priority
+from utils.singleflight import SingleFlight
+
+# Felder, die über die Detailseite ergänzt werden
+ENRICH_FIELDS = ("isbn", "year", "publisher")
+
+
+def detail_url(item: Dict[str, Any]) -> Optional[str]:
+    url = item.get("details_url") or item.get("url")
+    return url if url and url.startswith(("http://", "https://")) else None
+
+
+def needs_details(item: Dict[str, Any], fields: Sequence[str] = ENRICH_FIELDS) -> bool:
+    return detail_url(item) is not None and any(not item.get(field) for field in fields)
+
+
+def fill_missing(item: Dict[str, Any], details: Dict[str, Any]) -> bool:
+    """Übernimmt Angaben nur in leere Felder. Returns True, wenn etwas ergänzt wurde."""
+    changed = False
+    for field, value in details.items():
+        if value and not item.get(field):
+            item[field] = value
+            changed = True
+    return changed
+
+
+class DetailStore:
+    """
+    Persistenz der gefundenen Zusatzangaben. Alle Methoden blockieren.
+    """
+
+    def get_many(self, library: str, urls: Sequence[str], max_age: float) -> Dict[str, Dict[str, Any]]:
+        keys = [f"{library}|{url}" for url in urls]
+        if not keys:
+            return {}
+        with get_session() as session:
+            entries = (
+                session.query(BookDetails)
+                .filter(BookDetails.key.in_(keys), BookDetails.fetched_at >= time.time() - max_age)
+                .all()
+            )
+            return {entry.url: json.loads(entry.data) for entry in entries}
+
+    def set(self, library: str, url: str, data: Dict[str, Any]):
+        with get_session() as session:
+            session.merge(BookDetails(
+                key=f"{library}|{url}",
+                library=library,
+                url=url,
+                data=json.dumps(data, ensure_ascii=False, default=str),
+                fetched_at=time.time(),
+            ))
+            session.commit()
+
+
+class Enricher:
+    def __init__(
+        self,
+        scrapers: Callable[[str], Awaitable[Any]],
+        store: Optional[DetailStore] = None,
+        per_host: int = 2,
+        max_age: float = 30 * 24 * 3600.0,
+        background_limit: int = 20,
+        on_enriched: Optional[Callable[[str, List[Dict[str, Any]]], Awaitable[Any]]] = None,
+    ):
+        """
+        Args:
+            scrapers: Bibliothek -> neue Scraper-Instanz (für `get_details`), asynchron
+            on_enriched: Wird nach einer Anreicherung mit den geänderten Treffern aufgerufen
+        """
+        self.scrapers = scrapers
+        self.store = store or DetailStore()
+        self.per_host = per_host
+        self.max_age = max_age
+        self.background_limit = background_limit
+        self.on_enriched = on_enriched
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._flights = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls, scrapers: Callable[[str], Awaitable[Any]], **kwargs) -> "Enricher":
+        return cls(
+            scrapers,
+            per_host=config.ENRICH_CONCURRENCY_PER_HOST,
+            max_age=config.ENRICH_MAX_AGE,
+            background_limit=config.ENRICH_BACKGROUND_LIMIT,
+            **kwargs,
+        )
+
+    async def apply(self, library: str, items: List[Dict[str, Any]]) -> int:
+        """
+        Ergänzt Treffer aus gespeicherten Angaben, ohne Detailseiten zu laden.
+        Returns Anzahl ergänzter Treffer.
+        """
+        urls = [detail_url(item) for item in items if needs_details(item)]
+        if not urls:
+            return 0
+        stored = await scraper_executor.run_blocking(self.store.get_many, library, urls, self.max_age)
+        return sum(1 for item in items if detail_url(item) in stored and fill_missing(item, stored[detail_url(item)]))
+
+    async def enrich(
+        self,
+        library: str,
+        items: List[Dict[str, Any]],
+        timeout: Optional[float] = None,
+        scraper: Any = None,
+        notify: bool = True,
+    ) -> int:
+        """
+        Ergänzt fehlende Felder aus gespeicherten Angaben oder frisch geladenen
+        Detailseiten. Nach `timeout` Sekunden werden laufende Abrufe abgebrochen
+        und die bis dahin ergänzten Treffer behalten.
+
+        Args:
+            scraper: Scraper der Bibliothek; ohne Angabe über `scrapers` erzeugt
+            notify: `on_enriched` aufrufen; False für Treffer, die nicht vom
+                Server stammen (`POST /details`)
+
+        Returns:
+            Anzahl ergänzter Treffer
+        """
+        urls = list(dict.fromkeys(detail_url(item) for item in items if needs_details(item)))
+        if not urls:
+            return 0
+        stored = await scraper_executor.run_blocking(self.store.get_many, library, urls, self.max_age)
+        missing = [url for url in urls if url not in stored]
+
+        tasks: Dict[asyncio.Future, str] = {}
+        if missing:
+            scraper = scraper or await self.scrapers(library)
+            # Nur Seiten der Bibliothek selbst laden
+            tasks = {
+                asyncio.ensure_future(self._flights.do((library, url), lambda url=url: self._fetch(scraper, library, url))): url
+                for url in missing if scraper.owns_url(url)
+            }
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                if not task.cancelled() and task.exception() is None and task.result() is not None:
+                    stored[tasks[task]] = task.result()
+
+        changed = [item for item in items if detail_url(item) in stored and fill_missing(item, stored[detail_url(item)])]
+        if changed and notify and self.on_enriched is not None:
+            await self.on_enriched(library, changed)
+        return len(changed)
+
+    async def _fetch(self, scraper: Any, library: str, url: str) -> Optional[Dict[str, Any]]:
+        host = urlparse(url).hostname or url
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(max(1, self.per_host))
+        async with self._host_limits[host]:
+            try:
+                details = await scraper.get_details(url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                FETCHES.inc(library=library, result="error")
+                self.logger.warning(f"Detailseite {url} konnte nicht geladen werden: {str(e)}")
+                return None
+        details = {field: value for field, value in details.items() if value}
+        FETCHES.inc(library=library, result="found" if details else "empty")
+        # Auch leere Ergebnisse speichern, damit die Seite nicht bei jeder Suche erneut geladen wird
+        await scraper_executor.run_blocking(self.store.set, library, url, details)
+        return details
+
+    def schedule(self, library: str, items: List[Dict[str, Any]]):
+        """
+        Reichert die ersten `background_limit` Treffer im Hintergrund an; Zugriffe
+        stehen im Rate-Limiter hinter interaktiven Suchen.
+        """
+        items = [item for item in items[:self.background_limit] if needs_details(item)]
+        if not items:
+            return
+
+        async def run():
+            request_priority.set(PRIORITY_BACKGROUND)
+            new_flow()
+            try:
+                await self.enrich(library, items)
+            except Exception as e:
+                self.logger.warning(f"Anreicherung für '{library}' fehlgeschlagen: {str(e)}")
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+# result: found (Angaben gefunden), empty (Seite ohne verwertbare Angaben), error
+FETCHES = counter("enrichment_fetches_total", "Geladene Detailseiten", ["library", "result"])
@@ -0,0 +1,85 @@
+"""
+Ausführungsschicht für blockierende Scraper-Arbeit.
+
+Selenium-Aufrufe und HTML-Parsing blockieren den aufrufenden Thread. Damit
+`asyncio.gather` in `api.main` die Bibliotheken tatsächlich parallel durchsucht
+und der Event-Loop weiterhin andere Anfragen bedienen kann, werden solche
+Aufrufe in einen begrenzten Thread-Pool ausgelagert. Zusätzlich begrenzt ein
+Semaphor pro Bibliothek die Anzahl gleichzeitiger Suchen; interaktive Suchen
+werden dabei gezählt, damit der Harvester ihnen den Vortritt lassen kann.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from utils import config
+
+
+class ScraperExecutor:
+    def __init__(
+        self,
+        max_workers: int = 8,
+        default_limit: int = 4,
+        library_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.library_limits = library_limits or {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._interactive: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls) -> "ScraperExecutor":
+        return cls(
+            max_workers=config.SCRAPER_THREAD_POOL_SIZE,
+            default_limit=config.SCRAPER_CONCURRENCY_PER_LIBRARY,
+            library_limits=config.LIBRARY_CONCURRENCY,
+        )
+
+    async def run_blocking(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Führt eine blockierende Funktion im Thread-Pool aus, ohne den Event-Loop anzuhalten.
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scraper")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+
+    def _semaphore(self, library: str) -> asyncio.Semaphore:
+        if library not in self._semaphores:
+            self._semaphores[library] = asyncio.Semaphore(self.library_limits.get(library, self.default_limit))
+        return self._semaphores[library]
+
+    @asynccontextmanager
+    async def limit(self, library: str, background: bool = False) -> AsyncIterator[None]:
+        """
+        Belegt einen Platz im Parallelitätslimit der Bibliothek. Interaktive Suchen
+        werden (auch während sie warten) gezählt, damit Hintergrundjobs ausweichen.
+        """
+        if not background:
+            self._interactive[library] = self._interactive.get(library, 0) + 1
+        try:
+            async with self._semaphore(library):
+                yield
+        finally:
+            if not background:
+                self._interactive[library] -= 1
+
+    def interactive(self, library: Optional[str] = None) -> int:
+        """
+        Anzahl laufender oder wartender interaktiver Suchen (einer oder aller Bibliotheken).
+        """
+        if library is not None:
+            return self._interactive.get(library, 0)
+        return sum(self._interactive.values())
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+scraper_executor = ScraperExecutor.from_config()
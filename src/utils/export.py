@@ -0,0 +1,237 @@
+"""
+Export von Treffern als CSV, BibTeX, RIS und JSON Lines.
+
+Jedes Format ist ein Generator, der aus einem Iterable von Treffern
+(Dictionaries mit den Feldern von `BookMetadata`) Zeile für Zeile bzw.
+Eintrag für Eintrag Text erzeugt. So bleibt der Speicherbedarf unabhängig von
+der Trefferzahl, wenn auch die Quelle ein Generator ist (z.B.
+`SearchIndex.iter_records`); `api.main` streamt die Ausgabe direkt.
+Treffer, die blockweise asynchron eintreffen (z.B. pro Bibliothek einer
+Live-Suche), nimmt `export_batches` entgegen.
+"""
+import csv
+import io
+import json
+import re
+import unicodedata
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Set
+
+from utils.merge import normalize_isbn
+
+Record = Dict[str, Any]
+
+CSV_FIELDS = (
+    "library", "title", "author", "year", "isbn", "publisher", "format",
+    "availability", "location", "price", "url", "details_url",
+)
+
+# Zeichen mit Sonderbedeutung in BibTeX
+_BIBTEX_SPECIAL = {
+    "\\": r"\textbackslash{}", "{": r"\{", "}": r"\}", "%": r"\%", "&": r"\&", "$": r"\$",
+    "#": r"\#", "_": r"\_", "^": r"\^{}", "~": r"\~{}",
+}
+# Deutsche Sonderzeichen in klassischer BibTeX-Schreibweise, damit auch ältere Werkzeuge sie sortieren können
+_BIBTEX_UMLAUTS = {
+    "ä": r'{\"a}', "ö": r'{\"o}', "ü": r'{\"u}', "Ä": r'{\"A}', "Ö": r'{\"O}', "Ü": r'{\"U}',
+    "ß": r"{\ss}", "ẞ": r"{\SS}",
+}
+_BIBTEX_ESCAPES = {**_BIBTEX_SPECIAL, **_BIBTEX_UMLAUTS}
+_BIBTEX_PATTERN = re.compile("|".join(re.escape(char) for char in _BIBTEX_ESCAPES))
+
+# Transliteration für BibTeX-Schlüssel ("Müller" -> "Mueller")
+_KEY_TRANSLITERATION = str.maketrans({
+    "ä": "ae", "ö": "oe", "ü": "ue", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue", "ß": "ss", "ẞ": "SS",
+})
+_AUTHOR_SEPARATOR = re.compile(r"\s*(?:;|/|&|\bund\b|\band\b)\s*")
+_WORD = re.compile(r"[A-Za-z0-9]+")
+_YEAR = re.compile(r"\b(1[5-9]\d\d|20\d\d)\b")
+# Artikel am Titelanfang, die nicht in den Schlüssel eingehen
+_STOPWORDS = {"der", "die", "das", "ein", "eine", "the", "a", "an"}
+
+
+def _year(record: Record) -> str:
+    match = _YEAR.search(str(record.get("year") or ""))
+    return match.group(1) if match else ""
+
+
+def split_authors(author: Any) -> List[str]:
+    if not author:
+        return []
+    return [name for name in _AUTHOR_SEPARATOR.split(str(author).strip()) if name]
+
+
+def _ascii(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.translate(_KEY_TRANSLITERATION))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def bibtex_escape(text: Any) -> str:
+    return _BIBTEX_PATTERN.sub(lambda match: _BIBTEX_ESCAPES[match.group(0)], " ".join(str(text).split()))
+
+
+def bibtex_key(record: Record) -> str:
+    """
+    Schlüssel aus Nachname des ersten Autors, Jahr und erstem Titelwort, z.B.
+    "Krechel, Ursula" / "Landgericht" / 2012 -> "krechel2012landgericht".
+    """
+    authors = split_authors(record.get("author"))
+    surname = ""
+    if authors:
+        first = authors[0]
+        surname = first.split(",", 1)[0] if "," in first else first.split()[-1]
+    words = [word.lower() for word in _WORD.findall(_ascii(str(record.get("title") or "")))]
+    title_word = next((word for word in words if word not in _STOPWORDS), words[0] if words else "")
+    key = "".join(_WORD.findall(_ascii(surname))).lower() + _year(record) + title_word
+    return key or "eintrag"
+
+
+def export_csv(records: Iterable[Record], delimiter: str = ",") -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    # BOM, damit Tabellenkalkulationen die Datei als UTF-8 erkennen
+    yield "\ufeff"
+    writer.writerow(CSV_FIELDS)
+    yield flush()
+    for record in records:
+        writer.writerow(["" if record.get(field) is None else record[field] for field in CSV_FIELDS])
+        yield flush()
+
+
+def export_bibtex(records: Iterable[Record]) -> Iterator[str]:
+    """
+    Eindeutige Schlüssel erfordern, sich die vergebenen zu merken; der
+    Speicherbedarf wächst daher (nur) mit der Zahl verschiedener Schlüssel.
+    """
+    used: Set[str] = set()
+    # Nächster freier Zusatz pro Grundschlüssel, damit häufige Schlüssel nicht jedes Mal von vorn zählen
+    next_suffix: Dict[str, int] = {}
+    for record in records:
+        base = bibtex_key(record)
+        key, suffix = base, next_suffix.get(base, 0)
+        if suffix:
+            key = base + _key_suffix(suffix)
+        while key in used:
+            # Gleiche Schlüssel wie üblich mit a, b, c, ... unterscheiden
+            suffix += 1
+            key = base + _key_suffix(suffix)
+        used.add(key)
+        next_suffix[base] = suffix + 1
+
+        fields = []
+        authors = split_authors(record.get("author"))
+        if authors:
+            fields.append(("author", " and ".join(authors)))
+        for name, value in (
+            ("title", record.get("title")),
+            ("year", _year(record)),
+            ("publisher", record.get("publisher")),
+            ("isbn", normalize_isbn(record.get("isbn")) or record.get("isbn")),
+            ("howpublished", record.get("format")),
+            ("url", record.get("details_url") or record.get("url")),
+            ("note", record.get("library") and f"Bestand: {record['library']}"),
+        ):
+            if value:
+                fields.append((name, value))
+        body = ",\n".join(
+            f"  {name} = {{{bibtex_escape(value)}}}" for name, value in fields
+        )
+        yield f"@book{{{key},\n{body}\n}}\n\n"
+
+
+def _key_suffix(number: int) -> str:
+    letters = ""
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord("a") + remainder) + letters
+    return letters
+
+
+def _ris_type(record: Record) -> str:
+    media = str(record.get("format") or "").lower()
+    if "hörbuch" in media or "audio" in media:
+        return "SOUND"
+    if "film" in media or "video" in media or "dvd" in media:
+        return "VIDEO"
+    if "ebook" in media or "e-book" in media or "epub" in media or "pdf" in media:
+        return "EBOOK"
+    return "BOOK"
+
+
+def export_ris(records: Iterable[Record]) -> Iterator[str]:
+    for record in records:
+        lines = [f"TY  - {_ris_type(record)}"]
+        lines += [f"AU  - {name}" for name in split_authors(record.get("author"))]
+        for tag, value in (
+            ("TI", record.get("title")),
+            ("PY", _year(record)),
+            ("PB", record.get("publisher")),
+            ("SN", normalize_isbn(record.get("isbn")) or record.get("isbn")),
+            ("UR", record.get("details_url") or record.get("url")),
+            ("N1", record.get("availability")),
+            ("DB", record.get("library")),
+        ):
+            if value:
+                lines.append(f"{tag}  - {' '.join(str(value).split())}")
+        lines.append("ER  - ")
+        yield "\r\n".join(lines) + "\r\n\r\n"
+
+
+def export_jsonl(records: Iterable[Record]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+
+class _Feed:
+    """Iterator über nachgereichte Treffer für einen laufenden Exportgenerator."""
+
+    def __init__(self):
+        self.pending: deque = deque()
+        self.closed = False
+
+    def __iter__(self) -> "_Feed":
+        return self
+
+    def __next__(self) -> Record:
+        if self.pending:
+            return self.pending.popleft()
+        if self.closed:
+            raise StopIteration
+        raise RuntimeError("Exportformat liest über die vorhandenen Treffer hinaus")
+
+
+async def export_batches(
+    export: Callable[[Iterable[Record]], Iterator[str]], batches: AsyncIterable[Iterable[Record]]
+) -> AsyncIterator[str]:
+    """
+    Wendet ein Exportformat auf Treffer an, die blockweise asynchron eintreffen.
+    Jeder Block wird ausgegeben, sobald er da ist; der Zustand des Formats (z.B.
+    die vergebenen BibTeX-Schlüssel) bleibt über die Blöcke erhalten. Dafür
+    dürfen die Formate pro Ausgabe höchstens einen Treffer lesen.
+    """
+    feed = _Feed()
+    output = export(feed)
+    async for batch in batches:
+        feed.pending.extend(batch)
+        while feed.pending:
+            yield next(output)
+    feed.closed = True
+    for text in output:
+        yield text
+
+
+# Format -> (Exportfunktion, Medientyp, Dateiendung)
+FORMATS: Dict[str, Any] = {
+    "csv": (export_csv, "text/csv; charset=utf-8", "csv"),
+    "bibtex": (export_bibtex, "application/x-bibtex; charset=utf-8", "bib"),
+    "ris": (export_ris, "application/x-research-info-systems; charset=utf-8", "ris"),
+    "jsonl": (export_jsonl, "application/x-ndjson; charset=utf-8", "jsonl"),
+}
+
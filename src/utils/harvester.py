@@ -0,0 +1,266 @@
+"""
+Harvester: lädt häufige oder vorgegebene Suchanfragen im Hintergrund vorab.
+
+Die Anfragen stammen aus einer Datei (`HARVEST_QUERIES_FILE`, eine Anfrage pro
+Zeile, z.B. Leselisten oder Bestseller) und aus den Top-N-Anfragen des
+Anfrage-Logs. Jede Anfrage wird pro Bibliothek höchstens alle
+`HARVEST_INTERVAL` Sekunden neu geladen; die Treffer landen mit Zeitstempel
+in der Tabelle `harvested_results`, aus der `api.main` sie ausliefert.
+
+Der Harvester läuft mit niedrigster Priorität: Er startet einen Job nur, wenn
+keine interaktive Suche läuft oder wartet und im WebDriver-Pool Platz ist,
+bricht einen laufenden Job ab, sobald eine interaktive Suche beginnt, und
+wartet zwischen zwei Jobs `HARVEST_DELAY` Sekunden. Als eigener Worker sieht
+er die interaktiven Suchen der API nicht; dort begrenzen nur der eigene
+WebDriver-Pool und der Abstand zwischen den Jobs die Last.
+
+Betrieb im API-Prozess (`HARVEST_ENABLED=true`) oder als eigener Worker:
+
+    cd src
+    python -m utils.harvester
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models.database import get_session
+from models.harvest import HarvestedResult, QueryLogEntry
+from utils import config
+from utils.cache import make_cache_key, normalize_query
+from utils.driver_pool import driver_pool
+from utils.executor import scraper_executor
+
+# Status in SearchResponse.cache für vorab geladene Treffer
+HARVEST_HIT = "harvested"
+
+# Anfragen, die länger nicht gestellt wurden, zählen nicht mehr zu den Top-N
+QUERY_LOG_WINDOW = 30 * 24 * 3600.0
+
+
+class HarvestStore:
+    """
+    Persistenz für vorab geladene Treffer und das Anfrage-Log. Alle Methoden
+    blockieren und werden im Scraper-Executor aufgerufen.
+    """
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        with get_session() as session:
+            entry = session.get(HarvestedResult, key)
+            if entry is None:
+                return None
+            return json.loads(entry.results), entry.harvested_at
+
+    def harvested_at(self, key: str) -> Optional[float]:
+        with get_session() as session:
+            entry = session.get(HarvestedResult, key)
+            return entry.harvested_at if entry is not None else None
+
+    def set(self, key: str, library: str, query: str, results: List[Dict[str, Any]]):
+        with get_session() as session:
+            session.merge(HarvestedResult(
+                key=key,
+                library=library,
+                query=query,
+                results=json.dumps(results, ensure_ascii=False, default=str),
+                harvested_at=time.time(),
+            ))
+            session.commit()
+
+    def log_query(self, library: str, query: str):
+        query = normalize_query(query)
+        key = f"{library}|{query}"
+        with get_session() as session:
+            entry = session.get(QueryLogEntry, key)
+            if entry is None:
+                entry = QueryLogEntry(key=key, library=library, query=query, count=0)
+                session.add(entry)
+            entry.count += 1
+            entry.last_seen = time.time()
+            session.commit()
+
+    def top_queries(self, limit: int) -> List[Tuple[str, str]]:
+        """Die häufigsten Anfragen der letzten 30 Tage als (Bibliothek, Anfrage)."""
+        with get_session() as session:
+            entries = (
+                session.query(QueryLogEntry)
+                .filter(QueryLogEntry.last_seen >= time.time() - QUERY_LOG_WINDOW)
+                .order_by(QueryLogEntry.count.desc(), QueryLogEntry.last_seen.desc())
+                .limit(limit)
+                .all()
+            )
+            return [(entry.library, entry.query) for entry in entries]
+
+
+def read_queries_file(path: str) -> List[str]:
+    """Eine Anfrage pro Zeile; leere Zeilen und Zeilen mit '#' werden übersprungen."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+class Harvester:
+    def __init__(
+        self,
+        scrape: Callable[[str, str], Awaitable[Any]],
+        libraries: Sequence[str],
+        store: Optional[HarvestStore] = None,
+        queries_file: str = "",
+        top_n: int = 50,
+        interval: float = 3600.0,
+        delay: float = 10.0,
+        idle_poll: float = 1.0,
+    ):
+        """
+        Args:
+            scrape: Coroutine (Bibliothek, Anfrage) -> Ergebnis mit `items` und `truncated`
+            libraries: Bibliotheken, für die Anfragen aus der Datei geladen werden
+        """
+        self.scrape = scrape
+        self.libraries = list(libraries)
+        self.store = store or HarvestStore()
+        self.queries_file = queries_file
+        self.top_n = top_n
+        self.interval = interval
+        self.delay = delay
+        self.idle_poll = idle_poll
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, scrape: Callable[[str, str], Awaitable[Any]], libraries: Sequence[str]) -> "Harvester":
+        return cls(
+            scrape=scrape,
+            libraries=config.HARVEST_LIBRARIES or libraries,
+            queries_file=config.HARVEST_QUERIES_FILE,
+            top_n=config.HARVEST_TOP_N,
+            interval=config.HARVEST_INTERVAL,
+            delay=config.HARVEST_DELAY,
+        )
+
+    def due_jobs(self) -> List[Tuple[str, str]]:
+        """
+        (Bibliothek, Anfrage)-Paare, deren letzter Abruf älter als `interval` ist.
+        Blockiert (Datenbank, Datei).
+        """
+        jobs = [(library, query) for query in read_queries_file(self.queries_file) for library in self.libraries]
+        if self.top_n > 0:
+            jobs += [job for job in self.store.top_queries(self.top_n) if job[0] in self.libraries]
+
+        due, seen = [], set()
+        now = time.time()
+        for library, query in jobs:
+            key = make_cache_key(library, query)
+            if key in seen:
+                continue
+            seen.add(key)
+            harvested_at = self.store.harvested_at(key)
+            if harvested_at is None or now - harvested_at >= self.interval:
+                due.append((library, query))
+        return due
+
+    def _idle(self) -> bool:
+        # Keine interaktive Suche aktiv und mindestens ein Browser bleibt für sie frei
+        stats = driver_pool.stats()
+        return scraper_executor.interactive() == 0 and stats["leased"] < max(1, stats["max_size"] - 1)
+
+    async def _wait_until_idle(self):
+        while not self._idle():
+            await asyncio.sleep(self.idle_poll)
+
+    async def run_job(self, library: str, query: str) -> bool:
+        """
+        Lädt eine Anfrage und speichert die Treffer. Weicht interaktiven Suchen
+        aus, indem der Job abgebrochen wird. Returns True, wenn gespeichert wurde.
+        """
+        await self._wait_until_idle()
+        job = asyncio.ensure_future(self.scrape(library, query))
+        try:
+            while not job.done():
+                await asyncio.wait({job}, timeout=self.idle_poll)
+                if not job.done() and scraper_executor.interactive() > 0:
+                    self.logger.info(f"Harvest '{query}' in '{library}' zugunsten einer interaktiven Suche abgebrochen")
+                    job.cancel()
+                    try:
+                        await job
+                    except asyncio.CancelledError:
+                        pass
+                    return False
+        except asyncio.CancelledError:
+            job.cancel()
+            raise
+
+        result = job.result()
+        # Leere oder unvollständige Ergebnisse nicht speichern, wie beim Cache
+        if not result.items or result.truncated:
+            return False
+        await scraper_executor.run_blocking(
+            self.store.set, make_cache_key(library, query), library, query, result.items
+        )
+        self.logger.info(f"Harvest '{query}' in '{library}': {len(result.items)} Treffer gespeichert")
+        return True
+
+    async def run_once(self) -> int:
+        """Arbeitet alle fälligen Jobs nacheinander ab. Returns Anzahl gespeicherter Anfragen."""
+        jobs = await scraper_executor.run_blocking(self.due_jobs)
+        harvested = 0
+        for library, query in jobs:
+            try:
+                if await self.run_job(library, query):
+                    harvested += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Harvest '{query}' in '{library}' fehlgeschlagen: {str(e)}")
+            # Netiquette: Abstand zwischen zwei Abrufen
+            await asyncio.sleep(self.delay)
+        return harvested
+
+    async def run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Harvest-Durchlauf fehlgeschlagen: {str(e)}")
+            await asyncio.sleep(min(self.interval, 60.0))
+
+    def start(self):
+        """Startet den Harvester als Hintergrund-Task im laufenden Event-Loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def _run_worker():
+    # Import erst hier: api.main stellt Registry und Scrape-Logik bereit
+    from api.main import harvester
+    from utils.http_client import http_client
+
+    await scraper_executor.run_blocking(driver_pool.start)
+    try:
+        await harvester.run_forever()
+    finally:
+        await scraper_executor.run_blocking(driver_pool.close)
+        await http_client.close()
+        scraper_executor.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_run_worker())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,273 @@
+"""
+Persistenter HTTP-Cache für GET-Requests der Scraper (Detailseiten, Cover, ...).
+
+Antworten werden komprimiert in einer SQLite-Datei abgelegt. Solange eine
+Antwort laut `Cache-Control: max-age`, `Expires` oder (heuristisch) laut
+`Last-Modified` frisch ist, wird sie ohne Netzzugriff ausgeliefert; danach
+wird sie mit `If-None-Match`/`If-Modified-Since` bedingt nachgeladen, und ein
+`304 Not Modified` liefert wieder die gespeicherte Antwort. Übersteigt der
+Cache `max_bytes`, werden die am längsten nicht genutzten Einträge entfernt.
+
+Nicht gecacht werden Requests mit Cookies oder Body (sitzungsabhängig, z.B.
+Onleihe nach dem Login) sowie Antworten mit `no-store`, `private` (der Cache
+wird von allen Anfragen geteilt), `Vary: *` oder einem anderen Status als 200.
+
+Alle Methoden blockieren und werden aus `BaseScraper._make_request` im
+Scraper-Executor aufgerufen.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+from yarl import URL
+
+from utils import config
+from utils.http_client import HttpResponse
+from utils.metrics import counter
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    encoding TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+_MAX_AGE = re.compile(r'max-age\s*=\s*"?(\d+)', re.IGNORECASE)
+# Direktiven, die das Speichern in einem geteilten Cache verbieten
+_NOT_STORABLE = re.compile(r'(?:^|[\s,])(?:no-store|private)\b', re.IGNORECASE)
+
+# Anteil des Alters laut Last-Modified, der als Frische gilt (RFC 9111, 4.2.2)
+_HEURISTIC_FRACTION = 0.1
+_HEURISTIC_MAX = 24 * 3600.0
+
+# Header, die beim bedingten Request die gespeicherten ersetzen
+_UPDATED_HEADERS = ('cache-control', 'expires', 'etag', 'last-modified', 'date')
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _parse_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """URL inklusive Query-Parametern als Schlüssel."""
+    if params:
+        return str(URL(url).update_query({k: str(v) for k, v in params.items()}))
+    return str(URL(url))
+
+
+def is_cacheable_request(method: str, kwargs: Mapping[str, Any]) -> bool:
+    if method.upper() != 'GET' or any(kwargs.get(name) is not None for name in ('data', 'json', 'cookies')):
+        return False
+    headers = kwargs.get('headers') or {}
+    return _header(headers, 'Cookie') is None and _header(headers, 'Authorization') is None
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: float, default_ttl: float = 0.0) -> Optional[float]:
+    """
+    Sekunden, die eine Antwort ab `now` frisch bleibt; None, wenn sie nicht
+    gespeichert werden darf.
+    """
+    cache_control = (_header(headers, 'Cache-Control') or '').lower()
+    if _NOT_STORABLE.search(cache_control) or (_header(headers, 'Vary') or '').strip() == '*':
+        return None
+    if 'no-cache' in cache_control:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        return float(match.group(1))
+    expires = _header(headers, 'Expires')
+    if expires is not None:
+        expires_at = _parse_date(expires)
+        date = _parse_date(_header(headers, 'Date')) or now
+        return max(0.0, expires_at - date) if expires_at is not None else 0.0
+    last_modified = _parse_date(_header(headers, 'Last-Modified'))
+    if last_modified is not None:
+        date = _parse_date(_header(headers, 'Date')) or now
+        return min(_HEURISTIC_MAX, max(0.0, (date - last_modified) * _HEURISTIC_FRACTION))
+    return default_ttl
+
+
+class CachedResponse:
+    def __init__(self, response: HttpResponse, fresh: bool, etag: Optional[str], last_modified: Optional[str]):
+        self.response = response
+        self.fresh = fresh
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    def __init__(self, path: str = "http_cache.db", max_bytes: int = 100 * 1024 * 1024, default_ttl: float = 0.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_config(cls) -> "HttpCache":
+        return cls(
+            path=config.HTTP_CACHE_PATH,
+            max_bytes=config.HTTP_CACHE_MAX_BYTES,
+            default_ttl=config.HTTP_CACHE_DEFAULT_TTL,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT status, headers, body, encoding, expires_at, etag, last_modified FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            with connection:
+                connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        status, headers, body, encoding, expires_at, etag, last_modified = row
+        response = HttpResponse(key, status, json.loads(headers), zlib.decompress(body), encoding)
+        return CachedResponse(response, expires_at > now, etag, last_modified)
+
+    def set(self, key: str, response: HttpResponse) -> bool:
+        """
+        Speichert eine Antwort, sofern sie cachebar ist. Returns True, wenn gespeichert.
+        """
+        now = time.time()
+        lifetime = freshness_lifetime(response.headers, now, self.default_ttl)
+        if response.status != 200 or lifetime is None:
+            return False
+        etag = _header(response.headers, 'ETag')
+        last_modified = _header(response.headers, 'Last-Modified')
+        if lifetime <= 0 and not etag and not last_modified:
+            return False  # weder frisch noch revalidierbar
+        body = zlib.compress(response.content, 6)
+        if len(body) > self.max_bytes:
+            return False
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    """
+                    INSERT OR REPLACE INTO responses
+                    (key, status, headers, body, encoding, size, stored_at, expires_at, etag, last_modified, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        key, response.status, json.dumps(response.headers), body, response.encoding,
+                        len(body), now, now + lifetime, etag, last_modified, now,
+                    ),
+                )
+                self._evict(connection)
+        return True
+
+    def refresh(self, key: str, headers: Mapping[str, str]) -> Optional[HttpResponse]:
+        """
+        Verarbeitet ein `304 Not Modified`: übernimmt die neuen Cache-Header und
+        liefert die gespeicherte Antwort.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        response = entry.response
+        merged = {k: v for k, v in response.headers.items() if k.lower() not in _UPDATED_HEADERS}
+        for name in _UPDATED_HEADERS:
+            value = _header(headers, name) or _header(response.headers, name)
+            if value is not None:
+                merged[name.title()] = value
+        response.headers = merged
+        now = time.time()
+        lifetime = freshness_lifetime(merged, now, self.default_ttl)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                if lifetime is None:
+                    # Laut neuen Headern nicht mehr speicherbar (z.B. jetzt `private`)
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return response
+                connection.execute(
+                    "UPDATE responses SET headers = ?, expires_at = ?, etag = ?, last_modified = ?, last_used = ? "
+                    "WHERE key = ?",
+                    (
+                        json.dumps(merged), now + lifetime, _header(merged, 'ETag'),
+                        _header(merged, 'Last-Modified'), now, key,
+                    ),
+                )
+        return response
+
+    def _evict(self, connection: sqlite3.Connection):
+        # Am längsten ungenutzte Einträge entfernen, bis die Obergrenze eingehalten ist
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        EVICTIONS.inc(len(evicted))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"path": self.path, "entries": entries, "size_bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+http_cache = HttpCache.from_config()
+
+# result: hit (frisch), revalidated (304), miss (neu geladen), bypass (nicht cachebar)
+REQUESTS = counter("http_cache_requests_total", "GET-Requests über den HTTP-Cache", ["result"])
+EVICTIONS = counter("http_cache_evictions_total", "Wegen der Größenbegrenzung entfernte Einträge")
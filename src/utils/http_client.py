@@ -0,0 +1,211 @@
+"""
+Asynchroner HTTP-Transport auf Basis von aiohttp.
+
+Alle HTTP-Scraper teilen sich eine `aiohttp.ClientSession`, die beim Start der
+API (oder beim ersten Request) im laufenden Event-Loop angelegt und beim
+Herunterfahren geschlossen wird. Ihr Connector hält pro Host bis zu
+`HTTP_POOL_PER_HOST` Verbindungen offen (Keep-Alive), sodass Folgeanfragen an
+denselben Katalog keinen neuen TCP-/TLS-Handshake brauchen, und cacht
+DNS-Auflösungen. Wie oft eine bestehende Verbindung wiederverwendet wurde,
+zeigen die Metriken `http_connections_total{reused=...}`.
+
+aiohttp spricht nur HTTP/1.1; Brotli wird angeboten, wenn das Paket `brotli`
+installiert ist (gzip/deflate immer).
+"""
+import logging
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import aiohttp
+
+from utils import config
+from utils.metrics import counter, gauge
+
+try:
+    import brotli  # noqa: F401  (aiohttp dekodiert "br" nur mit diesem Paket)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Blockgröße beim Lesen mit Obergrenze (`max_bytes`)
+_CHUNK_SIZE = 64 * 1024
+
+
+class HttpError(Exception):
+    """HTTP-Antwort mit Fehlerstatus (4xx/5xx)."""
+
+    def __init__(self, status: int, url: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status} für {url}")
+        self.status = status
+        self.url = url
+        self.retry_after = retry_after  # Sekunden laut Retry-After-Header
+
+
+class ResponseTooLarge(ValueError):
+    """Der Body überschreitet die beim Request angegebene Obergrenze."""
+
+    def __init__(self, url: str, max_bytes: int):
+        super().__init__(f"Antwort von {url} ist größer als {max_bytes} Bytes")
+        self.url = url
+        self.max_bytes = max_bytes
+
+
+class HttpResponse:
+    """
+    Vollständig gelesene HTTP-Antwort, unabhängig von der zugrunde liegenden Verbindung.
+    """
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], content: bytes, encoding: Optional[str] = None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpError(self.status, self.url, retry_after=self._retry_after())
+
+    def _retry_after(self) -> Optional[float]:
+        value = self.headers.get("Retry-After")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None  # HTTP-Datum wird nicht ausgewertet
+
+
+async def _on_connection_created(session, context, params):
+    CONNECTIONS.inc(reused="false")
+
+
+async def _on_connection_reused(session, context, params):
+    CONNECTIONS.inc(reused="true")
+
+
+class HttpClient:
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+        pool_size: int = 100,
+        pool_per_host: int = 8,
+        keepalive: float = 30.0,
+        dns_cache_ttl: int = 300,
+    ):
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.pool_per_host = pool_per_host
+        self.keepalive = keepalive
+        self.dns_cache_ttl = dns_cache_ttl
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_config(cls) -> "HttpClient":
+        return cls(
+            headers={"User-Agent": config.HTTP_USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING},
+            timeout=config.HTTP_TIMEOUT,
+            pool_size=config.HTTP_POOL_SIZE,
+            pool_per_host=config.HTTP_POOL_PER_HOST,
+            keepalive=config.HTTP_KEEPALIVE,
+            dns_cache_ttl=config.HTTP_DNS_CACHE_TTL,
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_per_host,
+                keepalive_timeout=self.keepalive,
+                use_dns_cache=self.dns_cache_ttl > 0,
+                ttl_dns_cache=self.dns_cache_ttl if self.dns_cache_ttl > 0 else None,
+            )
+            trace = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+            trace.on_connection_create_end.append(_on_connection_created)
+            trace.on_connection_reuseconn.append(_on_connection_reused)
+            # Die Session wird von allen Nutzern geteilt: keine Cookies speichern,
+            # Scraper mit Sitzung (z.B. Onleihe) übergeben sie pro Request
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                cookie_jar=aiohttp.DummyCookieJar(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace],
+            )
+        return self._session
+
+    def start(self):
+        """Legt die Session im laufenden Event-Loop an (beim Start der API)."""
+        self._get_session()
+
+    def stats(self) -> Dict[str, float]:
+        created = CONNECTIONS.value(reused="false")
+        reused = CONNECTIONS.value(reused="true")
+        total = created + reused
+        return {"created": created, "reused": reused, "reuse_ratio": reused / total if total else 0.0}
+
+    async def request(self, method: str, url: str, max_bytes: Optional[int] = None, **kwargs) -> HttpResponse:
+        """
+        Führt einen Request aus und liest den Body vollständig.
+
+        Args:
+            method: HTTP-Methode
+            url: Ziel-URL
+            max_bytes: Obergrenze für den Body; größere Antworten werden beim
+                Lesen abgebrochen (`ResponseTooLarge`), statt sie ganz zu puffern
+            **kwargs: Weitere Parameter für `aiohttp.ClientSession.request` (params, data, headers, ...)
+        """
+        session = self._get_session()
+        async with session.request(method, url, **kwargs) as response:
+            if max_bytes is None:
+                content = await response.read()
+            else:
+                content = await self._read_limited(response, max_bytes)
+            return HttpResponse(
+                url=str(response.url),
+                status=response.status,
+                headers=dict(response.headers),
+                content=content,
+                encoding=self._detect_encoding(response) if content else None,
+            )
+
+    @staticmethod
+    async def _read_limited(response: aiohttp.ClientResponse, max_bytes: int) -> bytes:
+        if response.content_length is not None and response.content_length > max_bytes:
+            raise ResponseTooLarge(str(response.url), max_bytes)
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResponseTooLarge(str(response.url), max_bytes)
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _detect_encoding(response: aiohttp.ClientResponse) -> Optional[str]:
+        try:
+            return response.get_encoding()
+        except Exception:
+            return None
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http_client = HttpClient.from_config()
+
+CONNECTIONS = counter(
+    "http_connections_total", "Verbindungen für HTTP-Requests, neu aufgebaut oder aus dem Pool", ["reused"]
+)
+REUSE_RATIO = gauge(
+    "http_connection_reuse_ratio", "Anteil der Requests auf einer wiederverwendeten Verbindung",
+    callback=lambda: {(): http_client.stats()["reuse_ratio"]},
+)
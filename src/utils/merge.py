@@ -0,0 +1,156 @@
+"""
+Zusammenführen von Treffern mehrerer Bibliotheken zu Werken.
+
+Treffer werden über die normalisierte ISBN (ISBN-10 wird in ISBN-13
+umgerechnet) und ersatzweise über einen unscharfen Schlüssel aus Titel und
+Autor gruppiert; Treffer ohne Autor werden nur über die ISBN zusammengeführt,
+damit häufige Titel wie "Gedichte" nicht verschiedene Werke vereinen. Statt Treffer paarweise zu vergleichen, wird jeder Schlüssel
+in einem Dictionary nachgeschlagen und Gruppen mit gemeinsamem Schlüssel
+werden per Union-Find vereinigt; der Aufwand wächst damit linear mit der
+Zahl der Treffer.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Kandidaten für ISBNs inkl. Bindestrichen/Leerzeichen, z.B. "978-3-16-148410-0" oder "3-16-148410-X"
+_ISBN_CANDIDATE = re.compile(r'(?<![\dXx])(?:\d[\s-]?){9}[\dXx](?:[\s-]?\d){0,3}(?![\dXx])')
+
+# Untertitel nach ":" oder " - " sowie Klammerzusätze ("(Band 2)") gehören nicht zum Werktitel
+_SUBTITLE = re.compile(r'\s*(?::|\s[-–—]\s|\(|\[).*$')
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+_ARTICLES = {
+    'der', 'die', 'das', 'ein', 'eine', 'the', 'a', 'an', 'le', 'la', 'les', 'el', 'il',
+}
+_TITLE_TOKENS = 5
+
+# Felder, die pro Bibliothek verschieden sein können
+HOLDING_FIELDS = ('library', 'availability', 'location', 'price', 'format', 'url')
+# Felder, die das Werk beschreiben; der erste nicht leere Wert gewinnt
+WORK_FIELDS = ('title', 'author', 'year', 'publisher')
+
+
+def _isbn10_valid(digits: str) -> bool:
+    total = sum((10 - i) * (10 if c in 'Xx' else int(c)) for i, c in enumerate(digits))
+    return total % 11 == 0
+
+
+def _isbn13_check_digit(first12: str) -> str:
+    total = sum(int(c) * (1 if i % 2 == 0 else 3) for i, c in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def normalize_isbn(value: Optional[str]) -> Optional[str]:
+    """
+    Liefert die erste gültige ISBN aus `value` als ISBN-13 ohne Trennzeichen,
+    oder None. ISBN-10 wird mit dem Präfix 978 umgerechnet.
+    """
+    if not value:
+        return None
+    for candidate in _ISBN_CANDIDATE.findall(value):
+        digits = re.sub(r'[\s-]', '', candidate)
+        if len(digits) == 10 and digits[:9].isdigit() and _isbn10_valid(digits):
+            first12 = '978' + digits[:9]
+            return first12 + _isbn13_check_digit(first12)
+        if len(digits) == 13 and digits.isdigit() and digits[:3] in ('978', '979') \
+                and _isbn13_check_digit(digits[:12]) == digits[12]:
+            return digits
+    return None
+
+
+def _fold(text: str) -> str:
+    # Diakritika entfernen ("Müller" -> "muller"), ß wie ss behandeln
+    text = unicodedata.normalize('NFKD', text.replace('ß', 'ss').replace('ẞ', 'ss'))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _author_key(author: str) -> str:
+    # Erster Autor, Nachname: "Krechel, Ursula" und "Ursula Krechel" -> "krechel"
+    first = re.split(r'\s*(?:;|/|&|\bund\b|\band\b)\s*', author.strip())[0]
+    if ',' in first:
+        name = first.split(',', 1)[0]
+    else:
+        parts = first.split()
+        name = parts[-1] if parts else ''
+    return _NON_ALNUM.sub('', _fold(name))
+
+
+def fuzzy_key(title: Optional[str], author: Optional[str]) -> Optional[str]:
+    """
+    Unscharfer Werkschlüssel aus Titel und Autor. Groß-/Kleinschreibung,
+    Diakritika, Satzzeichen, führende Artikel und Untertitel werden ignoriert.
+    Ohne Titel oder Autor gibt es keinen Schlüssel.
+    """
+    author_key = _author_key(author) if author else ''
+    if not title or not author_key:
+        return None
+    tokens = _NON_ALNUM.sub(' ', _fold(_SUBTITLE.sub('', title) or title)).split()
+    while len(tokens) > 1 and tokens[0] in _ARTICLES:
+        tokens = tokens[1:]
+    if not tokens:
+        return None
+    return ' '.join(tokens[:_TITLE_TOKENS]) + '|' + author_key
+
+
+def _find(parents: List[int], index: int) -> int:
+    while parents[index] != index:
+        parents[index] = parents[parents[index]]
+        index = parents[index]
+    return index
+
+
+def merge_results(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Gruppiert Treffer (Dictionaries mit `library`) zu Werken mit einer Liste
+    von Exemplaren pro Bibliothek. Die Reihenfolge folgt dem ersten Auftreten.
+
+    Returns:
+        Liste von Werken: key, title, author, year, publisher, isbn, isbns, holdings
+    """
+    parents = list(range(len(items)))
+    owners: Dict[str, int] = {}
+    isbns: List[Optional[str]] = []
+
+    for index, item in enumerate(items):
+        isbn = normalize_isbn(item.get('isbn'))
+        isbns.append(isbn)
+        keys = [f"isbn:{isbn}"] if isbn else []
+        fuzzy = fuzzy_key(item.get('title'), item.get('author'))
+        if fuzzy:
+            keys.append(f"work:{fuzzy}")
+        for key in keys:
+            owner = owners.setdefault(key, index)
+            if owner != index:
+                root, other = _find(parents, index), _find(parents, owner)
+                if root != other:
+                    parents[max(root, other)] = min(root, other)
+
+    groups: Dict[int, List[int]] = {}
+    for index in range(len(items)):
+        groups.setdefault(_find(parents, index), []).append(index)
+
+    works = []
+    for root, members in groups.items():
+        work: Dict[str, Any] = {field: None for field in WORK_FIELDS}
+        work_isbns: List[str] = []
+        holdings = []
+        for index in members:
+            item = items[index]
+            for field in WORK_FIELDS:
+                if not work[field] and item.get(field):
+                    work[field] = item[field]
+            if isbns[index] and isbns[index] not in work_isbns:
+                work_isbns.append(isbns[index])
+            holding = {field: item.get(field) for field in HOLDING_FIELDS}
+            holding['url'] = holding['url'] or item.get('details_url')
+            holding['isbn'] = isbns[index]
+            holdings.append(holding)
+
+        work['isbn'] = work_isbns[0] if work_isbns else None
+        work['isbns'] = work_isbns
+        work['key'] = f"isbn:{work['isbn']}" if work['isbn'] else \
+            f"work:{fuzzy_key(work['title'], work['author']) or root}"
+        work['holdings'] = holdings
+        works.append(work)
+    return works
@@ -0,0 +1,185 @@
+"""
+Prozessweiter Rate-Limiter für alle ausgehenden Zugriffe auf die Kataloge.
+
+Pro Host gibt es einen Token-Bucket (`rate` Zugriffe pro Sekunde, bis zu
+`burst` auf einmal). Die Rate wird pro Bibliothek konfiguriert; teilen sich
+Bibliotheken einen Host, gilt die niedrigste Rate. Wartende Zugriffe werden
+in zwei Prioritätsklassen eingereiht: interaktive Suchen vor Hintergrundjobs
+(Harvester). Innerhalb einer Klasse werden die Tokens reihum auf die
+Anfragen (Flows) verteilt, sodass eine große Suche andere Nutzer nicht
+aushungert.
+
+Priorität und Flow werden über Kontextvariablen weitergereicht:
+`api.main` setzt pro eingehender Anfrage einen Flow, der Harvester setzt
+`PRIORITY_BACKGROUND`.
+"""
+import asyncio
+import contextvars
+import itertools
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from utils import config
+from utils.metrics import counter, gauge, histogram
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+request_flow: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_flow", default=None)
+
+_flow_ids = itertools.count(1)
+
+
+def new_flow() -> contextvars.Token:
+    """
+    Ordnet alle folgenden Zugriffe im aktuellen Kontext einem neuen Flow zu.
+    """
+    return request_flow.set(f"flow-{next(_flow_ids)}")
+
+
+class _HostBucket:
+    def __init__(self, host: str, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        # Priorität -> Flow -> wartende Futures (Reihenfolge der Flows = Round-Robin)
+        self.queues: Dict[int, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            PRIORITY_INTERACTIVE: OrderedDict(),
+            PRIORITY_BACKGROUND: OrderedDict(),
+        }
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def depth(self, priority: Optional[int] = None) -> int:
+        queues = [self.queues[priority]] if priority is not None else self.queues.values()
+        return sum(len(waiters) for queue in queues for waiters in queue.values())
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND):
+            queue = self.queues[priority]
+            while queue:
+                flow, waiters = queue.popitem(last=False)
+                while waiters and waiters[0].done():
+                    waiters.popleft()  # abgebrochene Wartende überspringen
+                if not waiters:
+                    continue
+                waiter = waiters.popleft()
+                if waiters:
+                    queue[flow] = waiters  # Flow wieder hinten anstellen
+                return waiter
+        return None
+
+    def dispatch(self):
+        self._timer = None
+        self._refill()
+        while self.tokens >= 1:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self.tokens -= 1
+            waiter.set_result(None)
+        if self.depth():
+            delay = (1 - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self.dispatch)
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1 and not self.depth():
+            self.tokens -= 1
+            return True
+        return False
+
+    def enqueue(self, priority: int, flow: str) -> asyncio.Future:
+        waiter = asyncio.get_running_loop().create_future()
+        self.queues[priority].setdefault(flow, deque()).append(waiter)
+        if self._timer is None:
+            self.dispatch()
+        return waiter
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        default_rate: float = 2.0,
+        burst: float = 4.0,
+        library_rates: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            clock: Zeitquelle in Sekunden (für Tests austauschbar)
+        """
+        self.default_rate = default_rate
+        self.burst = burst
+        self.library_rates = library_rates or {}
+        self.clock = clock
+        self._buckets: Dict[str, _HostBucket] = {}
+
+    @classmethod
+    def from_config(cls) -> "RateLimiter":
+        return cls(
+            default_rate=config.RATE_LIMIT_DEFAULT,
+            burst=config.RATE_LIMIT_BURST,
+            library_rates=config.LIBRARY_RATE_LIMITS,
+        )
+
+    def _bucket(self, host: str, library: Optional[str]) -> _HostBucket:
+        rate = self.library_rates.get(library, self.default_rate)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(host, rate, max(1.0, self.burst), self.clock)
+        elif rate < bucket.rate:
+            bucket.rate = rate
+        return bucket
+
+    async def acquire(self, url: str, library: Optional[str] = None):
+        """
+        Wartet, bis für den Host von `url` ein Zugriff erlaubt ist.
+        """
+        host = urlparse(url).hostname or url
+        if self.library_rates.get(library, self.default_rate) <= 0:
+            return  # Rate 0 = unbegrenzt
+        bucket = self._bucket(host, library)
+        priority = request_priority.get()
+        label = _PRIORITY_NAMES[priority]
+        REQUESTS.inc(host=host, priority=label)
+
+        if bucket.try_acquire():
+            WAIT_SECONDS.observe(0.0, host=host, priority=label)
+            return
+
+        started = self.clock()
+        waiter = bucket.enqueue(priority, request_flow.get() or "default")
+        try:
+            await waiter
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            WAIT_SECONDS.observe(self.clock() - started, host=host, priority=label)
+
+    def queue_depths(self) -> Dict[Tuple[str, str], float]:
+        return {
+            (host, name): bucket.depth(priority)
+            for host, bucket in self._buckets.items()
+            for priority, name in _PRIORITY_NAMES.items()
+        }
+
+
+rate_limiter = RateLimiter.from_config()
+
+REQUESTS = counter("rate_limiter_requests_total", "Zugriffe auf Katalog-Hosts", ["host", "priority"])
+WAIT_SECONDS = histogram("rate_limiter_wait_seconds", "Wartezeit im Rate-Limiter", ["host", "priority"])
+QUEUE_DEPTH = gauge(
+    "rate_limiter_queue_depth", "Wartende Zugriffe pro Host", ["host", "priority"], callback=rate_limiter.queue_depths
+)
@@ -0,0 +1,264 @@
+"""
+Lokaler Volltextindex über alle Treffer, die die API ausgeliefert hat.
+
+Die Treffer werden pro Bibliothek in einer SQLite-Datei (FTS5) abgelegt und
+bei jeder Live-Suche inkrementell aktualisiert: ein Treffer wird über ISBN,
+URL oder Titel/Autor wiedererkannt und ersetzt. Titel, Autor und weitere
+Felder werden vor dem Indexieren mit einem leichten deutschen Stemmer
+normalisiert, sodass z.B. "Märchen", "maerchen" und "Märchens" dieselben
+Dokumente finden.
+
+Alle Methoden blockieren und werden aus `api.main` im Scraper-Executor aufgerufen.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils import config
+from utils.merge import fuzzy_key, normalize_isbn
+
+# Status in SearchResponse.cache, wenn Treffer aus dem lokalen Index stammen
+INDEX_HIT = "index"
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+_UMLAUTS = str.maketrans({'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss'})
+# Endungen in der Reihenfolge, in der sie abgetrennt werden (längste zuerst)
+_SUFFIXES = ('ern', 'em', 'en', 'er', 'es', 'e', 's', 'n')
+_MIN_STEM = 3
+
+# Felder, die neben Titel und Autor durchsuchbar sind
+_EXTRA_FIELDS = ('publisher', 'year', 'isbn', 'format')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    library TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (library, record_key)
+);
+CREATE INDEX IF NOT EXISTS records_library ON records (library, updated_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    title, author, extra, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def stem(token: str) -> str:
+    """
+    Leichter Stemmer für Deutsch: Kleinschreibung, Umlaute und ß auflösen,
+    "ae/oe/ue" vereinheitlichen und bis zu zwei Flexionsendungen abtrennen
+    ("Märchens" -> "marchen" -> "march").
+    """
+    token = token.lower().translate(_UMLAUTS)
+    token = token.replace('ae', 'a').replace('oe', 'o').replace('ue', 'u')
+    token = ''.join(c for c in unicodedata.normalize('NFKD', token) if not unicodedata.combining(c))
+    for _ in range(2):
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def analyze(text: Optional[str]) -> str:
+    """Zerlegt Text in Wörter und liefert die Stämme durch Leerzeichen getrennt."""
+    if not text:
+        return ''
+    return ' '.join(stem(token) for token in _TOKEN.findall(str(text)))
+
+
+def record_key(item: Dict[str, Any]) -> Optional[str]:
+    """
+    Stabile Kennung eines Treffers innerhalb einer Bibliothek.
+    """
+    isbn = normalize_isbn(item.get('isbn'))
+    if isbn:
+        return f"isbn:{isbn}"
+    url = item.get('url') or item.get('details_url')
+    if url:
+        return f"url:{url}"
+    work = fuzzy_key(item.get('title'), item.get('author'))
+    if work:
+        return f"work:{work}|{item.get('format') or ''}"
+    return None
+
+
+def _match_expression(query: str) -> Optional[str]:
+    # Jeder Suchbegriff muss (als Präfix) vorkommen; Anführungszeichen schützen FTS5-Syntax
+    stems = [stem(token) for token in _TOKEN.findall(query)]
+    stems = [s.replace('"', '') for s in stems if s]
+    if not stems:
+        return None
+    return ' AND '.join(f'"{s}"*' for s in stems)
+
+
+class SearchIndex:
+    def __init__(self, path: str = "search_index.db", max_age: float = 7 * 24 * 3600.0):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_config(cls) -> "SearchIndex":
+        return cls(path=config.SEARCH_INDEX_PATH, max_age=config.SEARCH_INDEX_MAX_AGE)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def add(self, library: str, items: List[Dict[str, Any]]) -> int:
+        """
+        Fügt Treffer hinzu bzw. ersetzt bekannte Treffer derselben Bibliothek.
+
+        Returns:
+            Anzahl indexierter Treffer
+        """
+        now = time.time()
+        count = 0
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for item in items:
+                    key = record_key(item)
+                    if key is None:
+                        continue
+                    data = json.dumps(item, ensure_ascii=False, default=str)
+                    row = connection.execute(
+                        "SELECT id FROM records WHERE library = ? AND record_key = ?", (library, key)
+                    ).fetchone()
+                    if row is None:
+                        record_id = connection.execute(
+                            "INSERT INTO records (library, record_key, data, updated_at) VALUES (?, ?, ?, ?)",
+                            (library, key, data, now),
+                        ).lastrowid
+                    else:
+                        record_id = row[0]
+                        connection.execute(
+                            "UPDATE records SET data = ?, updated_at = ? WHERE id = ?", (data, now, record_id)
+                        )
+                        connection.execute("DELETE FROM records_fts WHERE rowid = ?", (record_id,))
+                    connection.execute(
+                        "INSERT INTO records_fts (rowid, title, author, extra) VALUES (?, ?, ?, ?)",
+                        (
+                            record_id,
+                            analyze(item.get('title')),
+                            analyze(item.get('author')),
+                            analyze(' '.join(str(item[f]) for f in _EXTRA_FIELDS if item.get(f))),
+                        ),
+                    )
+                    count += 1
+        return count
+
+    def search(self, library: str, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Sucht im Index einer Bibliothek, bestes Ergebnis zuerst (BM25, Titel
+        stärker gewichtet). Treffer älter als `max_age` werden ignoriert.
+        """
+        expression = _match_expression(query)
+        if expression is None:
+            return []
+        with self._lock:
+            rows = self._connect().execute(
+                """
+                SELECT records.data FROM records_fts
+                JOIN records ON records.id = records_fts.rowid
+                WHERE records_fts MATCH ? AND records.library = ? AND records.updated_at >= ?
+                ORDER BY bm25(records_fts, 5.0, 2.0, 1.0)
+                LIMIT ?
+                """,
+                (expression, library, time.time() - self.max_age, limit),
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def iter_records(self, library: str, query: Optional[str] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Alle (mit `query`: alle passenden) Treffer einer Bibliothek in
+        Einfügereihenfolge, blockweise gelesen, damit der Speicherbedarf auch
+        bei sehr vielen Treffern konstant bleibt. Für Exporte; die Sperre wird
+        nur während eines Blocks gehalten.
+        """
+        expression = _match_expression(query) if query else None
+        if query and expression is None:
+            return
+        last_id = 0
+        while True:
+            with self._lock:
+                if expression is None:
+                    rows = self._connect().execute(
+                        "SELECT id, data FROM records WHERE library = ? AND id > ? ORDER BY id LIMIT ?",
+                        (library, last_id, batch_size),
+                    ).fetchall()
+                else:
+                    rows = self._connect().execute(
+                        """
+                        SELECT records.id, records.data FROM records_fts
+                        JOIN records ON records.id = records_fts.rowid
+                        WHERE records_fts MATCH ? AND records.library = ? AND records.id > ?
+                        ORDER BY records.id
+                        LIMIT ?
+                        """,
+                        (expression, library, last_id, batch_size),
+                    ).fetchall()
+            for record_id, data in rows:
+                yield json.loads(data)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Größe der Indexdatei sowie Anzahl und Aktualität der Treffer pro Bibliothek.
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT library, COUNT(*), MIN(updated_at), MAX(updated_at) FROM records GROUP BY library"
+            ).fetchall()
+        now = time.time()
+        size = sum(
+            os.path.getsize(path) for path in (self.path, self.path + "-wal") if os.path.exists(path)
+        )
+        return {
+            "path": self.path,
+            "size_bytes": size,
+            "documents": sum(row[1] for row in rows),
+            "libraries": {
+                library: {
+                    "documents": documents,
+                    "oldest_age_s": round(now - oldest, 1),
+                    "newest_age_s": round(now - newest, 1),
+                    "stale_documents": self._count_stale(library, now),
+                }
+                for library, documents, oldest, newest in rows
+            },
+        }
+
+    def _count_stale(self, library: str, now: float) -> int:
+        with self._lock:
+            return self._connect().execute(
+                "SELECT COUNT(*) FROM records WHERE library = ? AND updated_at < ?",
+                (library, now - self.max_age),
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+search_index = SearchIndex.from_config()
@@ -0,0 +1,53 @@
+"""
+Zusammenfassen gleichzeitiger, gleichartiger Arbeit ("Single-Flight").
+
+Rufen mehrere Coroutinen `do()` mit demselben Schlüssel auf, während die Arbeit
+noch läuft, wird sie nur einmal ausgeführt und alle erhalten dasselbe
+Ergebnis bzw. dieselbe Ausnahme.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+        # Abgebrochen, aber noch nicht beendet (z.B. beim Aufräumen); niemand darf sich mehr anschließen
+        self.cancelling = False
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        call = self._calls.get(key)
+        return call is not None and not call.cancelling
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]], cancel_orphans: bool = False) -> Any:
+        """
+        Führt `func()` aus oder wartet auf den bereits laufenden Aufruf mit
+        demselben Schlüssel. Bricht ein Wartender ab, läuft die Arbeit für die
+        übrigen weiter; mit `cancel_orphans` wird sie abgebrochen, sobald
+        niemand mehr wartet. Wer während dieses Abbruchs kommt, startet einen
+        neuen Aufruf.
+        """
+        call = self._calls.get(key)
+        if call is None or call.cancelling:
+            call = self._calls[key] = _Call(asyncio.ensure_future(func()))
+            call.future.add_done_callback(lambda done: self._finish(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        finally:
+            call.waiters -= 1
+            if cancel_orphans and call.waiters == 0 and not call.future.done():
+                call.cancelling = True
+                call.future.cancel()
+
+    def _finish(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.future.cancelled():
+            call.future.exception()  # als abgerufen markieren, falls niemand mehr wartet